@@ -0,0 +1,115 @@
+"""
+Conversation evaluation runner used by /chat/test-eval.
+Replays expected conversation files in isolated sessions, several files at once, and scores each turn in
+the background while the replay continues. Scores are cached by (actual, expected) pair in utils.score_cache.
+"""
+from .utils import run_chat, acompare_responses, public_state, PROFILER_TYPES, CONNECTION_TYPES
+from .recorder import read_conversation
+from .tia_agent.config import EVAL_FILE_CONCURRENCY, EVAL_SCORE_CONCURRENCY
+import asyncio, logging, time
+
+logger = logging.getLogger(__name__)
+
+def _chat_type_from_state(state: dict) -> str:
+    """
+    Rebuild the chat_type ('profiler:<sub_type>' or 'connect:<connection_type>') from a recorded session state,
+    for recordings made before the recorder stored it. A session already handed over to an agent that is not a
+    chat type (e.g. ProfilerAgent, reached from the vision chat) replays as 'profiler:VisionAgent'.
+    """
+    set_agent = state.get("set_agent")
+    if set_agent == "ConnectAgent" and state.get("connection_type") in CONNECTION_TYPES:
+        return f"connect:{state['connection_type']}"
+    if set_agent in PROFILER_TYPES:
+        return f"profiler:{set_agent}"
+    return "profiler:VisionAgent"
+
+async def _score_turn(semaphore: asyncio.Semaphore, actual: str, expected: str) -> tuple:
+    """Score one turn under the scoring concurrency cap. Returns (score, latency_ms)."""
+    async with semaphore:
+        start = time.perf_counter()
+        score = await acompare_responses(actual, expected)
+        return score, round((time.perf_counter() - start) * 1000, 3)
+
+async def evaluate_conversation(expected_data: dict, score_semaphore: asyncio.Semaphore = None) -> dict:
+    """
+    Replay one expected conversation ({"user_id", "conversations", ...}) in a new session and score every turn.
+    Turns are replayed in order (each depends on the session state), scoring runs concurrently with the replay.
+    """
+    score_semaphore = score_semaphore or asyncio.Semaphore(EVAL_SCORE_CONCURRENCY)
+    conversations = expected_data.get("conversations", [])
+    user_id = expected_data.get("user_id")
+    # Use the recorded details for name, region, etc., or load them from the first turn's state
+    name = expected_data.get("name", "Unknown")
+    region = expected_data.get("region", "au")
+    lat = expected_data.get("lat", 0.0)
+    lng = expected_data.get("lng", 0.0)
+    chat_type = expected_data.get("chat_type") or _chat_type_from_state(conversations[0].get("state", {}))
+
+    start = time.perf_counter()
+    session, session_id = None, None
+    turns, score_tasks = [], []
+    try:
+        for i, conv in enumerate(conversations):
+            message = conv.get("message")
+            expected_response = conv.get("response")
+
+            turn_start = time.perf_counter()
+            session, actual_response, author = await run_chat(user_id, name, region, lat, lng, chat_type, message, session_id)
+            session_id = session.id
+            turns.append({
+                "index": i,
+                "message": message,
+                "actual_response": actual_response,
+                "expected_response": expected_response,
+                "chat_latency_ms": round((time.perf_counter() - turn_start) * 1000, 3),
+            })
+            score_tasks.append(asyncio.create_task(_score_turn(score_semaphore, actual_response, expected_response)))
+    except Exception:
+        for task in score_tasks:
+            task.cancel()
+        raise
+
+    for turn, (score, score_latency_ms) in zip(turns, await asyncio.gather(*score_tasks)):
+        turn["score"] = score
+        turn["score_latency_ms"] = score_latency_ms
+
+    overall_score = sum(turn["score"] for turn in turns) / len(turns) if turns else 0
+    return {
+        "overall_score": overall_score,
+        "session_id": session_id,
+        "state": public_state(session.state) if session else {},
+        "turns": turns,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+async def evaluate_files(paths: list, max_concurrency: int = EVAL_FILE_CONCURRENCY) -> dict:
+    """
+    Evaluate many expected conversation files, up to `max_concurrency` at a time.
+    A file that fails to load or replay is reported with its error instead of failing the whole run.
+    """
+    file_semaphore = asyncio.Semaphore(max_concurrency)
+    score_semaphore = asyncio.Semaphore(EVAL_SCORE_CONCURRENCY)
+
+    async def evaluate_file(path: str) -> dict:
+        async with file_semaphore:
+            start = time.perf_counter()
+            try:
+                expected_data = await asyncio.to_thread(read_conversation, path)
+                if not expected_data.get("conversations"):
+                    raise ValueError("No conversations found in expected file")
+                result = await evaluate_conversation(expected_data, score_semaphore)
+                return {"file": path, **result}
+            except Exception as e:
+                logger.error("Evaluation of %s failed: %s", path, e)
+                return {"file": path, "error": str(e), "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+    start = time.perf_counter()
+    files = await asyncio.gather(*(evaluate_file(path) for path in paths))
+    scored = [f for f in files if "error" not in f]
+    logger.debug("Evaluated %d files (%d failed)", len(files), len(files) - len(scored))
+    return {
+        "overall_score": sum(f["overall_score"] for f in scored) / len(scored) if scored else 0,
+        "files": files,
+        "failed": len(files) - len(scored),
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
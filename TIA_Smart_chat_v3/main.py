@@ -1,7 +1,19 @@
 from fastapi import FastAPI, Request, HTTPException
-from .utils import compare_responses, run_chat, delete_session
+from sse_starlette.sse import EventSourceResponse
+from .utils import run_chat, stream_chat, delete_session, session_call_stats, public_state
+from .tia_agent.db import pool_stats
+from .tia_agent.cache import cache_stats
+from .tia_agent.sub_agents.profiler_agent.utils import warm_lookup_cache
+from .tia_agent.shared_state import user_sessions, assistant_store_stats
+from .tia_agent.llm_usage import llm_usage_stats
+from .tia_agent.tracing import setup_tracing, shutdown_tracing
+from .tia_agent.sub_agents.connect_agent.gnn_client import gnn_stats
+from .tia_agent.sub_agents.connect_agent.rapidapi_client import business_search_stats
+from .tia_agent.sub_agents.connect_agent.spatial_index import spatial_index_stats
+from .recorder import ConversationRecorder, read_conversation
+from .evaluation import evaluate_conversation, evaluate_files
 from dotenv import load_dotenv
-import uuid, json, os, logging
+import json, os, logging, asyncio
 
 load_dotenv()
 
@@ -17,13 +29,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# OpenTelemetry: one trace per chat turn, exported as configured by TRACING_EXPORTER
+setup_tracing()
 
 # FastAPI app
 # To run: uvicorn TIA_Smart_chat_v3.main:app --reload --port 8080
 app = FastAPI()
 CONVERSATIONS_DIR = os.path.join(os.getcwd(), "tmp")
+conversation_recorder = ConversationRecorder(CONVERSATIONS_DIR)
 logger.info("Starting TIA Smart Chat v3 FastAPI application")
 
+@app.on_event("startup")
+async def warm_caches():
+    """Load the profile lookup tables so most profile saves skip their id queries."""
+    try:
+        count = await asyncio.to_thread(warm_lookup_cache)
+        logger.info("Warmed lookup id cache with %d names", count)
+    except Exception as e:
+        logger.warning("Could not warm lookup id cache, ids will be cached on first use: %s", e)
+
+@app.on_event("startup")
+async def start_assistant_store_sweeper():
+    user_sessions.start_sweeper()
+
+@app.on_event("shutdown")
+async def stop_assistant_store_sweeper():
+    user_sessions.stop_sweeper()
+
+@app.on_event("shutdown")
+async def flush_conversation_recorder():
+    await asyncio.to_thread(conversation_recorder.flush, 10)
+
+@app.on_event("shutdown")
+async def flush_traces():
+    await asyncio.to_thread(shutdown_tracing)
+
 # Main Chat endpoint
 @app.post("/chat/tia-chat")
 async def chat_endpoint(requests: Request):
@@ -45,42 +85,58 @@ async def chat_endpoint(requests: Request):
         result = {
             "response": response,
             "session_id": session.id,   
-            "state": dict(session.state),
+            "state": public_state(session.state),
             "author": author
         }
 
-        # If save_conversation flag is true, save the conversation to a JSON file
+        # If save_conversation flag is true, append the turn to the session's JSON Lines file
         if save_conversation:
-            new_entry = {
-                "message": message,
-                "response": response,
-                "state": dict(session.state),
-                "author": author,
-                "timestamp": str(uuid.uuid4())
-            }
-            file_path = f"{CONVERSATIONS_DIR}/{session.id}.json"
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            if os.path.exists(file_path):
-                with open(file_path, "r") as f:
-                    data = json.load(f)
-                data["conversations"].append(new_entry)
-            else:
-                data = {
-                    "session_id": session.id,
-                    "user_id": user_id,
-                    "conversations": [new_entry]
-                }
-            
-            with open(file_path, "w") as f:
-                json.dump(data, f, indent=4)
-            result["saved_to"] = file_path
+            result["saved_to"] = conversation_recorder.record(session.id, user_id, message, response, result["state"], author, chat_type)
 
         logger.debug("Session state after chat: %s", session.state)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Streaming Chat endpoint (Server-Sent Events)
+@app.post("/chat/tia-chat/stream")
+async def chat_stream_endpoint(requests: Request):
+    data = await requests.json()
+    logger.info("Received stream data: %s", data)
+    user_id = str((data.get("user_id")))
+    name = data.get("name")
+    message = data.get("message")
+    region = data.get("region", "au")
+    lat = data.get("lat", 0.0)
+    lng = data.get("lng", 0.0)
+    chat_type = data.get("chat_type", "Default")
+    session_id = data.get("session_id", None)
+    save_conversation = data.get("save_conversation", False)
+
+    async def event_generator():
+        async for frame in stream_chat(user_id, name, region, lat, lng, chat_type, message, session_id):
+            result = frame["data"]
+            if frame["event"] == "final" and save_conversation:
+                result["saved_to"] = conversation_recorder.record(result["session_id"], user_id, message, result["response"], result["state"], result["author"], chat_type)
+            yield {"event": frame["event"], "data": json.dumps(result, default=str)}
+
+    return EventSourceResponse(event_generator())
+
+# Monitoring endpoint
+@app.get("/metrics")
+async def metrics():
+    return {
+        "db_pool": pool_stats(),
+        "caches": cache_stats(),
+        "assistant_sessions": assistant_store_stats(),
+        "session_service": session_call_stats(),
+        "conversation_recorder": conversation_recorder.stats(),
+        "llm_usage": llm_usage_stats(),
+        "gnn": gnn_stats(),
+        "business_search": business_search_stats(),
+        "spatial_index": spatial_index_stats()
+    }
+
 # Endpoint to reset a session
 @app.post("/chat/reset-session")
 async def reset_session(requests: Request):
@@ -105,52 +161,26 @@ async def test_eval(requests: Request):
         if not expected:
             raise HTTPException(status_code=400, detail="expected is required")
         
+        # Make sure turns recorded by this process are on disk before reading them back
+        await asyncio.to_thread(conversation_recorder.flush, 10)
+
+        # Several expected files: replay them concurrently in isolated sessions
+        if isinstance(expected, list):
+            invalid = [path for path in expected if not (isinstance(path, str) and os.path.isfile(path))]
+            if invalid:
+                raise HTTPException(status_code=400, detail=f"expected must be valid file paths, not found: {invalid}")
+            return await evaluate_files(expected)
+
         # Load data from the expected file
         if isinstance(expected, str) and os.path.isfile(expected):
-            with open(expected, "r") as f:
-                expected_data = json.load(f)
-            conversations = expected_data.get("conversations", [])
-            user_id = expected_data.get("user_id")
-            if not conversations:
+            expected_data = await asyncio.to_thread(read_conversation, expected)
+            if not expected_data.get("conversations"):
                 raise HTTPException(status_code=400, detail="No conversations found in expected file")
         else:
             raise HTTPException(status_code=400, detail="expected must be a valid file path")
-        
-        # Run through conversations and compare responses
-        scores = []
-        total_score = 0
-        session_id = None
-        for i, conv in enumerate(conversations):
-            message = conv.get("message")
-            expected_response = conv.get("response")
-
-            # Use the first conversation's details for name, region, etc., or load from state
-            name = expected_data.get("name", "Unknown")
-            region = expected_data.get("region", "au")
-            lat = expected_data.get("lat", 0.0)
-            lng = expected_data.get("lng", 0.0)
-            
-            session, actual_response, author = await run_chat(user_id, name, region, lat, lng, message, session_id)
-            session_id = session.id
-            
-            # Compare using litellm
-            score = compare_responses(actual_response, expected_response)
-            scores.append({
-                "index": i,
-                "message": message,
-                "actual_response": actual_response,
-                "expected_response": expected_response,
-                "score": score
-            })
-            total_score += score
-        
-        overall_score = total_score / len(scores) if scores else 0
 
-        logger.debug("Test evaluation completed for %d conversations", len(scores))
-        return {
-            "overall_score": overall_score,
-            "session_id": session_id,
-            "state": dict(session.state) if session else {}
-        }
+        result = await evaluate_conversation(expected_data)
+        logger.debug("Test evaluation completed for %d conversations", len(result["turns"]))
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
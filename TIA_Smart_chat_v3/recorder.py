@@ -0,0 +1,142 @@
+"""
+Append-only recorder for saved conversations.
+Each chat turn is one JSON line in `<directory>/<session_id>.jsonl`. Lines are queued and written by a
+background thread in batches, so recording a turn never rewrites the file or blocks the event loop.
+"""
+from .tia_agent.config import CONVERSATION_FLUSH_INTERVAL, CONVERSATION_BATCH_SIZE, CONVERSATION_FSYNC
+from collections import defaultdict
+import os, json, uuid, queue, threading, logging
+
+logger = logging.getLogger(__name__)
+
+_FLUSH = object()
+
+class ConversationRecorder:
+    """
+    Batches conversation turns onto per-session JSON Lines files from a single writer thread.
+
+    Attributes:
+        directory (str): Directory holding the `<session_id>.jsonl` files.
+        flush_interval (float): Maximum seconds a queued turn waits before it is written.
+        batch_size (int): Maximum number of turns written per batch.
+        fsync (str): "batch" to fsync every file written in a batch, "never" to leave syncing to the OS.
+    """
+    def __init__(self, directory: str, flush_interval: float = CONVERSATION_FLUSH_INTERVAL, batch_size: int = CONVERSATION_BATCH_SIZE, fsync: str = CONVERSATION_FSYNC):
+        if fsync not in ("batch", "never"):
+            raise ValueError("fsync must be 'batch' or 'never'")
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "written": 0, "batches": 0, "write_errors": 0}
+
+    def path_for(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                os.makedirs(self.directory, exist_ok=True)
+                self._writer = threading.Thread(target=self._write_loop, name="conversation-recorder", daemon=True)
+                self._writer.start()
+
+    def record(self, session_id: str, user_id: str, message: str, response: str, state: dict, author: str, chat_type: str = None) -> str:
+        """Queue a chat turn for the session's conversation file. Returns the file path."""
+        entry = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "chat_type": chat_type,
+            "message": message,
+            "response": response,
+            "state": state,
+            "author": author,
+            "timestamp": str(uuid.uuid4())
+        }
+        # Serialize now so later changes to state cannot leak into the record
+        line = json.dumps(entry, default=str) + "\n"
+        self._ensure_writer()
+        self._queue.put((session_id, line))
+        with self._lock:
+            self._stats["recorded"] += 1
+        return self.path_for(session_id)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every turn queued so far has been written. Returns False on timeout."""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def _write_batch(self, lines: dict):
+        for session_id, session_lines in lines.items():
+            try:
+                with open(self.path_for(session_id), "a", encoding="utf-8") as f:
+                    f.writelines(session_lines)
+                    f.flush()
+                    if self.fsync == "batch":
+                        os.fsync(f.fileno())
+                with self._lock:
+                    self._stats["written"] += len(session_lines)
+            except OSError as e:
+                logger.error("Failed to write %d conversation turns for session %s: %s", len(session_lines), session_id, e)
+                with self._lock:
+                    self._stats["write_errors"] += len(session_lines)
+        with self._lock:
+            self._stats["batches"] += 1
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            lines, waiters = defaultdict(list), []
+            count = 0
+            # Collect whatever else arrives within the flush interval, up to one batch
+            while True:
+                if item[0] is _FLUSH:
+                    waiters.append(item[1])
+                else:
+                    lines[item[0]].append(item[1])
+                    count += 1
+                if count >= self.batch_size or waiters:
+                    break
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+            if lines:
+                self._write_batch(lines)
+            for done in waiters:
+                done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"queued": self._queue.qsize(), **self._stats}
+
+def read_conversation(path: str) -> dict:
+    """
+    Load a saved conversation as {"session_id", "user_id", "chat_type", "conversations": [...]}.
+    chat_type is the one the first turn was sent with, None for files recorded without it.
+    Reads recorder `.jsonl` files as well as the older single-document `.json` files.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if not path.endswith(".jsonl"):
+            return json.load(f)
+        conversation = {"session_id": None, "user_id": None, "chat_type": None, "conversations": []}
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A crash can leave the last line half written, skip it
+                logger.warning("Skipping unreadable line in %s", path)
+                continue
+            session_id, user_id, chat_type = entry.pop("session_id", None), entry.pop("user_id", None), entry.pop("chat_type", None)
+            conversation["session_id"] = conversation["session_id"] or session_id
+            conversation["user_id"] = conversation["user_id"] or user_id
+            conversation["chat_type"] = conversation["chat_type"] or chat_type
+            conversation["conversations"].append(entry)
+        return conversation
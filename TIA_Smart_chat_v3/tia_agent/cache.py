@@ -0,0 +1,84 @@
+"""
+In-process caches with TTL, size bounds and hit/miss counters.
+Every cache registers itself by name so `/metrics` can report them together.
+"""
+from cachetools import TTLCache
+import threading
+
+_MISSING = object()
+_caches = {}
+
+class StatsTTLCache:
+    """
+    Thread-safe TTL cache bounded to `maxsize` entries (least recently used evicted first).
+
+    Loads that race with an invalidation must not repopulate the cache with stale data, so callers take a
+    `token()` before reading from the source of truth and pass it to `set()`. The value is dropped if any
+    invalidation happened in between.
+
+    Attributes:
+        name (str): Name reported in cache_stats().
+        maxsize (int): Maximum number of entries.
+        ttl (float): Seconds an entry stays valid.
+    """
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._invalidation_count = 0
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "stale_sets_skipped": 0, "invalidations": 0}
+        _caches[name] = self
+
+    def get(self, key, default=None):
+        """Return the cached value for key (counting a hit) or default (counting a miss)."""
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                self._stats["misses"] += 1
+                return default
+            self._stats["hits"] += 1
+            return value
+
+    def token(self) -> int:
+        """Snapshot of the invalidation counter, taken before loading a value to cache."""
+        with self._lock:
+            return self._invalidation_count
+
+    def set(self, key, value, token: int = None):
+        """Cache value for key. Skipped if an invalidation happened since `token` was taken."""
+        with self._lock:
+            if token is not None and token != self._invalidation_count:
+                self._stats["stale_sets_skipped"] += 1
+                return False
+            self._cache[key] = value
+            self._stats["sets"] += 1
+            return True
+
+    def invalidate(self, key):
+        """Drop the entry for key and fence off any load that is still in flight."""
+        with self._lock:
+            self._invalidation_count += 1
+            self._stats["invalidations"] += 1
+            self._cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._invalidation_count += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "size": self._cache.currsize,
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+def cache_stats() -> dict:
+    """Statistics for every registered cache, keyed by cache name."""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -14,4 +14,94 @@ AGENT_MODEL = LiteLlm(model=f"openai/gpt-4o")
 
 # RapidAPI configuration
 RAPIDAPI_HOST = "local-business-data.p.rapidapi.com"
-RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY")
\ No newline at end of file
+RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY")
+RAPIDAPI_BASE_URL = os.environ.get("RAPIDAPI_BASE_URL", f"https://{RAPIDAPI_HOST}")  # e.g. a local stub server (benchmarks/stub_servers.py)
+
+# RapidAPI business search: keep-alive pool, results cached per (query, region, zoom, lat/lng tile) and local quota accounting.
+# Within RAPIDAPI_QUOTA_RESERVE of the limit, older results (up to RAPIDAPI_STALE_TTL) are served instead of new requests.
+# A miss searches from the user's own lat/lng, the tile only keys the cache: a cached result can be centred up to one
+# tile diagonal away from a later user in the same tile (0.05 degrees is about 5.5 km of latitude, keep it near SPATIAL_SEARCH_RADIUS_KM)
+RAPIDAPI_POOL_SIZE = int(os.environ.get("RAPIDAPI_POOL_SIZE", 10))
+RAPIDAPI_TIMEOUT = float(os.environ.get("RAPIDAPI_TIMEOUT", 30))
+RAPIDAPI_TILE_DEGREES = float(os.environ.get("RAPIDAPI_TILE_DEGREES", 0.05))
+RAPIDAPI_CACHE_TTL = float(os.environ.get("RAPIDAPI_CACHE_TTL", 86400))
+RAPIDAPI_CACHE_SIZE = int(os.environ.get("RAPIDAPI_CACHE_SIZE", 2048))
+RAPIDAPI_STALE_TTL = float(os.environ.get("RAPIDAPI_STALE_TTL", 7 * 86400))
+RAPIDAPI_QUOTA_LIMIT = int(os.environ.get("RAPIDAPI_QUOTA_LIMIT", 0))  # requests per window, 0: only use the API's rate limit headers
+RAPIDAPI_QUOTA_WINDOW = float(os.environ.get("RAPIDAPI_QUOTA_WINDOW", 30 * 86400))
+RAPIDAPI_QUOTA_RESERVE = float(os.environ.get("RAPIDAPI_QUOTA_RESERVE", 0.1))
+
+# Spatial index of fetched businesses: a search is taken to cover SPATIAL_SEARCH_RADIUS_KM around its point, and
+# later searches within that radius are answered locally once SPATIAL_COVERAGE_THRESHOLD of their circle is covered
+SPATIAL_SEARCH_RADIUS_KM = float(os.environ.get("SPATIAL_SEARCH_RADIUS_KM", 5))
+SPATIAL_COVERAGE_THRESHOLD = float(os.environ.get("SPATIAL_COVERAGE_THRESHOLD", 0.9))
+SPATIAL_INDEX_TTL = float(os.environ.get("SPATIAL_INDEX_TTL", 86400))
+SPATIAL_INDEX_MAX_BUSINESSES = int(os.environ.get("SPATIAL_INDEX_MAX_BUSINESSES", 20000))
+
+# GNN partner API client: keep-alive pool, timeouts, per (user_id, connection_type) cache and circuit breaker
+GNN_POOL_SIZE = int(os.environ.get("GNN_POOL_SIZE", 10))
+GNN_CONNECT_TIMEOUT = float(os.environ.get("GNN_CONNECT_TIMEOUT", 2))
+GNN_READ_TIMEOUT = float(os.environ.get("GNN_READ_TIMEOUT", 5))
+GNN_CACHE_TTL = float(os.environ.get("GNN_CACHE_TTL", 300))
+GNN_CACHE_SIZE = int(os.environ.get("GNN_CACHE_SIZE", 1024))
+GNN_BREAKER_FAILURES = int(os.environ.get("GNN_BREAKER_FAILURES", 3))
+GNN_BREAKER_RESET_TIMEOUT = float(os.environ.get("GNN_BREAKER_RESET_TIMEOUT", 30))
+
+# Max concurrent LLM calls when generating email templates for selected businesses
+EMAIL_GENERATION_CONCURRENCY = int(os.environ.get("EMAIL_GENERATION_CONCURRENCY", 5))
+# Seconds one email template generation may take before that business gets an error entry instead
+EMAIL_GENERATION_TIMEOUT = float(os.environ.get("EMAIL_GENERATION_TIMEOUT", 30))
+
+# MySQL connection pool used for profile reads and writes
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+DB_POOL_IDLE_TIMEOUT = float(os.environ.get("DB_POOL_IDLE_TIMEOUT", 300))
+DB_POOL_PING_INTERVAL = float(os.environ.get("DB_POOL_PING_INTERVAL", 30))
+
+# Per-user profile cache, invalidated whenever the ProfilerAgent saves a profile. The invalidation only reaches the worker
+# that saved it, other workers serve the old profile for up to PROFILE_CACHE_TTL: set it to 0 when running several workers
+PROFILE_CACHE_TTL = float(os.environ.get("PROFILE_CACHE_TTL", 300))
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", 1024))
+
+# Name -> id cache for the profile lookup tables (business types, categories, phases, roles), warmed at startup.
+# Ids of existing names never change, so entries are valid in every worker
+LOOKUP_CACHE_TTL = float(os.environ.get("LOOKUP_CACHE_TTL", 3600))
+LOOKUP_CACHE_SIZE = int(os.environ.get("LOOKUP_CACHE_SIZE", 4096))
+
+# Debug log payloads (states, tool results) longer than this are truncated, except for a sampled fraction logged in full
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get("LOG_PAYLOAD_MAX_CHARS", 2000))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", 0.0))
+
+# Conversation recorder (save_conversation): background writer batching appends to tmp/<session_id>.jsonl
+CONVERSATION_FLUSH_INTERVAL = float(os.environ.get("CONVERSATION_FLUSH_INTERVAL", 0.5))
+CONVERSATION_BATCH_SIZE = int(os.environ.get("CONVERSATION_BATCH_SIZE", 100))
+CONVERSATION_FSYNC = os.environ.get("CONVERSATION_FSYNC", "batch")  # "batch": fsync every written batch, "never": leave it to the OS
+
+# /chat/test-eval: expected files replayed at once, concurrent scoring calls and the score cache
+EVAL_FILE_CONCURRENCY = int(os.environ.get("EVAL_FILE_CONCURRENCY", 4))
+EVAL_SCORE_CONCURRENCY = int(os.environ.get("EVAL_SCORE_CONCURRENCY", 8))
+EVAL_SCORE_CACHE_TTL = float(os.environ.get("EVAL_SCORE_CACHE_TTL", 86400))
+EVAL_SCORE_CACHE_SIZE = int(os.environ.get("EVAL_SCORE_CACHE_SIZE", 10000))
+
+# Responses of opt-in utility LLM calls (business type, search query, vision blog content) keyed by model and messages
+LLM_RESPONSE_CACHE_TTL = float(os.environ.get("LLM_RESPONSE_CACHE_TTL", 3600))
+LLM_RESPONSE_CACHE_SIZE = int(os.environ.get("LLM_RESPONSE_CACHE_SIZE", 2048))
+
+# DynamicChatAssistant history window: the latest messages are kept verbatim within this many tokens,
+# older ones are folded into a running summary of at most HISTORY_SUMMARY_MAX_TOKENS
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", 1500))
+HISTORY_MIN_MESSAGES = int(os.environ.get("HISTORY_MIN_MESSAGES", 2))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.environ.get("HISTORY_SUMMARY_MAX_TOKENS", 300))
+
+# In-memory DynamicChatAssistant store, evicts least recently used and idle sessions
+ASSISTANT_STORE_MAX_ENTRIES = int(os.environ.get("ASSISTANT_STORE_MAX_ENTRIES", 1000))
+ASSISTANT_STORE_MAX_BYTES = int(os.environ.get("ASSISTANT_STORE_MAX_BYTES", 64 * 1024 * 1024))
+ASSISTANT_STORE_IDLE_TTL = float(os.environ.get("ASSISTANT_STORE_IDLE_TTL", 1800))
+ASSISTANT_STORE_SWEEP_INTERVAL = float(os.environ.get("ASSISTANT_STORE_SWEEP_INTERVAL", 60))
+
+# OpenTelemetry tracing: "none", "console" or "otlp" (endpoint from the standard OTEL_EXPORTER_OTLP_* variables).
+# SQL statement text is only attached to spans with TRACING_CAPTURE_STATEMENTS=true, it can contain user data
+TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "none").lower()
+TRACING_SERVICE_NAME = os.environ.get("TRACING_SERVICE_NAME", "tia-smart-chat")
+TRACING_SAMPLE_RATIO = float(os.environ.get("TRACING_SAMPLE_RATIO", 1.0))
+TRACING_CAPTURE_STATEMENTS = os.environ.get("TRACING_CAPTURE_STATEMENTS", "false").lower() == "true"
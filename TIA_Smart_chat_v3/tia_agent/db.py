@@ -0,0 +1,226 @@
+"""
+Shared MySQL connection pool.
+All direct pymysql access (profile loads and profile saves) goes through `get_connection()`,
+so sessions reuse open connections instead of paying a TCP and auth handshake per call.
+"""
+from collections import deque
+from contextlib import contextmanager
+from opentelemetry.trace import SpanKind
+from .config import DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_IDLE_TIMEOUT, DB_POOL_PING_INTERVAL
+from .tracing import tracer, statement_attributes
+import pymysql, threading, time, logging, os
+
+logger = logging.getLogger(__name__)
+
+class TracedConnection(pymysql.connections.Connection):
+    """pymysql connection that opens a span for every query it sends, whatever cursor class runs it."""
+    def query(self, sql, unbuffered=False):
+        attributes = statement_attributes(sql, "mysql")
+        with tracer.start_as_current_span(f"mysql {attributes['db.operation.name']}", kind=SpanKind.CLIENT, attributes=attributes) as span:
+            affected_rows = super().query(sql, unbuffered)
+            if affected_rows is not None:
+                span.set_attribute("db.affected_rows", affected_rows)
+            return affected_rows
+
+class ConnectionPool:
+    """
+    Size-limited, thread-safe pool of pymysql connections.
+    Idle connections are reused most-recently-used first, pinged before reuse once they have been idle
+    for `ping_interval` seconds and closed once they have been idle for `idle_timeout` seconds.
+
+    Attributes:
+        max_size (int): Maximum number of open connections.
+        timeout (float): Seconds to wait for a free connection before raising TimeoutError.
+        idle_timeout (float): Seconds a connection may sit idle before it is recycled.
+        ping_interval (float): Idle seconds after which a connection is health checked on checkout.
+    """
+    def __init__(self, connect_kwargs: dict, max_size: int = 10, timeout: float = 10.0, idle_timeout: float = 300.0, ping_interval: float = 30.0):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self._idle = deque()  # (connection, last_used)
+        self._size = 0
+        self._in_use = 0
+        self._lock = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_time_total_s": 0.0,
+            "wait_time_max_s": 0.0,
+            "checkout_time_total_s": 0.0,
+            "checkout_time_max_s": 0.0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+        }
+
+    def _connect(self):
+        conn = TracedConnection(**self.connect_kwargs)
+        with self._lock:
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _recycle_idle(self, now: float):
+        """Close connections that have been idle for longer than idle_timeout. Caller holds the lock."""
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats["connections_recycled"] += 1
+            self._close(conn)
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` seconds if the pool is exhausted."""
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        waited = False
+        conn, last_used = None, None
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._recycle_idle(now)
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise TimeoutError(f"Timed out after {self.timeout}s waiting for a database connection")
+                waited = True
+                self._lock.wait(remaining)
+            self._in_use += 1
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif time.monotonic() - last_used > self.ping_interval:
+                # Health check connections that have been idle for a while, replace them if they are dead
+                try:
+                    conn.ping(reconnect=False)
+                except Exception as e:
+                    logger.warning("Pooled DB connection failed health check, reconnecting: %s", e)
+                    with self._lock:
+                        self._stats["health_check_failures"] += 1
+                    self._close(conn)
+                    conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+        elapsed = time.perf_counter() - start
+        wait_time = elapsed if waited else 0.0
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["checkout_time_total_s"] += elapsed
+            self._stats["checkout_time_max_s"] = max(self._stats["checkout_time_max_s"], elapsed)
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_time_total_s"] += wait_time
+                self._stats["wait_time_max_s"] = max(self._stats["wait_time_max_s"], wait_time)
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool. Discarded connections are closed instead of reused."""
+        if not discard:
+            try:
+                # End any open transaction so the next checkout does not read from a stale snapshot
+                conn.rollback()
+            except Exception:
+                discard = True
+        with self._lock:
+            self._in_use -= 1
+            if discard:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+        if discard:
+            self._close(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks out a connection and always returns it to the pool."""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard)
+
+    def close_all(self):
+        """Close every idle connection. Connections in use are closed when they are released."""
+        with self._lock:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._close(conn)
+
+    def stats(self) -> dict:
+        """Pool statistics for monitoring."""
+        with self._lock:
+            checkouts = self._stats["checkouts"]
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "waits": self._stats["waits"],
+                "timeouts": self._stats["timeouts"],
+                "wait_time_total_s": round(self._stats["wait_time_total_s"], 6),
+                "wait_time_max_s": round(self._stats["wait_time_max_s"], 6),
+                "checkout_latency_avg_ms": round(self._stats["checkout_time_total_s"] / checkouts * 1000, 3) if checkouts else 0.0,
+                "checkout_latency_max_ms": round(self._stats["checkout_time_max_s"] * 1000, 3),
+                "connections_created": self._stats["connections_created"],
+                "connections_recycled": self._stats["connections_recycled"],
+                "health_check_failures": self._stats["health_check_failures"],
+            }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Return the process wide pool, creating it from the DB_* environment variables on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    connect_kwargs={
+                        "host": os.environ["DB_HOST"],
+                        "user": os.environ["DB_USER"],
+                        "password": os.environ["DB_PASS"],
+                        "database": os.environ["DB_NAME"],
+                        "port": int(os.environ.get("DB_PORT", 3306)),
+                    },
+                    max_size=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                    ping_interval=DB_POOL_PING_INTERVAL,
+                )
+    return _pool
+
+def get_connection():
+    """Check out a pooled connection: `with get_connection() as conn: ...`"""
+    return get_pool().connection()
+
+def pool_stats() -> dict:
+    """Statistics for the shared pool, or an empty dict if it has not been used yet."""
+    return _pool.stats() if _pool is not None else {}
@@ -0,0 +1,76 @@
+"""
+Token usage and prompt cache reporting for every LiteLLM call (ADK agents and direct completions).
+Registered as a LiteLLM callback on import. Cached prompt tokens come from the provider's
+`usage.prompt_tokens_details.cached_tokens`, so `/metrics` shows how much of each prompt was served from cache.
+"""
+from litellm.integrations.custom_logger import CustomLogger
+import litellm, threading, logging
+
+logger = logging.getLogger(__name__)
+
+def _usage_value(obj, name: str) -> int:
+    value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+    return value or 0
+
+class LLMUsageTracker(CustomLogger):
+    """Aggregates calls, prompt / cached / completion tokens and latency per model."""
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def record(self, model: str, usage, latency_s: float):
+        prompt_tokens = _usage_value(usage, "prompt_tokens")
+        completion_tokens = _usage_value(usage, "completion_tokens")
+        details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = _usage_value(details, "cached_tokens") if details else 0
+        with self._lock:
+            stats = self._models.setdefault(model, {
+                "calls": 0, "cache_hit_calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+                "latency_s_cache_hit": 0.0, "latency_s_cache_miss": 0.0,
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["cached_tokens"] += cached_tokens
+            stats["completion_tokens"] += completion_tokens
+            if cached_tokens:
+                stats["cache_hit_calls"] += 1
+                stats["latency_s_cache_hit"] += latency_s
+            else:
+                stats["latency_s_cache_miss"] += latency_s
+
+    def _record_event(self, kwargs, response_obj, start_time, end_time):
+        try:
+            usage = getattr(response_obj, "usage", None) or (response_obj.get("usage") if isinstance(response_obj, dict) else None)
+            if usage is None:
+                return
+            self.record(kwargs.get("model", "unknown"), usage, (end_time - start_time).total_seconds())
+        except Exception as e:
+            logger.debug("Could not record LLM usage: %s", e)
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self._record_event(kwargs, response_obj, start_time, end_time)
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self._record_event(kwargs, response_obj, start_time, end_time)
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+            for model, stats in self._models.items():
+                misses = stats["calls"] - stats["cache_hit_calls"]
+                result[model] = {
+                    **{k: v for k, v in stats.items() if not k.startswith("latency_s")},
+                    "cached_token_ratio": round(stats["cached_tokens"] / stats["prompt_tokens"], 4) if stats["prompt_tokens"] else 0.0,
+                    "avg_latency_ms_cache_hit": round(stats["latency_s_cache_hit"] / stats["cache_hit_calls"] * 1000, 3) if stats["cache_hit_calls"] else 0.0,
+                    "avg_latency_ms_cache_miss": round(stats["latency_s_cache_miss"] / misses * 1000, 3) if misses else 0.0,
+                }
+            return result
+
+usage_tracker = LLMUsageTracker()
+if usage_tracker not in litellm.callbacks:
+    litellm.callbacks.append(usage_tracker)
+
+def llm_usage_stats() -> dict:
+    """Token usage and prompt cache statistics per model."""
+    return usage_tracker.stats()
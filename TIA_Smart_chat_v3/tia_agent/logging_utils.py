@@ -0,0 +1,41 @@
+"""
+Lazy formatting for large log payloads.
+Pass `payload(value)` as a %-style logging argument: nothing is serialized unless the record is actually
+emitted, so disabled debug logs on the chat path cost a function call instead of a full dump of the state.
+"""
+from .config import LOG_PAYLOAD_MAX_CHARS, LOG_PAYLOAD_SAMPLE_RATE
+import json, random
+
+class payload:
+    """
+    Defers serializing value until the log record is formatted.
+    Output longer than `max_chars` is truncated, except for a `sample_rate` fraction logged in full.
+
+    Attributes:
+        value: Object to log (dicts and lists are dumped as compact JSON).
+        max_chars (int): Truncation limit, 0 disables truncation.
+        sample_rate (float): Fraction of oversized payloads logged in full.
+    """
+    __slots__ = ("value", "max_chars", "sample_rate")
+
+    def __init__(self, value, max_chars: int = LOG_PAYLOAD_MAX_CHARS, sample_rate: float = LOG_PAYLOAD_SAMPLE_RATE):
+        self.value = value
+        self.max_chars = max_chars
+        self.sample_rate = sample_rate
+
+    def __str__(self):
+        value = self.value
+        if hasattr(value, "to_dict"):  # ADK State
+            value = value.to_dict()
+        if isinstance(value, (dict, list)):
+            try:
+                text = json.dumps(value, default=str)
+            except (TypeError, ValueError):
+                text = str(value)
+        else:
+            text = str(value)
+        if self.max_chars and len(text) > self.max_chars and not (self.sample_rate and random.random() < self.sample_rate):
+            return f"{text[:self.max_chars]}... [truncated, {len(text)} chars]"
+        return text
+
+    __repr__ = __str__
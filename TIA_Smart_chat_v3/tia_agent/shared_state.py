@@ -1,8 +1,9 @@
 """Shared state across the application"""
-from typing import Dict, Any
+from collections import OrderedDict
+from .config import ASSISTANT_STORE_MAX_ENTRIES, ASSISTANT_STORE_MAX_BYTES, ASSISTANT_STORE_IDLE_TTL, ASSISTANT_STORE_SWEEP_INTERVAL
 from .sub_agents.DynamicChatAssistant import DynamicChatAssistant
 from .sub_agents.vision_agent.prompts import VISION_RULE_PROMPT, TIA_VISION_CHAT_1_FOUNDATION_PROMPT, TIA_VISION_CHAT_2_REFLECTION_PROMPT, TIA_VISION_CHAT_3_ANALYSIS_PROMPT, TIA_VISION_CHAT_4_STRATEGY_PROMPT
-import logging
+import logging, threading, time
 
 logger = logging.getLogger(__name__)
 
@@ -13,32 +14,238 @@ VISION_PROMPTS = [
     TIA_VISION_CHAT_4_STRATEGY_PROMPT
 ]
 
+class AssistantStore:
+    """
+    Thread-safe, bounded store of DynamicChatAssistant instances keyed by session_id.
+    Sessions are evicted least recently used first once `max_entries` or `max_bytes` is exceeded, and
+    dropped once they have been idle for `idle_ttl` seconds (checked on access and by a periodic sweeper).
+    Sizes are approximate: the text held in each assistant's history, re-measured whenever it is accessed.
+
+    Attributes:
+        max_entries (int): Maximum number of stored assistants.
+        max_bytes (int): Maximum approximate size of all stored assistants.
+        idle_ttl (float): Seconds a session may go unused before it is evicted.
+        sweep_interval (float): Seconds between background sweeps.
+    """
+    def __init__(self, max_entries: int, max_bytes: int, idle_ttl: float, sweep_interval: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._entries = OrderedDict()  # session_id -> [assistant, last_used, size], least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+        self._stats = {"hits": 0, "misses": 0, "created": 0, "removed": 0, "evicted_lru": 0, "evicted_idle": 0, "evicted_memory": 0, "sweeps": 0}
+
+    @staticmethod
+    def _approx_size(assistant: DynamicChatAssistant) -> int:
+        size = len(assistant.system_prompt) + len(assistant.assistant_response) + len(assistant.history_summary)
+        size += sum(len(m["content"] or "") for m in assistant.conversation_history)
+        size += sum(len(r["message"] or "") + len(r["question"] or "") for r in assistant.user_responses)
+        return size
+
+    def _pop(self, session_id: str, reason: str = None):
+        """Remove an entry and count why (uncounted if reason is None). Caller holds the lock."""
+        _, _, size = self._entries.pop(session_id)
+        self._bytes -= size
+        if reason is not None:
+            self._stats[reason] += 1
+        if reason not in (None, "removed"):
+            logger.debug("Evicted assistant for session %s (%s)", session_id, reason)
+
+    def _touch(self, session_id: str, now: float):
+        """Mark an entry as most recently used and re-measure it. Caller holds the lock."""
+        entry = self._entries[session_id]
+        size = self._approx_size(entry[0])
+        self._bytes += size - entry[2]
+        entry[1], entry[2] = now, size
+        self._entries.move_to_end(session_id)
+
+    def _enforce_limits(self, keep: str = None):
+        """Evict least recently used entries until the store is within its limits. Caller holds the lock."""
+        while len(self._entries) > self.max_entries:
+            self._pop(next(iter(self._entries)), "evicted_lru")
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            self._pop(oldest, "evicted_memory")
+
+    def get_or_create(self, session_id: str, factory) -> DynamicChatAssistant:
+        """Return the assistant for session_id, creating it with `factory()` if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and now - entry[1] > self.idle_ttl:
+                self._pop(session_id, "evicted_idle")
+                entry = None
+            if entry is not None:
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+                self._stats["created"] += 1
+                self._entries[session_id] = [factory(), now, 0]
+            self._touch(session_id, now)
+            self._enforce_limits(keep=session_id)
+            return self._entries[session_id][0]
+
+    def put(self, session_id: str, assistant: DynamicChatAssistant):
+        """Store assistant for session_id, replacing any existing instance."""
+        now = time.monotonic()
+        with self._lock:
+            if session_id in self._entries:
+                self._pop(session_id)
+            self._entries[session_id] = [assistant, now, 0]
+            self._touch(session_id, now)
+            self._enforce_limits(keep=session_id)
+
+    def remove(self, session_id: str):
+        with self._lock:
+            if session_id in self._entries:
+                self._pop(session_id, "removed")
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def sweep(self) -> int:
+        """Evict idle sessions and re-measure the rest. Returns the number of sessions evicted."""
+        now = time.monotonic()
+        with self._lock:
+            self._stats["sweeps"] += 1
+            expired = [sid for sid, (_, last_used, _) in self._entries.items() if now - last_used > self.idle_ttl]
+            for session_id in expired:
+                self._pop(session_id, "evicted_idle")
+            # Histories grow after they are handed out, refresh sizes so the byte limit stays accurate
+            for entry in self._entries.values():
+                size = self._approx_size(entry[0])
+                self._bytes += size - entry[2]
+                entry[2] = size
+            before = len(self._entries)
+            self._enforce_limits()
+            return len(expired) + before - len(self._entries)
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                evicted = self.sweep()
+                if evicted:
+                    logger.info("Assistant store sweep evicted %d sessions", evicted)
+            except Exception as e:
+                logger.error(f"ERROR in assistant store sweep: {e}")
+
+    def start_sweeper(self):
+        """Start the background sweeper thread (no-op if already running)."""
+        with self._lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._stop.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="assistant-store-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_s": self.idle_ttl,
+                **self._stats,
+            }
+
 """
 Global session storage.
 Handles the user session for DynamicChatAssistant instances.
 Key: session_id, Value: DynamicChatAssistant instance.
+
+The ADK session state holds the serialized assistant under ASSISTANT_STATE_KEY and is the source of truth,
+so any worker can continue a chat. The in-memory store only saves rebuilding the assistant on every turn.
+(The per-process profile cache is not shared between workers, see PROFILE_CACHE_TTL.)
+The collected user responses grow with every turn, so they are kept out of that snapshot and stored once each
+under their own key (ASSISTANT_STATE_KEY + "_response_<n>"). Every turn's event then holds a bounded snapshot
+(the history is capped to HISTORY_TOKEN_BUDGET) and the new responses only.
 """
+ASSISTANT_STATE_KEY = "dynamic_chat_assistant"
 
-# NOTE: FUTURE IMPROVEMENT - Consider using a Database or a proper Cache system. May require DynamicChatAssistant to be serialized or a slight redesign.
-user_sessions: Dict[str, DynamicChatAssistant] = {}
+def _response_key(index: int) -> str:
+    return f"{ASSISTANT_STATE_KEY}_response_{index}"
 
-def get_or_create_assistant(session_id: str, user_id: int, chat_type: str) -> DynamicChatAssistant:
-    """Get or create an assistant instance for a specific session."""
+def assistant_state_delta(assistant: DynamicChatAssistant, state) -> dict:
+    """Session state delta saving the assistant: its snapshot and the responses not yet stored in `state`."""
+    snapshot = assistant.to_dict()
+    responses = snapshot.pop("user_responses")
+    snapshot["response_count"] = len(responses)
+    stored = min((state.get(ASSISTANT_STATE_KEY) or {}).get("response_count", 0), len(responses))
+    delta = {ASSISTANT_STATE_KEY: snapshot}
+    delta.update({_response_key(i): responses[i] for i in range(stored, len(responses))})
+    return delta
+
+def _assistant_snapshot(state) -> dict:
+    """The serialized assistant in `state` with its user responses put back (None if there is none)."""
+    snapshot = state.get(ASSISTANT_STATE_KEY) if state is not None else None
+    if not snapshot or "response_count" not in snapshot:
+        return snapshot
+    return {**snapshot, "user_responses": [state.get(_response_key(i)) for i in range(snapshot["response_count"])]}
+
+def clear_assistant_state(state):
+    """Remove the serialized assistant and its stored responses from the session state."""
+    snapshot = state.get(ASSISTANT_STATE_KEY)
+    if snapshot:
+        for i in range(snapshot.get("response_count", 0)):
+            state[_response_key(i)] = None
+        state[ASSISTANT_STATE_KEY] = None
+
+user_sessions = AssistantStore(
+    max_entries=ASSISTANT_STORE_MAX_ENTRIES,
+    max_bytes=ASSISTANT_STORE_MAX_BYTES,
+    idle_ttl=ASSISTANT_STORE_IDLE_TTL,
+    sweep_interval=ASSISTANT_STORE_SWEEP_INTERVAL,
+)
+
+def get_or_create_assistant(session_id: str, user_id: int, chat_type: str, state=None) -> DynamicChatAssistant:
+    """
+    Get or create an assistant instance for a specific session.
+    If `state` (the ADK session state) holds a serialized assistant, the assistant is rebuilt from it
+    unless the local copy is already at the same revision.
+    """
     try:
-        logger.debug(f"Getting or creating assistant for session_id: {session_id}, user_id: {user_id}, chat_type: {chat_type}")
-        if session_id not in user_sessions:
+        logger.debug("Getting or creating assistant for session_id: %s, user_id: %s, chat_type: %s", session_id, user_id, chat_type)
+        snapshot = state.get(ASSISTANT_STATE_KEY) if state is not None else None
+        def create_assistant():
             if chat_type == "profiler:VisionAgent":
-                assistant = DynamicChatAssistant(VISION_PROMPTS, VISION_RULE_PROMPT, user_id)
+                if snapshot:
+                    assistant = DynamicChatAssistant.from_dict(_assistant_snapshot(state), VISION_PROMPTS, VISION_RULE_PROMPT)
+                else:
+                    assistant = DynamicChatAssistant(VISION_PROMPTS, VISION_RULE_PROMPT, user_id)
             assistant.session_id = session_id
-            user_sessions[session_id] = assistant
+            return assistant
 
-        return user_sessions[session_id]
+        assistant = user_sessions.get_or_create(session_id, create_assistant)
+        if snapshot and snapshot.get("revision") != assistant.revision:
+            # Another worker (or a restart) handled a later turn, the local copy is stale
+            logger.debug("Rehydrating assistant for session_id: %s from session state", session_id)
+            assistant = create_assistant()
+            user_sessions.put(session_id, assistant)
+        return assistant
     except Exception as e:
         logger.debug(f"ERROR in get_or_create_assistant: {e}")
         raise Exception("Error creating or retrieving assistant: " + str(e))
 
 def cleanup_session(session_id: str):
     """Clean up a session"""
-    if session_id in user_sessions:
-        del user_sessions[session_id]
-    logger.debug(f"Cleaned up session {session_id}")
\ No newline at end of file
+    user_sessions.remove(session_id)
+    logger.debug("Cleaned up session %s", session_id)
+
+def assistant_store_stats() -> dict:
+    """Size and eviction statistics for the DynamicChatAssistant store."""
+    return user_sessions.stats()
@@ -1,36 +1,84 @@
 from datetime import datetime
-from litellm import completion
-from ..config import CHAT_MODEL, OPENAI_API_KEY
-import re, logging, json, os
+from litellm import completion, acompletion
+from ..config import CHAT_MODEL, OPENAI_API_KEY, HISTORY_TOKEN_BUDGET, HISTORY_MIN_MESSAGES, HISTORY_SUMMARY_MAX_TOKENS, LLM_RESPONSE_CACHE_TTL, LLM_RESPONSE_CACHE_SIZE
+from ..tokens import count_message_tokens, truncate_tokens, MESSAGE_OVERHEAD_TOKENS
+from ..cache import StatsTTLCache
+import re, logging, json, os, hashlib
 
 logger = logging.getLogger(__name__)
 
+HISTORY_SUMMARY_PROMPT = f"""
+You maintain a running summary of an interview between an assistant and a business owner.
+Update the summary with the new messages. Keep, in order, every question the assistant asked and the key facts,
+names, numbers and feelings from the user's answers. Drop pleasantries and reflections. Use short bullet points
+and stay under {HISTORY_SUMMARY_MAX_TOKENS} tokens. Output only the updated summary.
+"""
+
+# Responses of calls made with cache=True, keyed by a hash of the model and request.
+# Only for prompts whose answer depends on nothing but the messages (chat turns are never cached)
+response_cache = StatsTTLCache("llm_responses", maxsize=LLM_RESPONSE_CACHE_SIZE, ttl=LLM_RESPONSE_CACHE_TTL)
+
+def _response_key(message, max_tokens) -> str:
+    return hashlib.sha256(json.dumps([CHAT_MODEL, message, max_tokens], sort_keys=True).encode("utf-8")).hexdigest()
+
 # Function to generate response using LiteLLM
-def generate_response(message):
+def generate_response(message, max_tokens: int = None, cache: bool = False):
+    key = _response_key(message, max_tokens) if cache else None
+    if key:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
     response = completion(
         model=CHAT_MODEL,
         messages=message,
-        api_key=OPENAI_API_KEY
+        api_key=OPENAI_API_KEY,
+        max_tokens=max_tokens
+    )
+    text = response.choices[0].message.content.strip()
+    if key:
+        response_cache.set(key, text)
+    return text
+
+# Async counterpart of generate_response, keeps the event loop free while the completion is in flight
+async def agenerate_response(message, max_tokens: int = None, cache: bool = False):
+    key = _response_key(message, max_tokens) if cache else None
+    if key:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+    response = await acompletion(
+        model=CHAT_MODEL,
+        messages=message,
+        api_key=OPENAI_API_KEY,
+        max_tokens=max_tokens
     )
-    return response.choices[0].message.content.strip()
+    text = response.choices[0].message.content.strip()
+    if key:
+        response_cache.set(key, text)
+    return text
 
 class DynamicChatAssistant:
     """
     Manages multi-phase conversations using predefined prompts and rules.
     Guides users through phases, collects responses, and resets history per phase.
     Transitions based on user input and rules.
+    Within a phase the latest messages are sent verbatim up to HISTORY_TOKEN_BUDGET tokens, older ones are
+    folded into a running summary so the prompt size stays bounded however long the answers are.
 
     Attributes:
         user_id (int): ID of the user.
         current_phase (int): Current phase index.
         prompts (list): List of chat prompts for each phase.
         rule_prompt (str): Template for wrapping chat prompts with rules.
-        conversation_history (list): History of messages in the current phase.
+        conversation_history (list): Recent messages in the current phase, sent verbatim.
+        history_summary (str): Running summary of the messages folded out of conversation_history.
+        summarized_questions (int): Number of assistant questions covered by history_summary.
         user_responses (list): Collected user responses across phases.
         system_prompt (str): Current system prompt based on phase.
         assistant_response (str): Latest response from the assistant.
         business_info (dict): Information about the user's business.
         end_chat_session (bool): Flag indicating if the chat session has ended.
+        revision (int): Number of turns taken, used to tell whether a serialized copy is newer.
     """
     def __init__(self, prompts: list, rule_prompt: str, user_id: int):
         logger.info(f"Initializing DynamicChatAssistant for user_id: {user_id}")
@@ -39,11 +87,48 @@ class DynamicChatAssistant:
         self.prompts = prompts
         self.rule_prompt = rule_prompt
         self.conversation_history = []
+        self.history_summary = ""
+        self.summarized_questions = 0
         self.user_responses = []
         self.system_prompt = self._get_wrapped_prompt(0)
         self.assistant_response = ""
         self.business_info = {}
         self.end_chat_session = False
+        self.revision = 0
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the chat progress (prompts are code constants and are not included).
+        Lists, dicts and messages are copied, so later turns do not change a snapshot already saved to the session state.
+        """
+        return {
+            "user_id": self.user_id,
+            "current_phase": self.current_phase,
+            "conversation_history": [dict(message) for message in self.conversation_history],
+            "history_summary": self.history_summary,
+            "summarized_questions": self.summarized_questions,
+            "user_responses": list(self.user_responses),
+            "assistant_response": self.assistant_response,
+            "business_info": dict(self.business_info),
+            "end_chat_session": self.end_chat_session,
+            "revision": self.revision,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, prompts: list, rule_prompt: str) -> "DynamicChatAssistant":
+        """Rebuild an assistant from to_dict() output"""
+        assistant = cls(prompts, rule_prompt, data.get("user_id"))
+        assistant.current_phase = data.get("current_phase", 0)
+        assistant.system_prompt = assistant._get_wrapped_prompt(assistant.current_phase)
+        assistant.conversation_history = [dict(message) for message in data.get("conversation_history", [])]
+        assistant.history_summary = data.get("history_summary", "")
+        assistant.summarized_questions = data.get("summarized_questions", 0)
+        assistant.user_responses = list(data.get("user_responses", []))
+        assistant.assistant_response = data.get("assistant_response", "")
+        assistant.business_info = dict(data.get("business_info", {}))
+        assistant.end_chat_session = data.get("end_chat_session", False)
+        assistant.revision = data.get("revision", 0)
+        return assistant
         
     def _get_wrapped_prompt(self, phase_index):
         """Wrap the chat prompt with the connect rule prompts"""
@@ -56,18 +141,76 @@ class DynamicChatAssistant:
         if self.current_phase < max_phase:
             self.current_phase += 1
             self.system_prompt = self._get_wrapped_prompt(self.current_phase)
-            self.conversation_history.clear()
+            self._clear_history()
             logger.info(f"DynamicChat for user_id: {self.user_id} - [Moved to Phase {self.current_phase} / {max_phase}] - Conversation history cleared")
             return None
         if self.current_phase == max_phase:
-            self.conversation_history.clear()
+            self._clear_history()
             #self.save_responses() # Save responses for infile testing
             self.end_chat_session = True
             return "<exit>"
 
-    def send_message(self, message):
-        """Send message using litellm with chosen API and record user response"""
-        logger.debug(f"DynamicChatAssistant user_id: {self.user_id} - [On Phase {self.current_phase} / {len(self.prompts) - 1}] - Sending message")
+    def _clear_history(self):
+        self.conversation_history.clear()
+        self.history_summary = ""
+        self.summarized_questions = 0
+
+    def _history_to_fold(self) -> list:
+        """Oldest messages to fold into the summary once the history is over budget (empty if it still fits)"""
+        sizes = [count_message_tokens([m]) for m in self.conversation_history]
+        total = sum(sizes)
+        if total <= HISTORY_TOKEN_BUDGET:
+            return []
+        # Fold down to half the budget so the summary is rebuilt every few turns rather than on every turn
+        fold = 0
+        while len(sizes) - fold > HISTORY_MIN_MESSAGES and total > HISTORY_TOKEN_BUDGET // 2:
+            total -= sizes[fold]
+            fold += 1
+        return self.conversation_history[:fold]
+
+    def _summary_request(self, folded: list) -> list:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in folded)
+        return [
+            {"role": "system", "content": HISTORY_SUMMARY_PROMPT},
+            {"role": "user", "content": f"Summary so far:\n{self.history_summary or '(empty)'}\n\nNew messages:\n{transcript}"}
+        ]
+
+    def _fold_history(self, folded: list, summary: str = None):
+        """
+        Replace the folded messages with the updated summary and cap what is left to the token budget.
+        Without a summary (the summary call failed) the folded messages are appended to the old summary as is.
+        """
+        if folded:
+            if summary is None:
+                summary = "\n".join(filter(None, [self.history_summary, *(f"{m['role']}: {m['content']}" for m in folded)]))
+            del self.conversation_history[:len(folded)]
+            self.history_summary = truncate_tokens(summary, HISTORY_SUMMARY_MAX_TOKENS)
+            self.summarized_questions += sum(1 for m in folded if m["role"] == "assistant")
+            logger.debug("DynamicChatAssistant user_id: %s - Folded %d messages into the history summary (%d questions summarized)", self.user_id, len(folded), self.summarized_questions)
+
+        # Messages that alone exceed the budget (a very long answer) are truncated
+        if count_message_tokens(self.conversation_history) > HISTORY_TOKEN_BUDGET:
+            per_message = max(HISTORY_TOKEN_BUDGET // len(self.conversation_history) - MESSAGE_OVERHEAD_TOKENS, 1)
+            for m in self.conversation_history:
+                m["content"] = truncate_tokens(m["content"] or "", per_message)
+
+    def _input_messages(self) -> list:
+        """System prompt, history summary (if any) and the recent messages of the current phase"""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if self.history_summary:
+            messages.append({
+                "role": "system",
+                "content": (
+                    f"Summary of the earlier part of this phase, covering the first {self.summarized_questions} questions you asked and the user's answers:\n"
+                    f"{self.history_summary}\n\nThose questions are done. Continue the sequence from the conversation below."
+                )
+            })
+        return messages + self.conversation_history
+
+    def _start_turn(self, message):
+        """Record the user response and return the messages to fold into the summary (empty if the history fits)"""
+        logger.debug("DynamicChatAssistant user_id: %s - [On Phase %d / %d] - Sending message", self.user_id, self.current_phase, len(self.prompts) - 1)
+        self.revision += 1
         self.user_responses.append({
             'phase': self.current_phase,
             'question': self.assistant_response,
@@ -80,17 +223,13 @@ class DynamicChatAssistant:
             "content": message
         })
         
-        input_messages = [
-            {"role": "system", "content": self.system_prompt},
-            *self.conversation_history
-        ]
-
-        # logger.debug("=" * 20)
-        # logger.debug(f"*self.conversation_history: {self.conversation_history}")
-        # logger.debug("=" * 20)
-
-        self.assistant_response = generate_response(input_messages)
+        return self._history_to_fold()
 
+    def _end_turn(self):
+        """
+        Record the assistant response and move to the next phase if it contains the end tag.
+        Returns the response text and the input messages for the first message of a new phase (None if the phase continues).
+        """
         self.conversation_history.append({
             "role": "assistant", 
             "content": self.assistant_response
@@ -103,20 +242,58 @@ class DynamicChatAssistant:
             self.conversation_history[-1]["content"] = self.assistant_response
             next_phase_result = self._next_phase()
             if next_phase_result:
-                return self.assistant_response + "\n\n" + next_phase_result
+                return self.assistant_response + "\n\n" + next_phase_result, None
             else:
                 # Automatically generate the first assistant message for the new phase
-                fresh_phase_message = f"**Start with a very short message indicating we will continue to the next phase. Keep it brief and conversational.** \n\n{self.system_prompt}"
-                first_input_messages = [{"role": "system", "content": fresh_phase_message}]
-                self.assistant_response = generate_response(first_input_messages)
-                self.conversation_history.append({
-                    "role": "assistant", 
-                    "content": self.assistant_response
-                })
-                return self.assistant_response
+                # System prompt first so the request shares its cached prefix with the rest of the phase
+                fresh_phase_message = f"{self.system_prompt}\n\n**Start with a very short message indicating we will continue to the next phase. Keep it brief and conversational.**"
+                return None, [{"role": "system", "content": fresh_phase_message}]
         
+        return self.assistant_response, None
+
+    def _start_phase(self, first_response):
+        """Record the first assistant message of a new phase"""
+        self.assistant_response = first_response
+        self.conversation_history.append({
+            "role": "assistant", 
+            "content": self.assistant_response
+        })
         return self.assistant_response
 
+    def send_message(self, message):
+        """Send message using litellm with chosen API and record user response"""
+        folded = self._start_turn(message)
+        summary = None
+        if folded:
+            try:
+                summary = generate_response(self._summary_request(folded), max_tokens=HISTORY_SUMMARY_MAX_TOKENS)
+            except Exception as e:
+                logger.warning("History summary failed for user_id: %s, keeping folded messages verbatim in the summary: %s", self.user_id, e)
+        self._fold_history(folded, summary)
+        self.assistant_response = generate_response(self._input_messages())
+
+        response, first_input_messages = self._end_turn()
+        if first_input_messages:
+            return self._start_phase(generate_response(first_input_messages))
+        return response
+
+    async def asend_message(self, message):
+        """Async send_message, awaits the completion instead of blocking the event loop"""
+        folded = self._start_turn(message)
+        summary = None
+        if folded:
+            try:
+                summary = await agenerate_response(self._summary_request(folded), max_tokens=HISTORY_SUMMARY_MAX_TOKENS)
+            except Exception as e:
+                logger.warning("History summary failed for user_id: %s, keeping folded messages verbatim in the summary: %s", self.user_id, e)
+        self._fold_history(folded, summary)
+        self.assistant_response = await agenerate_response(self._input_messages())
+
+        response, first_input_messages = self._end_turn()
+        if first_input_messages:
+            return self._start_phase(await agenerate_response(first_input_messages))
+        return response
+
     # NOTE: Only used for infile testing currently
     def save_responses(self):
         """Save responses to JSON file"""
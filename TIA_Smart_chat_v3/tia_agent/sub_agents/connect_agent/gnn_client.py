@@ -0,0 +1,187 @@
+"""
+Client for the GNN partner recommendation API.
+Requests share one keep-alive connection pool, results are cached per (user_id, connection_type), and a
+circuit breaker skips the API after repeated failures so the ConnectAgent goes straight to the web search fallback.
+"""
+from requests.adapters import HTTPAdapter
+from ...cache import StatsTTLCache
+from ...tracing import TracedSession
+from ...config import (
+    GNN_POOL_SIZE, GNN_CONNECT_TIMEOUT, GNN_READ_TIMEOUT, GNN_CACHE_TTL, GNN_CACHE_SIZE,
+    GNN_BREAKER_FAILURES, GNN_BREAKER_RESET_TIMEOUT,
+)
+from ...logging_utils import payload
+import threading, time, logging, os, copy
+
+logger = logging.getLogger(__name__)
+
+# Partner lists per (user_id, connection_type); an empty list means the GNN had no recommendations
+gnn_cache = StatsTTLCache("gnn_partners", maxsize=GNN_CACHE_SIZE, ttl=GNN_CACHE_TTL)
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for `reset_timeout` seconds.
+    It then lets a single trial call through (half open): success closes it again, failure reopens it.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the breaker.
+        reset_timeout (float): Seconds the breaker stays open before a trial call.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"trips": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go to the service now."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+            if self._state == self.CLOSED or (self._state == self.HALF_OPEN and not self._trial_in_flight):
+                self._trial_in_flight = self._state == self.HALF_OPEN
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["trips"] += 1
+                    logger.warning("GNN circuit breaker opened after %d consecutive failures", self._failures)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._state, "consecutive_failures": self._failures, **self._stats}
+
+class GNNClient:
+    """
+    Pooled, cached and circuit-broken access to the GNN partner endpoints.
+
+    Attributes:
+        base_url (str): GNN API base URL (GNN_API_BASE_URL).
+        timeout (tuple): (connect, read) timeout in seconds for each request.
+        breaker (CircuitBreaker): Breaker guarding the API.
+    """
+    ENDPOINTS = {
+        "complementary": "complementary-partners",
+        "alliance": "alliance-partners",
+        "mastermind": "mastermind-partners",
+        "intelligent": "intelligent-partners",
+    }
+
+    def __init__(self, base_url: str, pool_size: int = 10, connect_timeout: float = 2.0, read_timeout: float = 5.0, breaker: CircuitBreaker = None):
+        self.base_url = base_url.rstrip("/") if base_url else base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self._session = TracedSession()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "failures": 0, "latency_total_s": 0.0, "latency_max_s": 0.0}
+
+    def _record_request(self, elapsed: float, failed: bool):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["failures"] += int(failed)
+            self._stats["latency_total_s"] += elapsed
+            self._stats["latency_max_s"] = max(self._stats["latency_max_s"], elapsed)
+
+    def get_partners(self, user_id, connection_type: str):
+        """Recommended partners for the user, or None if there are none or the API is unavailable."""
+        key = (user_id, connection_type)
+        cached = gnn_cache.get(key)
+        if cached is not None:
+            # Callers keep the list in session state, so each gets its own copy
+            return copy.deepcopy(cached) or None
+        if not self.base_url:
+            logger.error("GNN_API_BASE_URL is not set, skipping GNN partners API")
+            return None
+        endpoint = self.ENDPOINTS.get(connection_type)
+        if endpoint is None:
+            logger.error("Unknown connection_type for GNN partners API: %s", connection_type)
+            return None
+        if not self.breaker.allow():
+            logger.debug("GNN circuit breaker open, skipping GNN partners API for user_id: %s", user_id)
+            return None
+
+        token = gnn_cache.token()
+        start = time.perf_counter()
+        try:
+            response = self._session.get(f"{self.base_url}/user/{user_id}/{endpoint}", timeout=self.timeout)
+            if response.status_code >= 500:
+                response.raise_for_status()
+        except Exception as e:
+            self._record_request(time.perf_counter() - start, failed=True)
+            self.breaker.record_failure()
+            logger.error(f"Error connecting to GNN partners API: {e}")
+            return None
+        self._record_request(time.perf_counter() - start, failed=False)
+        # The service answered, so client errors (e.g. a user unknown to the GNN) do not count against the breaker
+        self.breaker.record_success()
+
+        try:
+            response.raise_for_status()
+            response_data = response.json()
+        except Exception as e:
+            logger.error(f"Error reading GNN partners API response: {e}")
+            return None
+        logger.debug("GNN partners response: %s", payload(response_data))
+        partners = response_data.get("partners") or []
+        gnn_cache.set(key, copy.deepcopy(partners), token)
+        return partners or None
+
+    def close(self):
+        self._session.close()
+
+    def stats(self) -> dict:
+        """Request latency, failures and breaker state for monitoring."""
+        with self._lock:
+            requests_made = self._stats["requests"]
+            result = {
+                "requests": requests_made,
+                "failures": self._stats["failures"],
+                "latency_avg_ms": round(self._stats["latency_total_s"] / requests_made * 1000, 3) if requests_made else 0.0,
+                "latency_max_ms": round(self._stats["latency_max_s"] * 1000, 3),
+            }
+        return {**result, "breaker": self.breaker.stats()}
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_gnn_client() -> GNNClient:
+    """Return the process wide client, created from GNN_API_BASE_URL on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GNNClient(
+                    os.getenv("GNN_API_BASE_URL"),
+                    pool_size=GNN_POOL_SIZE,
+                    connect_timeout=GNN_CONNECT_TIMEOUT,
+                    read_timeout=GNN_READ_TIMEOUT,
+                    breaker=CircuitBreaker(GNN_BREAKER_FAILURES, GNN_BREAKER_RESET_TIMEOUT),
+                )
+    return _client
+
+def gnn_stats() -> dict:
+    """Statistics for the shared client, or an empty dict if it has not been used yet."""
+    return _client.stats() if _client is not None else {}
@@ -0,0 +1,217 @@
+"""
+Client for the RapidAPI local business search.
+Searches share one keep-alive HTTPS pool, so repeat searches skip the TLS handshake. Results are cached per
+normalized query, region, zoom and lat/lng tile, so users in the same area searching the same partner type
+share one paid request. Local quota accounting (synced from the API's rate limit headers) serves older cached
+results instead of spending the last of the quota.
+"""
+from requests.adapters import HTTPAdapter
+from ...cache import StatsTTLCache
+from ...tracing import TracedSession
+from ...config import (
+    RAPIDAPI_HOST, RAPIDAPI_KEY, RAPIDAPI_BASE_URL, RAPIDAPI_POOL_SIZE, RAPIDAPI_TIMEOUT, RAPIDAPI_TILE_DEGREES,
+    RAPIDAPI_CACHE_TTL, RAPIDAPI_CACHE_SIZE, RAPIDAPI_STALE_TTL,
+    RAPIDAPI_QUOTA_LIMIT, RAPIDAPI_QUOTA_WINDOW, RAPIDAPI_QUOTA_RESERVE,
+)
+import threading, time, logging, math, copy
+
+logger = logging.getLogger(__name__)
+
+# Fresh results, and the same results kept longer to serve when the quota is nearly used up
+search_cache = StatsTTLCache("business_search", maxsize=RAPIDAPI_CACHE_SIZE, ttl=RAPIDAPI_CACHE_TTL)
+stale_search_cache = StatsTTLCache("business_search_stale", maxsize=RAPIDAPI_CACHE_SIZE, ttl=RAPIDAPI_STALE_TTL)
+
+class QuotaExceededError(RuntimeError):
+    """Raised instead of calling the API once the local quota is used up and nothing is cached."""
+
+class QuotaTracker:
+    """
+    Counts requests in a fixed window and tracks the remaining quota.
+    The API's `x-ratelimit-requests-limit` / `-remaining` headers take precedence over the local count when present.
+
+    Attributes:
+        limit (int): Requests allowed per window, 0 if unknown (then only the API headers are used).
+        window (float): Window length in seconds.
+        reserve (float): Fraction of the limit kept in reserve; below it cached results are preferred.
+    """
+    def __init__(self, limit: int = 0, window: float = 30 * 86400, reserve: float = 0.1):
+        self.limit = limit
+        self.window = window
+        self.reserve = reserve
+        self._window_start = time.time()
+        self._used = 0
+        self._remaining = None  # last value reported by the API
+        self._lock = threading.Lock()
+
+    def _roll_window(self, now: float):
+        if now - self._window_start >= self.window:
+            self._window_start = now
+            self._used = 0
+            self._remaining = None
+
+    def record(self, headers=None):
+        """Count a request and sync with the rate limit headers of its response."""
+        with self._lock:
+            self._roll_window(time.time())
+            self._used += 1
+            if headers:
+                try:
+                    if headers.get("x-ratelimit-requests-limit") is not None:
+                        self.limit = int(headers["x-ratelimit-requests-limit"])
+                    if headers.get("x-ratelimit-requests-remaining") is not None:
+                        self._remaining = int(headers["x-ratelimit-requests-remaining"])
+                except ValueError:
+                    pass
+
+    def remaining(self):
+        """Requests left in the window, or None if the limit is unknown."""
+        with self._lock:
+            self._roll_window(time.time())
+            if self._remaining is not None:
+                return self._remaining
+            return max(self.limit - self._used, 0) if self.limit else None
+
+    def near_limit(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= math.ceil(self.limit * self.reserve)
+
+    def exhausted(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def stats(self) -> dict:
+        remaining = self.remaining()
+        with self._lock:
+            return {"limit": self.limit, "used_in_window": self._used, "remaining": remaining, "window_s": self.window}
+
+def _tile(value: float, size: float) -> int:
+    return math.floor(float(value) / size)
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).strip(" .\"'").casefold()
+
+class BusinessSearchClient:
+    """
+    Pooled, cached and quota-aware access to the `search-in-area` endpoint.
+    A miss searches from the user's own coordinates and the lat/lng tile only keys the cache, so later users in the
+    same tile share that result, centred at most one tile diagonal away from them. Results carry the point
+    actually searched under `search_point` as [lat, lng].
+
+    Attributes:
+        host (str): RapidAPI host.
+        tile_degrees (float): Tile edge in degrees of latitude / longitude.
+        quota (QuotaTracker): Local quota accounting.
+    """
+    def __init__(self, host: str, api_key: str, pool_size: int = 10, timeout: float = 30.0, tile_degrees: float = 0.05, quota: QuotaTracker = None, base_url: str = None):
+        self.host = host
+        self.base_url = base_url or f"https://{host}"
+        self.timeout = timeout
+        self.tile_degrees = tile_degrees
+        self.quota = quota or QuotaTracker()
+        self._session = TracedSession()
+        self._session.headers.update({"x-rapidapi-host": host, "x-rapidapi-key": api_key or ""})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "failures": 0, "served_stale": 0, "quota_rejections": 0, "latency_total_s": 0.0, "latency_max_s": 0.0}
+
+    def _count(self, name: str, value=1):
+        with self._lock:
+            self._stats[name] += value
+
+    def search(self, business_type: str, limit: int, region: str, zoom: int, lat: float, lng: float, language: str = "en") -> dict:
+        """
+        Search businesses near (lat, lng), from cache when an equivalent search was made recently.
+        Every call returns its own copy, callers keep the result in session state.
+        """
+        lat_tile, lng_tile = _tile(lat, self.tile_degrees), _tile(lng, self.tile_degrees)
+        key = (normalize_query(business_type), (region or "").lower(), int(zoom), int(limit), language, lat_tile, lng_tile)
+        cached = search_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        if self.quota.near_limit():
+            stale = stale_search_cache.get(key)
+            if stale is not None:
+                self._count("served_stale")
+                logger.info("RapidAPI quota nearly used up (%s remaining), serving an older cached search", self.quota.remaining())
+                return copy.deepcopy(stale)
+            if self.quota.exhausted():
+                self._count("quota_rejections")
+                raise QuotaExceededError("RapidAPI quota used up and no cached result for this search")
+
+        params = {
+            "query": business_type,
+            "lat": f"{lat:.6f}",
+            "lng": f"{lng:.6f}",
+            "limit": str(limit),
+            "language": language,
+            "region": region,
+            "zoom": zoom,
+            "extract_emails_and_contacts": str(True).lower(),
+        }
+        token = search_cache.token()
+        start = time.perf_counter()
+        try:
+            response = self._session.get(f"{self.base_url}/search-in-area", params=params, timeout=self.timeout)
+        except Exception:
+            self._count("failures")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stats["requests"] += 1
+                self._stats["latency_total_s"] += elapsed
+                self._stats["latency_max_s"] = max(self._stats["latency_max_s"], elapsed)
+        self.quota.record(response.headers)
+        if response.status_code != 200:
+            self._count("failures")
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
+
+        result = response.json()
+        result["search_point"] = [lat, lng]
+        cached = copy.deepcopy(result)
+        search_cache.set(key, cached, token)
+        stale_search_cache.set(key, cached)
+        return result
+
+    def close(self):
+        self._session.close()
+
+    def stats(self) -> dict:
+        """Request latency, failures, stale results served and quota for monitoring."""
+        with self._lock:
+            requests_made = self._stats["requests"]
+            result = {
+                "requests": requests_made,
+                "failures": self._stats["failures"],
+                "served_stale": self._stats["served_stale"],
+                "quota_rejections": self._stats["quota_rejections"],
+                "latency_avg_ms": round(self._stats["latency_total_s"] / requests_made * 1000, 3) if requests_made else 0.0,
+                "latency_max_ms": round(self._stats["latency_max_s"] * 1000, 3),
+            }
+        return {**result, "quota": self.quota.stats()}
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_business_search_client() -> BusinessSearchClient:
+    """Return the process wide client, created from the RAPIDAPI_* settings on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BusinessSearchClient(
+                    RAPIDAPI_HOST,
+                    RAPIDAPI_KEY,
+                    pool_size=RAPIDAPI_POOL_SIZE,
+                    timeout=RAPIDAPI_TIMEOUT,
+                    tile_degrees=RAPIDAPI_TILE_DEGREES,
+                    quota=QuotaTracker(RAPIDAPI_QUOTA_LIMIT, RAPIDAPI_QUOTA_WINDOW, RAPIDAPI_QUOTA_RESERVE),
+                    base_url=RAPIDAPI_BASE_URL,
+                )
+    return _client
+
+def business_search_stats() -> dict:
+    """Statistics for the shared client, or an empty dict if it has not been used yet."""
+    return _client.stats() if _client is not None else {}
@@ -0,0 +1,153 @@
+"""
+Spatial index of businesses returned by RapidAPI searches, so nearby users share results.
+Businesses are indexed by location and the query that found them. Each search also records the circle it
+covered, so "businesses of type X within R km of P" can be answered locally once earlier searches for X cover
+enough of that circle, and RapidAPI is only called for areas not covered yet. A search that came back full (as many
+results as its limit) may have been cut short, so it only covers out to the farthest business it returned.
+"""
+from shapely.geometry import Point
+from shapely.ops import unary_union
+from shapely.strtree import STRtree
+from ...config import SPATIAL_INDEX_TTL, SPATIAL_INDEX_MAX_BUSINESSES, SPATIAL_COVERAGE_THRESHOLD
+from .rapidapi_client import normalize_query
+import threading, time, math, logging
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG_EQUATOR = 111.320
+
+def _project(lat: float, lng: float) -> Point:
+    """Equirectangular projection to kilometres, accurate enough at city scale."""
+    return Point(float(lng) * KM_PER_DEGREE_LNG_EQUATOR * math.cos(math.radians(float(lat))), float(lat) * KM_PER_DEGREE_LAT)
+
+def _business_id(business: dict):
+    return business.get("business_id") or business.get("place_id") or (business.get("name"), business.get("full_address"))
+
+class BusinessIndex:
+    """
+    Thread-safe index of fetched businesses and covered search areas, per (query, region).
+    Entries older than `ttl` seconds are dropped; past `max_businesses` the oldest businesses go first.
+
+    Attributes:
+        ttl (float): Seconds a business or covered area stays usable.
+        max_businesses (int): Maximum number of indexed businesses.
+        coverage_threshold (float): Fraction of the requested circle earlier searches must cover to answer locally.
+    """
+    def __init__(self, ttl: float = 86400, max_businesses: int = 20000, coverage_threshold: float = 0.9):
+        self.ttl = ttl
+        self.max_businesses = max_businesses
+        self.coverage_threshold = coverage_threshold
+        self._businesses = {}  # business id -> {"business", "point", "queries", "fetched_at"}
+        self._coverage = {}  # (query, region) -> {(x, y, radius): (circle, fetched_at)}
+        self._tree = None
+        self._tree_ids = []
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "uncovered": 0, "empty": 0, "searches_added": 0, "evicted": 0}
+
+    def _prune(self, now: float):
+        """Drop expired businesses and areas, then the oldest businesses over the size limit. Caller holds the lock."""
+        expired = [key for key, entry in self._businesses.items() if now - entry["fetched_at"] > self.ttl]
+        overflow = len(self._businesses) - len(expired) - self.max_businesses
+        if overflow > 0:
+            live = sorted((entry["fetched_at"], key) for key, entry in self._businesses.items() if now - entry["fetched_at"] <= self.ttl)
+            expired += [key for _, key in live[:overflow]]
+        for key in expired:
+            del self._businesses[key]
+        self._stats["evicted"] += len(expired)
+        for coverage_key, circles in list(self._coverage.items()):
+            for circle_key in [k for k, (_, t) in circles.items() if now - t > self.ttl]:
+                del circles[circle_key]
+            if not circles:
+                del self._coverage[coverage_key]
+        if expired:
+            self._tree = None
+
+    def _get_tree(self):
+        """STRtree over the business points, rebuilt lazily after changes. Caller holds the lock."""
+        if self._tree is None and self._businesses:
+            self._tree_ids = list(self._businesses)
+            self._tree = STRtree([self._businesses[key]["point"] for key in self._tree_ids])
+        return self._tree
+
+    def add(self, query: str, region: str, lat: float, lng: float, radius_km: float, businesses: list, limit: int = None):
+        """
+        Index the businesses a search at (lat, lng) returned and mark its circle as covered for the query.
+        If the search returned `limit` results it was truncated: the covered circle then only reaches the farthest business returned.
+        """
+        query, region, now = normalize_query(query), (region or "").lower(), time.time()
+        businesses = businesses or []
+        center = _project(lat, lng)
+        points = [(business, _project(business["latitude"], business["longitude"])) for business in businesses
+                  if business.get("latitude") is not None and business.get("longitude") is not None]
+        if limit and len(businesses) >= limit:
+            radius_km = min(radius_km, max((point.distance(center) for _, point in points), default=0.0))
+        with self._lock:
+            if radius_km > 0:
+                # Repeated searches at the same point (e.g. served from the tile cache) refresh the circle instead of adding one
+                self._coverage.setdefault((query, region), {})[(round(center.x, 3), round(center.y, 3), round(radius_km, 3))] = (center.buffer(radius_km), now)
+            for business, point in points:
+                key = _business_id(business)
+                entry = self._businesses.get(key)
+                if entry is None:
+                    entry = self._businesses[key] = {"point": point, "queries": set()}
+                    self._tree = None
+                entry["business"], entry["fetched_at"] = business, now
+                entry["queries"].add((query, region))
+            self._stats["searches_added"] += 1
+            self._prune(now)
+
+    def coverage(self, query: str, region: str, lat: float, lng: float, radius_km: float) -> float:
+        """Fraction of the circle around (lat, lng) covered by earlier searches for the query."""
+        area = _project(lat, lng).buffer(radius_km)
+        with self._lock:
+            now = time.time()
+            circles = [c for c, t in self._coverage.get((normalize_query(query), (region or "").lower()), {}).values() if now - t <= self.ttl and c.intersects(area)]
+        if not circles:
+            return 0.0
+        return 1.0 - area.difference(unary_union(circles)).area / area.area
+
+    def lookup(self, query: str, region: str, lat: float, lng: float, radius_km: float, limit: int):
+        """
+        Up to `limit` indexed businesses found for the query within radius_km of (lat, lng), nearest first.
+        Returns None if earlier searches do not cover enough of the area (or found nothing there), so the caller searches RapidAPI.
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+        if self.coverage(query, region, lat, lng, radius_km) < self.coverage_threshold:
+            with self._lock:
+                self._stats["uncovered"] += 1
+            return None
+
+        key, center = (normalize_query(query), (region or "").lower()), _project(lat, lng)
+        now = time.time()
+        with self._lock:
+            tree = self._get_tree()
+            candidates = tree.query(center.buffer(radius_km), predicate="intersects") if tree is not None else []
+            found = []
+            for i in candidates:
+                entry = self._businesses.get(self._tree_ids[i])
+                if entry and key in entry["queries"] and now - entry["fetched_at"] <= self.ttl:
+                    found.append((entry["point"].distance(center), entry["business"]))
+            if not found:
+                self._stats["empty"] += 1
+                return None
+            self._stats["hits"] += 1
+        found.sort(key=lambda item: item[0])
+        return [business for _, business in found[:limit]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["lookups"]
+            return {
+                "businesses": len(self._businesses),
+                "covered_areas": sum(len(circles) for circles in self._coverage.values()),
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+business_index = BusinessIndex(SPATIAL_INDEX_TTL, SPATIAL_INDEX_MAX_BUSINESSES, SPATIAL_COVERAGE_THRESHOLD)
+
+def spatial_index_stats() -> dict:
+    """Size and hit statistics for the shared business index."""
+    return business_index.stats()
@@ -1,10 +1,11 @@
 from google.adk.tools.tool_context import ToolContext
 from .utils import recommended_GNN_connection, recommended_WEB_connection, generate_email_templates, extract_business_type
-import logging
+from ...logging_utils import payload
+import logging, asyncio
 
 logger = logging.getLogger(__name__)
 
-def recommended_connection(tool_context: ToolContext):
+async def recommended_connection(tool_context: ToolContext):
     """
     Recommend connections based on user profile and location.
     """
@@ -12,10 +13,8 @@ def recommended_connection(tool_context: ToolContext):
         state = tool_context.state
         connect_agent_state = state.get("ConnectAgent", {})
 
-        logger.debug(f"Tool_context.state type: {state}")
-        logger.debug(f"Tool_context.state: {state}")
-        logger.debug(f"connection_type value: '{state.get('connection_type')}'")
-        logger.debug(f"connection_type in state: {'connection_type' in state}")
+        logger.debug("Tool_context.state: %s", payload(state))
+        logger.debug("connection_type value: '%s'", state.get('connection_type'))
 
         required_keys = ["user_id", "region", "lat", "lng", "Generated_Profile", "connection_type"]
         missing = [k for k in required_keys if state.get(k) is None]
@@ -37,7 +36,8 @@ def recommended_connection(tool_context: ToolContext):
         if "ConnectAgent" not in state:
             state["ConnectAgent"] = {}
 
-        GNN_CALL = recommended_GNN_connection(attributes)
+        # Blocking HTTP call, run off the event loop
+        GNN_CALL = await asyncio.to_thread(recommended_GNN_connection, attributes)
         if GNN_CALL is not None:
             result_type = "Existing TIA Users"
             result = GNN_CALL
@@ -46,7 +46,7 @@ def recommended_connection(tool_context: ToolContext):
             user_ids = [rec["recommendation"]["user"]["id"] for rec in GNN_CALL]
             connect_agent_state["existing_users"] = user_ids
         else:
-            WEB_CALL = recommended_WEB_connection(attributes)
+            WEB_CALL = await recommended_WEB_connection(attributes)
             if WEB_CALL is not None:
                 result_type = "Web Search"
                 result = WEB_CALL
@@ -64,7 +64,7 @@ def recommended_connection(tool_context: ToolContext):
         logger.error(f"Error in recommended_connection: {e}")
         return {"status": "error", "message": str(e)}
 
-def generate_email(business_numbers: list[int], tool_context: ToolContext):
+async def generate_email(business_numbers: list[int], tool_context: ToolContext):
     """
     Generate email templates for the specified businesses by number.
     Pulls the connection_result from the state and filters to the provided business_numbers.
@@ -78,7 +78,7 @@ def generate_email(business_numbers: list[int], tool_context: ToolContext):
         connect_agent_state = state.get("ConnectAgent", {})
         connection_result = connect_agent_state.get("connection_result")
         result_type = connect_agent_state.get("connection_type")
-        logger.debug(f"Connection result for email generation: {connection_result}")
+        logger.debug("Connection result for email generation: %s", payload(connection_result))
         
         # Filter to the specified business numbers
         filtered_businesses = []
@@ -92,7 +92,7 @@ def generate_email(business_numbers: list[int], tool_context: ToolContext):
         if not filtered_businesses:
             return {"status": "error", "message": "No valid businesses found for the provided numbers."}
         
-        logger.debug(f"Filtered businesses for email generation: {filtered_businesses}")
+        logger.debug("Filtered businesses for email generation: %s", payload(filtered_businesses))
         # Get user details for email personalization
         try:
             generated_profile = state.get("Generated_Profile", {})
@@ -105,11 +105,10 @@ def generate_email(business_numbers: list[int], tool_context: ToolContext):
             raise e
 
         # Generate email templates using the new function
-        logger.debug(f"User details - Name: {user_name}, Job: {user_job}, Email: {user_email}, Business: {business_name}")
-        logger.debug(f"Number of businesses to generate emails for: {len(filtered_businesses)}")
-        logger.debug(f"Filtered businesses: {filtered_businesses}")
+        logger.debug("User details - Name: %s, Job: %s, Email: %s, Business: %s", user_name, user_job, user_email, business_name)
+        logger.debug("Number of businesses to generate emails for: %d", len(filtered_businesses))
         logger.debug("Generating email templates...")
-        email_templates = generate_email_templates(result_type, filtered_businesses, user_name, user_job, user_email, business_name)
+        email_templates = await generate_email_templates(result_type, filtered_businesses, user_name, user_job, user_email, business_name)
         if not email_templates:
             return {"status": "error", "message": "Failed to generate email templates."}
         
@@ -119,7 +118,7 @@ def generate_email(business_numbers: list[int], tool_context: ToolContext):
         logger.error(f"Error in generate_email: {e}")
         return {"status": "error", "message": str(e), "chat_state": "exit"}
 
-def store_connect_chat(tool_context: ToolContext):
+async def store_connect_chat(tool_context: ToolContext):
     """Store the generated connection chat state"""
     try:
         logger.debug("Storing ConnectAgent chat state")
@@ -128,7 +127,7 @@ def store_connect_chat(tool_context: ToolContext):
         
         # Extract business type from the profile
         profile = state.get("Generated_Profile", {})
-        business_type = extract_business_type(profile)
+        business_type = await extract_business_type(profile)
         connect_agent_state["business_type"] = business_type
         state["ConnectAgent"] = connect_agent_state
         
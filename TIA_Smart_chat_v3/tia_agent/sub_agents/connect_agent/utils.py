@@ -1,68 +1,44 @@
 from typing import Dict, Any
 from dotenv import load_dotenv
-from urllib.parse import urlencode
-from ...config import RAPIDAPI_HOST, RAPIDAPI_KEY
+from ...config import EMAIL_GENERATION_CONCURRENCY, EMAIL_GENERATION_TIMEOUT, SPATIAL_SEARCH_RADIUS_KM
 from .prompts import CONNECT_GENERATION_PROMPT
-from ..DynamicChatAssistant import generate_response
-import os, requests, json, http.client, logging
+from ..DynamicChatAssistant import agenerate_response
+from ...logging_utils import payload
+from .gnn_client import get_gnn_client
+from .rapidapi_client import get_business_search_client
+from .spatial_index import business_index
+import json, logging, asyncio
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-def extract_business_type(conversation_history):
+async def extract_business_type(conversation_history):
     """Extract business_type from conversation history using LLM."""
-    logger.debug(f"Conversation history for business_type extraction: {conversation_history}")
+    logger.debug("Conversation history for business_type extraction: %s", payload(conversation_history))
     
     business_type_prompt = f"""
     Analyze the following conversation history and determine the most appropriate business_type for the user.
     Business_type should be a short phrase of 2-3 words max (e.g., "AI Consulting", "Tech Automation").
     Keep it under 50 characters.
+    Output only the business_type as a string.
 
     Conversation:
     {conversation_history}
-
-    Output only the business_type as a string.
     """
     input_messages = [
         {"role": "system", "content": "You are an assistant that extracts short business types from conversations."},
         {"role": "user", "content": business_type_prompt}
     ]
     
-    business_type = generate_response(input_messages)
+    business_type = await agenerate_response(input_messages, cache=True)
     
     return business_type
     
 def search_businesses_in_area(business_type: str, limit: int, region: str, zoom: int, lat: float, lng: float, language: str = "en",) -> dict:
-    params = {
-        "query": business_type,
-        "lat": f"{lat:.6f}",
-        "lng": f"{lng:.6f}",
-        "limit": str(limit),
-        "language": language,
-        "region": region,
-        "zoom": zoom,
-        "extract_emails_and_contacts": str(True).lower(),
-    }
-
-    headers = {
-        "x-rapidapi-host": RAPIDAPI_HOST,
-        "x-rapidapi-key": RAPIDAPI_KEY,
-    }
+    return get_business_search_client().search(business_type, limit, region, zoom, lat, lng, language)
 
-    conn = http.client.HTTPSConnection(RAPIDAPI_HOST, timeout=30)
-    try:
-        path = f"/search-in-area?{urlencode(params)}"
-        conn.request("GET", path, headers=headers)
-        res = conn.getresponse()
-        body = res.read()
-        if res.status != 200:
-            raise RuntimeError(f"HTTP {res.status}: {body.decode('utf-8', 'ignore')}")
-        return json.loads(body)
-    finally:
-        conn.close()
-
-def recommended_WEB_connection(attributes: Dict[str, Any]) -> dict:
+async def recommended_WEB_connection(attributes: Dict[str, Any]) -> dict:
     """
     Fallback: Generates a query based on connection_type-specific attributes, then searches RapidAPI.
     """
@@ -96,12 +72,22 @@ def recommended_WEB_connection(attributes: Dict[str, Any]) -> dict:
         {"role": "system", "content": "You are an assistant that generates concise business search queries for local business data APIs."},
         {"role": "user", "content": f"Connection Type: {connection_type}\nSelected Attributes: {json.dumps(selected_attributes)}\nGenerate a 1-5 word search query that best fits this for finding relevant businesses."}
     ]
-    query = generate_response(message)
+    query = await agenerate_response(message, cache=True)
+
+    logger.debug("Generated query for %s: %s", connection_type, query)
 
-    logger.debug(f"Generated query for {connection_type}: {query}")
+    # Businesses found by earlier searches for the same query, if they cover enough of this area
+    nearby = business_index.lookup(query, region, lat, lng, SPATIAL_SEARCH_RADIUS_KM, limit)
+    if nearby is not None:
+        logger.debug("Serving %d indexed businesses for '%s' near %s, %s", len(nearby), query, lat, lng)
+        return nearby
 
     try:
-        results = search_businesses_in_area(query, limit, region, zoom, lat, lng)
+        # Blocking HTTP call, run off the event loop
+        results = await asyncio.to_thread(search_businesses_in_area, query, limit, region, zoom, lat, lng)
+        # Coverage is centred where the (possibly cached) search was made, not on this user
+        search_lat, search_lng = results.get("search_point", (lat, lng))
+        business_index.add(query, region, search_lat, search_lng, SPATIAL_SEARCH_RADIUS_KM, results["data"], limit)
         return results["data"]
     except Exception as e:
         logger.error(f"Error in recommended_WEB_connection for {connection_type}: {e}")
@@ -118,150 +104,95 @@ def recommended_GNN_connection(attributes: Dict[str, Any]):
         logger.error("Error: user_id not found in attributes")
         return None
 
-    # API base URL
-    api_base_url = os.getenv("GNN_API_BASE_URL")
-    
-    # Different endpoints for each connection type
-    endpoints = {
-        "complementary": f"{api_base_url}/user/{user_id}/complementary-partners",
-        "alliance": f"{api_base_url}/user/{user_id}/alliance-partners",
-        "mastermind": f"{api_base_url}/user/{user_id}/mastermind-partners",
-        "intelligent": f"{api_base_url}/user/{user_id}/intelligent-partners",
+    return get_gnn_client().get_partners(user_id, connection_type)
+
+def _extract_business_details(result_type, business):
+    """Extract the email prompt fields for a business from a GNN or web search result."""
+    if result_type == "Existing TIA Users":
+        user_data = business.get("recommendation", {}).get("user", {})
+        return {
+            "name": user_data.get("business", "Unknown"),
+            "about_summary": user_data.get("description", "Unknown"),
+            "email": "Unknown",
+            "address": "Unknown",
+            "website": "Unknown",
+            "phone": "Unknown",
+            "rating": "Unknown",
+            "review_count": "Unknown",
+            "business_type": user_data.get("type", "Unknown"),
+            "opening_status": "Unknown",
+        }
+    return {
+        "name": business.get("name", "Unknown"),
+        "about_summary": business.get("about", "Unknown"),
+        "email": business.get("emails_and_contacts", "Unknown"),
+        "address": business.get("full_address", "Unknown"),
+        "website": business.get("website", "Unknown"),
+        "phone": business.get("phone_number", "Unknown"),
+        "rating": business.get("rating", "Unknown"),
+        "review_count": business.get("review_count", "Unknown"),
+        "business_type": business.get("type", "Unknown"),
+        "opening_status": business.get("opening_status", "Unknown"),
     }
-    
-    url = endpoints.get(connection_type)
-    
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
 
-        # TESTING MOCK RESPONSE
-        # response = [
-        #     {
-        #         "recommendation": {
-        #             "user": {
-        #                 "id": 101,
-        #                 "name": "Sarah Chen",
-        #                 "business": "Digital Marketing Pro",
-        #                 "type": "Marketing Agency",
-        #                 "category": "Digital Marketing",
-        #                 "description": "Specializes in social media and online advertising campaigns"
-        #             }
-        #         },
-        #         "reason": "COMPLEMENTARY PARTNER: Perfect for mutual client referrals. You can recommend their digital marketing services to your clients while they refer web development projects to you. Everyone wins—your clients save time, your partner gains business, and you earn referral margins.",
-        #     },
-        #     {
-        #         "recommendation": {
-        #             "user": {
-        #                 "id": 102,
-        #                 "name": "Mike Rodriguez",
-        #                 "business": "WebFlow Masters",
-        #                 "type": "Web Development",
-        #                 "category": "Website Development",
-        #                 "description": "Creates high-converting landing pages and business websites"
-        #             }
-        #         },
-        #         "reason": "COMPLEMENTARY PARTNER: Ideal for cross-promotion. Their web development expertise complements your services. Share clients who need both your offerings—increasing client satisfaction and creating new revenue streams for both businesses.",
-        #     },
-        #     {
-        #         "recommendation": {
-        #             "user": {
-        #                 "id": 103,
-        #                 "name": "Jessica Wong",
-        #                 "business": "Content Creators Co",
-        #                 "type": "Content Creation",
-        #                 "category": "Content Marketing",
-        #                 "description": "Produces engaging blog content and video marketing materials"
-        #             }
-        #         },
-        #         "reason": "COMPLEMENTARY PARTNER: Strong alignment for bundled services. Combine your offerings with their content creation to provide complete solutions. Refer clients to each other for comprehensive service packages.",
-        #     }
-        # ]
-        response_data = response.json()
-        logger.debug(f"GNN partners response: {response_data}")
-        if response_data["partners"] == []:
-            return None
-        return response_data["partners"] 
+async def _generate_business_email(semaphore, details, user_name, user_job, user_email, business_name, timeout=EMAIL_GENERATION_TIMEOUT):
+    """Generate the email template for one business. Errors and timeouts are returned as the template text."""
+    name = details["name"]
+    try:
+        email_prompt = CONNECT_GENERATION_PROMPT.format(
+            **details,
+            user_name=user_name,
+            user_job=user_job,
+            user_email=user_email,
+            business_name=business_name
+        )
+        
+        input_messages = [
+            {"role": "system", "content": "You are an assistant that generates professional email templates for business outreach."},
+            {"role": "user", "content": email_prompt}
+        ]
+        async with semaphore:
+            try:
+                email_output = await asyncio.wait_for(agenerate_response(input_messages), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"email generation timed out after {timeout}s")
+        
+        email_output += "\n<GENERATION_BREAK>"
+        
+        return {
+            "business_name": name,
+            "email": details["email"],
+            "phone": details["phone"],
+            "rating": details["rating"],
+            "review_count": details["review_count"],
+            "business_type": details["business_type"],
+            "template": email_output
+        }
     except Exception as e:
-        logger.error(f"Error connecting to GNN partners API: {e}")
-        return None
-    
-def generate_email_templates(result_type, businesses, user_name, user_job, user_email, business_name):
-    """Generate email templates for a list of businesses."""
-    email_templates = []
+        logger.error(f"Error generating email for {name}: {e}")
+        return {
+            "business_name": name,
+            "email": details["email"],
+            "template": f"Error: {str(e)}\n<GENERATION_BREAK>"
+        }
 
-    logger.debug(f"Creating email templates for: {businesses}")
-    for business in businesses:
-        if result_type == "Existing TIA Users":
-            user_data = business.get("recommendation", {}).get("user", {})
-            name = user_data.get("business", "Unknown")
-            about_summary = user_data.get("description", "Unknown")
-            email = "Unknown"
-            address = "Unknown"
-            website = "Unknown"
-            phone = "Unknown"
-            rating = "Unknown"
-            review_count = "Unknown"
-            business_type = user_data.get("type", "Unknown")
-            opening_status = "Unknown"
-        elif result_type == "Web Search":
-            name = business.get("name", "Unknown")
-            about_summary = business.get("about", "Unknown")
-            email = business.get("emails_and_contacts", "Unknown")
-            address = business.get("full_address", "Unknown")
-            website = business.get("website", "Unknown")
-            phone = business.get("phone_number", "Unknown")
-            rating = business.get("rating", "Unknown")
-            review_count = business.get("review_count", "Unknown")
-            business_type = business.get("type", "Unknown")
-            opening_status = business.get("opening_status", "Unknown")
-        else:
-            logger.error(f"Unknown result type during generate_email_templates: {result_type}")
-            return email_templates
+async def generate_email_templates(result_type, businesses, user_name, user_job, user_email, business_name, max_concurrency=EMAIL_GENERATION_CONCURRENCY, timeout=EMAIL_GENERATION_TIMEOUT):
+    """
+    Generate email templates for a list of businesses.
+    Generations run concurrently (at most max_concurrency at once, each for at most `timeout` seconds)
+    and are returned in selection order.
+    """
+    logger.debug("Creating email templates for: %s", payload(businesses))
+    if result_type not in ("Existing TIA Users", "Web Search"):
+        logger.error(f"Unknown result type during generate_email_templates: {result_type}")
+        return []
 
-        logger.debug(f"Extracted for {name}: email={email}, address={address}, website={website}, phone={phone}, rating={rating}, review_count={review_count}, business_type={business_type}, opening_status={opening_status}, about_summary={about_summary}")
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    generations = []
+    for business in businesses:
+        details = _extract_business_details(result_type, business)
+        logger.debug("Extracted for %s: %s", details['name'], payload(details))
+        generations.append(_generate_business_email(semaphore, details, user_name, user_job, user_email, business_name, timeout))
 
-        try:
-            email_prompt = CONNECT_GENERATION_PROMPT.format(
-                name=name,
-                email=email,
-                address=address,
-                website=website,
-                phone=phone,
-                rating=rating,
-                review_count=review_count,
-                business_type=business_type,
-                opening_status=opening_status,
-                about_summary=about_summary,
-                user_name=user_name,
-                user_job=user_job,
-                user_email=user_email,
-                business_name=business_name
-            )
-            
-            input_messages = [
-                {"role": "system", "content": "You are an assistant that generates professional email templates for business outreach."},
-                {"role": "user", "content": email_prompt}
-            ]
-            email_output = generate_response(input_messages)
-            
-            email_output += "\n<GENERATION_BREAK>"
-            
-            email_templates.append({
-                "business_name": name,
-                "email": email,
-                "phone": phone,
-                "rating": rating,
-                "review_count": review_count,
-                "business_type": business_type,
-                "template": email_output
-            })
-        except Exception as e:
-            logger.error(f"Error generating email for {name}: {e}")
-            email_templates.append({
-                "business_name": name,
-                "email": email,
-                "template": f"Error: {str(e)}\n<GENERATION_BREAK>"
-            })
-    
-    return email_templates
\ No newline at end of file
+    # Each generation handles its own errors, so one failing business does not affect the others
+    return list(await asyncio.gather(*generations))
@@ -1,7 +1,7 @@
 from google.adk.tools import ToolContext
 from .utils import model_update_user_details
-from ...shared_state import get_or_create_assistant, cleanup_session
-import logging
+from ...shared_state import get_or_create_assistant, cleanup_session, clear_assistant_state
+import logging, asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -16,11 +16,12 @@ def collect_user_history(tool_context: ToolContext):
         
         # Retrieve the DynamicChatAssistant instance's history
         if session_id:
-            assistant = get_or_create_assistant(session_id, user_id, "profiler:VisionAgent")
+            assistant = get_or_create_assistant(session_id, user_id, "profiler:VisionAgent", state)
             logger.debug("Found assistant: %s", assistant)
             if assistant and assistant.user_responses:
                 logger.debug("Found user history: %s", assistant.user_responses)
                 cleanup_session(session_id)  # Clean up after retrieving history
+                clear_assistant_state(state)
                 return {"status": "success", "user_history": assistant.user_responses}
         
         return {"status": "error", "message": "No conversation history found in session."}
@@ -28,7 +29,7 @@ def collect_user_history(tool_context: ToolContext):
         logger.error(f"Error in collect_user_history: {e}")
         return {"status": "error", "message": str(e)}
 
-def store_user_profile(tool_context: ToolContext):
+async def store_user_profile(tool_context: ToolContext):
     """Store the generated user profile"""
     try:
         state = tool_context.state
@@ -47,7 +48,9 @@ def store_user_profile(tool_context: ToolContext):
 
 
         logger.debug("RUNNING model_update_user_details")
-        if not model_update_user_details(
+        # Blocking pymysql writes (and pool waits) run in a thread so they do not stall the event loop
+        if not await asyncio.to_thread(
+            model_update_user_details,
             user_id,
             user_role,
             user_strengths,
@@ -1,97 +1,132 @@
-import pymysql, os, logging
+from ...db import get_connection
+from ...cache import StatsTTLCache
+from ...config import LOOKUP_CACHE_TTL, LOOKUP_CACHE_SIZE
+from ...utils import invalidate_user_profile
+import logging
 
 logger = logging.getLogger(__name__)
 
 business_phase_name = "TIA Agent Chatting"
 
-def ensure_business_type_and_categories(cursor, business_type: str, business_category: str, skill_category: str, strength_category: str):
+# Name -> id cache for the lookup tables every profile save resolves. These vocabularies rarely change.
+LOOKUP_TABLES = ("business_types", "business_categories", "skill_categories", "strength_categories", "business_phases", "business_roles")
+lookup_cache = StatsTTLCache("lookup_ids", maxsize=LOOKUP_CACHE_SIZE, ttl=LOOKUP_CACHE_TTL)
+
+def warm_lookup_cache() -> int:
+    """Load every lookup table into the id cache. Returns the number of names cached."""
+    count = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for table in LOOKUP_TABLES:
+            cursor.execute(f"SELECT id, name FROM {table}")
+            for row_id, name in cursor.fetchall():
+                lookup_cache.set((table, name.casefold()), row_id)
+                count += 1
+        cursor.close()
+    return count
+
+def remember_lookup_ids(pending: dict):
+    """Cache ids inserted by a transaction once it has committed."""
+    for key, row_id in pending.items():
+        lookup_cache.set(key, row_id)
+
+def _ensure_id(cursor, table: str, name: str, pending: dict = None, extra: dict = None) -> int:
+    """
+    Return the id for name in a lookup table, inserting the row if it is missing.
+    Ids inserted here are only added to `pending`, the caller caches them after commit so a rollback
+    never leaves an id in the cache that does not exist.
+    """
+    key = (table, name.casefold())
+    cached = lookup_cache.get(key)
+    if cached is not None:
+        return cached
+
+    cursor.execute(f"SELECT id FROM {table} WHERE name=%s", (name,))
+    result = cursor.fetchone()
+    if result:
+        lookup_cache.set(key, result[0])
+        return result[0]
+
+    values = {"name": name, **(extra or {})}
+    # If a concurrent save inserts the same name first, the unique key on name hands back the existing id
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(values)}) VALUES ({_placeholders(len(values))}) "
+        "ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id)",
+        tuple(values.values())
+    )
+    row_id = cursor.lastrowid
+    if pending is not None:
+        pending[key] = row_id
+    return row_id
+
+def ensure_business_type_and_categories(cursor, business_type: str, business_category: str, skill_category: str, strength_category: str, pending: dict = None):
     """Ensure business type, skill category, and strength category exist. Returns IDs or raises exception."""
     try:
         logger.debug("Ensuring business type and categories for: %s", business_type)
-        
-        # Ensure business type exists
-        cursor.execute("SELECT id FROM business_types WHERE name=%s", (business_type,))
-        result = cursor.fetchone()
-        if result:
-            business_type_id = result[0]
-        else:
-            cursor.execute("INSERT INTO business_types (name) VALUES (%s)", (business_type,))
-            business_type_id = cursor.lastrowid
-
-        # Ensure business category exists
-        cursor.execute("SELECT id FROM business_categories WHERE name=%s", (business_category,))
-        result = cursor.fetchone()
-        if result:
-            business_category_id = result[0]
-        else:
-            cursor.execute("INSERT INTO business_categories (name) VALUES (%s)", (business_category,))
-            business_category_id = cursor.lastrowid
-        
-        # Ensure skill category exists (fixed column name to business_type_id)
-        cursor.execute("SELECT id FROM skill_categories WHERE name=%s", (skill_category,))
-        result = cursor.fetchone()
-        if result:
-            skill_category_id = result[0]
-        else:
-            cursor.execute(
-                "INSERT INTO skill_categories (name, business_type_id) VALUES (%s, %s)", 
-                (skill_category, business_type_id)
-            )
-            skill_category_id = cursor.lastrowid
-        
-        # Ensure strength category exists
-        cursor.execute("SELECT id FROM strength_categories WHERE name=%s", (strength_category,))
-        result = cursor.fetchone()
-        if result:
-            strength_category_id = result[0]
-        else:
-            cursor.execute("INSERT INTO strength_categories (name) VALUES (%s)", (strength_category,))
-            strength_category_id = cursor.lastrowid
-        
+        business_type_id = _ensure_id(cursor, "business_types", business_type, pending)
+        business_category_id = _ensure_id(cursor, "business_categories", business_category, pending)
+        skill_category_id = _ensure_id(cursor, "skill_categories", skill_category, pending, {"business_type_id": business_type_id})
+        strength_category_id = _ensure_id(cursor, "strength_categories", strength_category, pending)
         return business_category_id, business_type_id, skill_category_id, strength_category_id
     except Exception as e:
         logger.error("ERROR in ensure_business_type_and_categories: %s", e)
         raise e
 
-def ensure_business_phase_and_role(cursor, user_role: str):
+def ensure_business_phase_and_role(cursor, user_role: str, pending: dict = None):
     """Ensure business phase and role exist. Returns IDs or raises exception."""
     try:
         logger.debug("Ensuring business phase and role for user: %s", user_role)
-        
-        # Ensure business phase exists
-        cursor.execute("SELECT id FROM business_phases WHERE name=%s", ("TIA Agent Chatting",))
-        result = cursor.fetchone()
-        if result:
-            business_phase_id = result[0]
-        else:
-            cursor.execute("INSERT INTO business_phases (name) VALUES (%s)", (business_phase_name,))
-            business_phase_id = cursor.lastrowid
-        
-        # Ensure business role exists
-        cursor.execute("SELECT id FROM business_roles WHERE name=%s", (user_role,))
-        result = cursor.fetchone()
-        if result:
-            business_role_id = result[0]
-        else:
-            cursor.execute("INSERT INTO business_roles (name) VALUES (%s)", (user_role,))
-            business_role_id = cursor.lastrowid
-        
+        business_phase_id = _ensure_id(cursor, "business_phases", business_phase_name, pending)
+        business_role_id = _ensure_id(cursor, "business_roles", user_role, pending)
         return business_phase_id, business_role_id
     except Exception as e:
         logger.error("ERROR in ensure_business_phase_and_role: %s", e)
         raise e
 
+def _placeholders(count: int, columns: int = 1) -> str:
+    """Build the VALUES / IN placeholder list for a multi-row statement."""
+    row = "%s" if columns == 1 else "(" + ", ".join(["%s"] * columns) + ")"
+    return ", ".join([row] * count)
+
+def _select_ids_by_name(cursor, table: str, names: list) -> dict:
+    """Resolve ids for names in one IN (...) query. Returns {name: id} for the names that exist."""
+    if not names:
+        return {}
+    cursor.execute(f"SELECT id, name FROM {table} WHERE name IN ({_placeholders(len(names))})", tuple(names))
+    # Match the way MySQL compared the names (case insensitive) rather than byte for byte
+    found = {name.casefold(): row_id for row_id, name in cursor.fetchall()}
+    ids = {}
+    for name in names:
+        if name.casefold() in found:
+            ids[name] = found[name.casefold()]
+        else:
+            # Collations can match names that casefold does not (e.g. accents), fall back to a single lookup
+            cursor.execute(f"SELECT id FROM {table} WHERE name=%s", (name,))
+            result = cursor.fetchone()
+            if result:
+                ids[name] = result[0]
+    return ids
+
+def _insert_links(cursor, table: str, column: str, user_id: int, ids: list):
+    """Link the user to every id with one multi-row INSERT IGNORE."""
+    unique_ids = list(dict.fromkeys(ids))
+    if not unique_ids:
+        return
+    params = [value for link_id in unique_ids for value in (user_id, link_id)]
+    cursor.execute(f"INSERT IGNORE INTO {table} (user_id, {column}) VALUES {_placeholders(len(unique_ids), 2)}", params)
+
 def insert_user_skills(cursor, user_id: int, user_skills: list, skill_category_id: int):
     """Insert user skills. Returns list of skill_ids."""
-    skill_ids = []
     try:
         logger.debug("Inserting user skills: %s", user_skills)
-        for skill in user_skills:
-            cursor.execute("INSERT IGNORE INTO skills (name, category_id) VALUES (%s, %s)", (skill, skill_category_id))
-            cursor.execute("SELECT id FROM skills WHERE name=%s", (skill,))
-            skill_id = cursor.fetchone()[0]
-            cursor.execute("INSERT IGNORE INTO user_skills (user_id, skill_id) VALUES (%s, %s)", (user_id, skill_id))
-            skill_ids.append(skill_id)
+        names = list(dict.fromkeys(user_skills))
+        if not names:
+            return []
+        params = [value for skill in names for value in (skill, skill_category_id)]
+        cursor.execute(f"INSERT IGNORE INTO skills (name, category_id) VALUES {_placeholders(len(names), 2)}", params)
+        ids = _select_ids_by_name(cursor, "skills", names)
+        skill_ids = [ids[skill] for skill in user_skills]
+        _insert_links(cursor, "user_skills", "skill_id", user_id, skill_ids)
     except Exception as e:
         logger.error("ERROR in insert_user_skills: %s", e)
         raise e
@@ -99,40 +134,49 @@ def insert_user_skills(cursor, user_id: int, user_skills: list, skill_category_i
 
 def insert_user_strengths(cursor, user_id: int, user_strengths: list, strength_category_id: int):
     """Insert user strengths. Returns list of strength_ids."""
-    strength_ids = []
     try:
-        logger.debug("Inserting user strengths:", user_strengths)
-        for strength in user_strengths:
-            cursor.execute("INSERT INTO strengths (name, category_id) VALUES (%s, %s) ON DUPLICATE KEY UPDATE name=name", (strength, strength_category_id))
-            cursor.execute("SELECT id FROM strengths WHERE name=%s", (strength,))
-            strength_id = cursor.fetchone()[0]
-            cursor.execute("INSERT IGNORE INTO user_strengths (user_id, strength_id) VALUES (%s, %s)", (user_id, strength_id))
-            strength_ids.append(strength_id)
+        logger.debug("Inserting user strengths: %s", user_strengths)
+        names = list(dict.fromkeys(user_strengths))
+        if not names:
+            return []
+        params = [value for strength in names for value in (strength, strength_category_id)]
+        cursor.execute(f"INSERT INTO strengths (name, category_id) VALUES {_placeholders(len(names), 2)} ON DUPLICATE KEY UPDATE name=name", params)
+        ids = _select_ids_by_name(cursor, "strengths", names)
+        strength_ids = [ids[strength] for strength in user_strengths]
+        _insert_links(cursor, "user_strengths", "strength_id", user_id, strength_ids)
     except Exception as e:
-        logger.debug("ERROR in insert_user_strengths:", e)
+        logger.error("ERROR in insert_user_strengths: %s", e)
         raise e
     return strength_ids
 
 def insert_business_strengths(cursor, user_id: int, business_strengths: list, business_role_id: int, business_phase_id: int):
     """Insert business strengths. Returns list of business_strength_ids."""
-    business_strength_ids = []
     try:
         logger.debug("Inserting business strengths: %s", business_strengths)
-        for b_strength in business_strengths:
-            cursor.execute("SELECT id FROM business_strengths WHERE name=%s", (b_strength,))
-            result = cursor.fetchone()
-            if result:
-                business_strength_id = result[0]
-            else:
-                cursor.execute(
-                    "INSERT INTO business_strengths (name, business_role_id, business_phase_id) VALUES (%s, %s, %s)",
-                    (b_strength, business_role_id, business_phase_id)
-                )
-                business_strength_id = cursor.lastrowid
-            cursor.execute("INSERT IGNORE INTO user_business_strengths (user_id, business_strength_id) VALUES (%s, %s)", (user_id, business_strength_id))
-            business_strength_ids.append(business_strength_id)
+        names = list(dict.fromkeys(business_strengths))
+        if not names:
+            return []
+
+        # Only insert the names that do not exist yet, existing rows keep their role and phase
+        ids = _select_ids_by_name(cursor, "business_strengths", names)
+        missing = [b_strength for b_strength in names if b_strength not in ids]
+        if missing:
+            # Names differing only by case are one row, as with the previous lookup by name
+            new_names = []
+            for b_strength in missing:
+                if all(b_strength.casefold() != name.casefold() for name in new_names):
+                    new_names.append(b_strength)
+            params = [value for b_strength in new_names for value in (b_strength, business_role_id, business_phase_id)]
+            cursor.execute(
+                f"INSERT INTO business_strengths (name, business_role_id, business_phase_id) VALUES {_placeholders(len(new_names), 3)}",
+                params
+            )
+            ids.update(_select_ids_by_name(cursor, "business_strengths", missing))
+
+        business_strength_ids = [ids[b_strength] for b_strength in business_strengths]
+        _insert_links(cursor, "user_business_strengths", "business_strength_id", user_id, business_strength_ids)
     except Exception as e:
-        logger.debug("ERROR in insert_business_strengths: %s", e)
+        logger.error("ERROR in insert_business_strengths: %s", e)
         raise e
     return business_strength_ids
     
@@ -163,40 +207,37 @@ def model_update_user_details(user_id: int,
                               skill_category: str, 
                               strength_category: str):
     try:
-        # Connect to DB
-        conn = pymysql.connect(
-            host=os.environ["DB_HOST"],
-            user=os.environ["DB_USER"],
-            password=os.environ["DB_PASS"],
-            database=os.environ["DB_NAME"],
-            port=int(os.environ.get("DB_PORT"))
-        )
-        logger.debug(f"Connected {user_id} to Database for updating user details")
-        cursor = conn.cursor()
+        with get_connection() as conn:
+            logger.debug("Checked out DB connection for %s for updating user details", user_id)
+            cursor = conn.cursor()
+            new_lookup_ids = {}
 
-        # Ensure business type and categories
-        business_category_id, business_type_id, skill_category_id, strength_category_id = ensure_business_type_and_categories(cursor, business_type, business_category, skill_category, strength_category)
-        
-        # Ensure business phase and role
-        business_phase_id, business_role_id = ensure_business_phase_and_role(cursor, user_role)
-        
-        # Insert user skills
-        insert_user_skills(cursor, user_id, user_skills, skill_category_id)
-        
-        # Insert user strengths
-        insert_user_strengths(cursor, user_id, user_strengths, strength_category_id)
-        
-        # Insert business strengths
-        insert_business_strengths(cursor, user_id, business_strengths, business_role_id, business_phase_id)
-
-        # Update Business table
-        if not update_business_info(cursor, user_id, business_type_id, business_category_id, business_phase_id):
-            raise Exception("Failed to update business info")
-
-        conn.commit()
-        logger.debug("DB commit successful")
-        cursor.close()
-        conn.close()
+            # Ensure business type and categories
+            business_category_id, business_type_id, skill_category_id, strength_category_id = ensure_business_type_and_categories(cursor, business_type, business_category, skill_category, strength_category, new_lookup_ids)
+            
+            # Ensure business phase and role
+            business_phase_id, business_role_id = ensure_business_phase_and_role(cursor, user_role, new_lookup_ids)
+            
+            # Insert user skills
+            insert_user_skills(cursor, user_id, user_skills, skill_category_id)
+            
+            # Insert user strengths
+            insert_user_strengths(cursor, user_id, user_strengths, strength_category_id)
+            
+            # Insert business strengths
+            insert_business_strengths(cursor, user_id, business_strengths, business_role_id, business_phase_id)
+
+            # Update Business table
+            if not update_business_info(cursor, user_id, business_type_id, business_category_id, business_phase_id):
+                raise Exception("Failed to update business info")
+
+            conn.commit()
+            logger.debug("DB commit successful")
+            cursor.close()
+        remember_lookup_ids(new_lookup_ids)
+
+        # Never serve the pre-save profile from the cache
+        invalidate_user_profile(user_id)
 
         return True
     except Exception as e:
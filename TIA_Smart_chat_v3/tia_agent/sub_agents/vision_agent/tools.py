@@ -3,13 +3,13 @@ from typing import Dict, Any
 from dotenv import load_dotenv
 from .utils import generate_content_blog, generate_content_messaging, generate_content_why_statement
 from ...shared_state import get_or_create_assistant
-import logging
+import asyncio, logging
 
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-def generate_blog(tool_context: ToolContext) -> dict:
+async def generate_blog(tool_context: ToolContext) -> dict:
     """
     Generate all blog content using the three separate prompts.
     """
@@ -26,7 +26,7 @@ def generate_blog(tool_context: ToolContext) -> dict:
         if vision_state.get("chat_state") == "chat": # If Generated_Profile is not fully populated, pull from VisionAgent session
             logger.debug("Generating blog with session_id: %s", session_id)
             user_id = state.get("user_id")
-            assistant = get_or_create_assistant(session_id, user_id, "profiler:VisionAgent")
+            assistant = get_or_create_assistant(session_id, user_id, "profiler:VisionAgent", state)
 
             collected_context += "\n\nUser Chat Details:\n" + "\n".join([
                 f"Phase {resp['phase']}: {resp['message']}"
@@ -41,22 +41,24 @@ def generate_blog(tool_context: ToolContext) -> dict:
 
         # Generate the blog content
         logger.debug("Collected context for blog generation:\n %s", collected_context)
+        # The sections only depend on collected_context, so generate them concurrently
+        sections = [
+            ("WHY STATEMENT", "Why Statement", generate_content_why_statement),
+            ("MESSAGING", "Messaging", generate_content_messaging),
+            ("CONTENT", "Content", generate_content_blog),
+        ]
+        outputs = await asyncio.gather(
+            *[generate(collected_context) for _, _, generate in sections],
+            return_exceptions=True
+        )
+
+        # Assemble in the fixed section order
         results = []
-        try:
-            why_statement = generate_content_why_statement(collected_context)
-            results.append("\n\n---\n\n## WHY STATEMENT\n\n---\n\n" + why_statement + "\n\n\n\n")
-        except Exception as e:
-            results.append(f"\n\n**Error generating Why Statement:** {e}\n\n\n\n")
-        try:
-            messaging = generate_content_messaging(collected_context)
-            results.append("\n\n---\n\n## MESSAGING\n\n---\n\n" + messaging + "\n\n\n\n")
-        except Exception as e:
-            results.append(f"\n\n**Error generating Messaging:** {e}\n\n\n\n")
-        try:
-            content = generate_content_blog(collected_context)
-            results.append("\n\n---\n\n## CONTENT\n\n---\n\n" + content + "\n\n\n\n")
-        except Exception as e:
-            results.append(f"\n\n**Error generating Content:** {e}\n\n\n\n")
+        for (heading, label, _), output in zip(sections, outputs):
+            if isinstance(output, Exception):
+                results.append(f"\n\n**Error generating {label}:** {output}\n\n\n\n")
+            else:
+                results.append(f"\n\n---\n\n## {heading}\n\n---\n\n" + output + "\n\n\n\n")
 
         blog_output = "\n\n\n".join(results)
         blog_output = blog_output.replace('\n', '\n\n')
@@ -0,0 +1,46 @@
+"""
+Token counting for prompt budgets, using the tiktoken encoding of CHAT_MODEL.
+tiktoken downloads its encoding files on first use; if that fails (e.g. no network) counts fall back to
+a characters-per-token estimate so budgets still apply.
+"""
+from functools import lru_cache
+from .config import CHAT_MODEL
+import tiktoken, logging
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators OpenAI adds around every chat message
+
+@lru_cache(maxsize=None)
+def _encoding():
+    model = CHAT_MODEL.split("/")[-1]
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken encoding for %s unavailable, estimating %d characters per token: %s", model, CHARS_PER_TOKEN, e)
+        return None
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages: list) -> int:
+    """Number of prompt tokens a list of chat messages takes."""
+    return sum(count_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Keep the first max_tokens tokens of text."""
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
@@ -1,6 +1,7 @@
 from google.adk.tools import ToolContext
 from .utils import load_user_profile, validate_connection_options
-import logging
+from .logging_utils import payload
+import logging, asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ def end_session(tool_context: ToolContext) -> dict:
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def check_for_existing_user(tool_context: ToolContext):
+async def check_for_existing_user(tool_context: ToolContext):
     """Check the database for existing user profile and pull data if available."""
     try:
         logger.debug("Starting check_for_existing_user")
@@ -28,9 +29,9 @@ def check_for_existing_user(tool_context: ToolContext):
         if not user_id:
             return {"status": "error", "message": "User ID not found in state."}
         
-        # Load user profile from the database
-        result = load_user_profile(user_id)
-        logger.debug(f"load_user_profile result: {result}")
+        # Load user profile from the database, off the event loop so other chats keep running while it waits
+        result = await asyncio.to_thread(load_user_profile, user_id)
+        logger.debug("load_user_profile result: %s", payload(result))
         if result.get("profile_exists"):
             state["Generated_Profile"] = result["profile"]
             state["user_profile"] = "generated"
@@ -0,0 +1,188 @@
+"""
+OpenTelemetry tracing of chat turns.
+`setup_tracing()` installs a tracer provider exporting to the console or an OTLP collector (TRACING_EXPORTER). That also
+turns on the spans ADK already creates for each invocation, agent run, LLM request and tool call. This module adds
+the rest of a turn: a span per LiteLLM completion with its token counts, per MySQL query and session database
+statement, and per outbound HTTP request. With TRACING_EXPORTER=none no provider is installed and every span is a no-op.
+"""
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from litellm.integrations.custom_logger import CustomLogger
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from .config import TRACING_EXPORTER, TRACING_SERVICE_NAME, TRACING_SAMPLE_RATIO, TRACING_CAPTURE_STATEMENTS
+from .llm_usage import _usage_value
+import litellm, requests, threading, logging, re
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("tia_smart_chat")
+
+STATEMENT_MAX_CHARS = 1000
+_OPERATION = re.compile(r"\s*(\w+)")
+
+def statement_attributes(statement, system: str) -> dict:
+    """Span attributes for a SQL statement: the operation always, the text only with TRACING_CAPTURE_STATEMENTS."""
+    if isinstance(statement, bytes):
+        statement = statement.decode("utf-8", "replace")
+    match = _OPERATION.match(statement or "")
+    attributes = {"db.system": system, "db.operation.name": match.group(1).upper() if match else ""}
+    if TRACING_CAPTURE_STATEMENTS:
+        attributes["db.query.text"] = statement[:STATEMENT_MAX_CHARS]
+    return attributes
+
+class LLMSpanLogger(CustomLogger):
+    """
+    One span per LiteLLM call (ADK agents and direct completions), opened when the request is sent, so it nests under
+    the caller's span, and closed by the success or failure callback with the model and token counts.
+    """
+    MAX_OPEN_SPANS = 1024
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._open = OrderedDict()  # litellm_call_id -> span
+
+    def log_pre_api_call(self, model, messages, kwargs):
+        call_id = kwargs.get("litellm_call_id")
+        if not call_id:
+            return
+        span = tracer.start_span(f"chat {model}", kind=SpanKind.CLIENT, attributes={
+            "gen_ai.operation.name": "chat",
+            "gen_ai.system": kwargs.get("custom_llm_provider") or "litellm",
+            "gen_ai.request.model": model,
+            "gen_ai.request.message_count": len(messages or []),
+        })
+        with self._lock:
+            previous = self._open.pop(call_id, None)
+            self._open[call_id] = span
+            # Calls that never reported back (e.g. cancelled) are closed rather than kept forever
+            while len(self._open) > self.MAX_OPEN_SPANS:
+                self._open.popitem(last=False)[1].end()
+        if previous is not None:
+            previous.end()
+
+    def _finish(self, kwargs, response_obj, failed: bool):
+        with self._lock:
+            span = self._open.pop(kwargs.get("litellm_call_id"), None)
+        if span is None:
+            return
+        try:
+            if failed:
+                exception = kwargs.get("exception")
+                span.set_status(Status(StatusCode.ERROR, str(exception) if exception else None))
+                if exception is not None:
+                    span.set_attribute("error.type", type(exception).__name__)
+            else:
+                usage = getattr(response_obj, "usage", None) or (response_obj.get("usage") if isinstance(response_obj, dict) else None)
+                if usage is not None:
+                    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+                    span.set_attribute("gen_ai.usage.input_tokens", _usage_value(usage, "prompt_tokens"))
+                    span.set_attribute("gen_ai.usage.output_tokens", _usage_value(usage, "completion_tokens"))
+                    span.set_attribute("gen_ai.usage.cached_input_tokens", _usage_value(details, "cached_tokens") if details else 0)
+                response_model = getattr(response_obj, "model", None)
+                if response_model:
+                    span.set_attribute("gen_ai.response.model", response_model)
+                span.set_attribute("litellm.cache_hit", bool(kwargs.get("cache_hit")))
+        except Exception as e:
+            logger.debug("Could not annotate LLM span: %s", e)
+        finally:
+            span.end()
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self._finish(kwargs, response_obj, failed=False)
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self._finish(kwargs, response_obj, failed=False)
+
+    def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        self._finish(kwargs, response_obj, failed=True)
+
+    async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        self._finish(kwargs, response_obj, failed=True)
+
+class TracedSession(requests.Session):
+    """requests.Session that opens a client span for every request it sends."""
+    def request(self, method, url, *args, **kwargs):
+        method = method.upper()
+        parts = urlsplit(url)
+        with tracer.start_as_current_span(f"HTTP {method}", kind=SpanKind.CLIENT, attributes={
+            "http.request.method": method,
+            "server.address": parts.hostname or "",
+            "url.path": parts.path,
+        }) as span:
+            response = super().request(method, url, *args, **kwargs)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status(Status(StatusCode.ERROR))
+            return response
+
+def instrument_engine(engine):
+    """Open a span for every statement a SQLAlchemy engine (the ADK session database) executes."""
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        attributes = statement_attributes(statement, system)
+        context._tia_span = tracer.start_span(f"{system} {attributes['db.operation.name']}", kind=SpanKind.CLIENT, attributes=attributes)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_tia_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        span = getattr(exception_context.execution_context, "_tia_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+            span.end()
+
+_provider = None
+_provider_lock = threading.Lock()
+llm_span_logger = LLMSpanLogger()
+
+def _exporter():
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if TRACING_EXPORTER == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            return OTLPSpanExporter()
+        except ImportError:
+            pass
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+            return OTLPSpanExporter()
+        except ImportError:
+            logger.warning("TRACING_EXPORTER=otlp but opentelemetry-exporter-otlp is not installed, exporting spans to the console")
+    return ConsoleSpanExporter()
+
+def setup_tracing() -> bool:
+    """Install the tracer provider and the LiteLLM span callback once per process. False if tracing is disabled."""
+    global _provider
+    if TRACING_EXPORTER in ("", "none"):
+        return False
+    with _provider_lock:
+        if _provider is None:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+            _provider = TracerProvider(
+                resource=Resource.create({"service.name": TRACING_SERVICE_NAME}),
+                sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO)),
+            )
+            _provider.add_span_processor(BatchSpanProcessor(_exporter()))
+            trace.set_tracer_provider(_provider)
+            if llm_span_logger not in litellm.callbacks:
+                litellm.callbacks.append(llm_span_logger)
+            logger.info("Tracing enabled, exporting spans to %s", TRACING_EXPORTER)
+    return True
+
+def shutdown_tracing():
+    """Flush and stop the exporter."""
+    if _provider is not None:
+        _provider.shutdown()
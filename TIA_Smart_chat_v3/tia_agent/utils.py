@@ -1,7 +1,15 @@
 
-import pymysql, logging, os
+from .db import get_connection
+from .cache import StatsTTLCache
+from .config import PROFILE_CACHE_TTL, PROFILE_CACHE_SIZE
+from .logging_utils import payload
+import logging, json, copy
 logger = logging.getLogger(__name__)
 
+# Loaded profiles keyed by str(user_id)
+profile_cache = StatsTTLCache("profile", maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+
+# NOTE: The per-field queries below are the reference for the single round trip _PROFILE_QUERY and are used by benchmarks/bench_profile_loader.py
 def _get_user_details(cursor, user_id):
     """Get user details from database."""
     cursor.execute("SELECT first_name, last_name, contact_email, contact_phone_no FROM users WHERE id = %s", (user_id,))
@@ -82,68 +90,143 @@ def _get_user_job(cursor, user_id):
     user_job_result = cursor.fetchone()
     return user_job_result[0] if user_job_result else None
 
-def load_user_profile(user_id: int):
-    """Load user profile from database. Returns dict with status, profile_exists, and profile if available."""
-    try:
-        logger.debug(f"Loading profile for user ID: {user_id}")
-
-        # Connect to DB
-        conn = pymysql.connect(
-            host=os.environ["DB_HOST"],
-            user=os.environ["DB_USER"],
-            password=os.environ["DB_PASS"],
-            database=os.environ["DB_NAME"],
-            port=int(os.environ.get("DB_PORT", 3306))
-        )
-        cursor = conn.cursor()
-        logger.info(f"Connected {user_id} to Database")
-
-        # Get user details
-        user_details = _get_user_details(cursor, user_id)
-        logger.debug(f"User details retrieved: {user_details}")
-        if not user_details:
-            cursor.close()
-            conn.close()
-            return {"status": "success", "profile_exists": False, "message": "User not found in database."}
+def _get_profile_fields_sequential(cursor, user_id):
+    """Get the raw profile fields with one query per field. Returns None if the user does not exist."""
+    user_details = _get_user_details(cursor, user_id)
+    if not user_details:
+        return None
+    first_name, last_name, _, _ = user_details
+    business_name, business_email, business_phone = _get_business_details(cursor, user_id)
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "business_name": business_name,
+        "business_email": business_email,
+        "business_phone": business_phone,
+        "user_skills": _get_user_skills(cursor, user_id),
+        "user_strengths": _get_user_strengths(cursor, user_id),
+        "business_strengths": _get_business_strengths(cursor, user_id),
+        "business_type": _get_business_type(cursor, user_id),
+        "business_category": _get_business_category(cursor, user_id),
+        "user_job": _get_user_job(cursor, user_id),
+    }
 
-        first_name, last_name, _, _ = user_details
+# Same fields as _get_profile_fields_sequential in one round trip, each subquery mirrors one of the per-field queries above
+_PROFILE_QUERY = """
+    SELECT
+        u.first_name,
+        u.last_name,
+        b.name,
+        b.contact_email,
+        b.contact_phone_no,
+        (SELECT JSON_ARRAYAGG(s.name) FROM skills s
+            JOIN user_skills us ON s.id = us.skill_id
+            WHERE us.user_id = u.id) AS user_skills,
+        (SELECT JSON_ARRAYAGG(s.name) FROM strengths s
+            JOIN user_strengths us ON s.id = us.strength_id
+            WHERE us.user_id = u.id) AS user_strengths,
+        (SELECT JSON_ARRAYAGG(bs.name) FROM business_strengths bs
+            JOIN user_business_strengths ubs ON bs.id = ubs.business_strength_id
+            WHERE ubs.user_id = u.id) AS business_strengths,
+        (SELECT bt.name FROM business_types bt
+            JOIN businesses tb ON bt.id = tb.business_type_id
+            WHERE tb.operator_user_id = u.id LIMIT 1) AS business_type,
+        (SELECT bc.name FROM business_categories bc
+            JOIN businesses cb ON bc.id = cb.business_category_id
+            WHERE cb.operator_user_id = u.id LIMIT 1) AS business_category,
+        (SELECT br.name FROM business_roles br
+            JOIN business_strengths bs ON br.id = bs.business_role_id
+            JOIN user_business_strengths ubs ON bs.id = ubs.business_strength_id
+            WHERE ubs.user_id = u.id LIMIT 1) AS user_job
+    FROM users u
+    LEFT JOIN (
+        SELECT operator_user_id, name, contact_email, contact_phone_no
+        FROM businesses WHERE operator_user_id = %(user_id)s LIMIT 1
+    ) b ON b.operator_user_id = u.id
+    WHERE u.id = %(user_id)s
+"""
 
-        # Get business details
-        # BUG
-        business_name, business_email, business_phone = _get_business_details(cursor, user_id)
-        logger.debug(f"Business details retrieved: {business_name}, {business_email}, {business_phone}")
+def _join_names(aggregated):
+    """Turn a JSON_ARRAYAGG result into the comma separated string the per-field queries return."""
+    if not aggregated:
+        return ""
+    if isinstance(aggregated, bytes):
+        aggregated = aggregated.decode("utf-8")
+    return ", ".join(json.loads(aggregated))
 
-        # Get user skills
-        user_skills_str = _get_user_skills(cursor, user_id)
-        logger.debug(f"User skills retrieved: {user_skills_str}")
+def _get_profile_fields(cursor, user_id):
+    """Get the raw profile fields in a single query. Returns None if the user does not exist."""
+    cursor.execute(_PROFILE_QUERY, {"user_id": user_id})
+    row = cursor.fetchone()
+    if not row:
+        return None
+    first_name, last_name, business_name, business_email, business_phone, user_skills, user_strengths, business_strengths, business_type, business_category, user_job = row
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "business_name": business_name,
+        "business_email": business_email,
+        "business_phone": business_phone,
+        "user_skills": _join_names(user_skills),
+        "user_strengths": _join_names(user_strengths),
+        "business_strengths": _join_names(business_strengths),
+        "business_type": business_type,
+        "business_category": business_category,
+        "user_job": user_job,
+    }
 
-        # Get user strengths
-        user_strengths_str = _get_user_strengths(cursor, user_id)
-        logger.debug(f"User strengths retrieved: {user_strengths_str}")
+def load_user_profile(user_id: int):
+    """Load user profile, from the profile cache when possible. Returns dict with status, profile_exists, and profile if available."""
+    key = str(user_id)
+    cached = profile_cache.get(key)
+    if cached is not None:
+        logger.debug("Profile cache hit for user ID: %s", user_id)
+        return copy.deepcopy(cached)
+
+    token = profile_cache.token()
+    result = _load_user_profile_from_db(user_id)
+    if result.get("status") == "success":
+        profile_cache.set(key, copy.deepcopy(result), token)
+    return result
 
-        # Get business strengths
-        business_strengths_str = _get_business_strengths(cursor, user_id)
-        logger.debug(f"Business strengths retrieved: {business_strengths_str}")
+def invalidate_user_profile(user_id: int):
+    """Drop the cached profile for a user. Call after writing the user's profile to the database."""
+    profile_cache.invalidate(str(user_id))
+    logger.debug("Profile cache invalidated for user ID: %s", user_id)
 
-        # Get business type
-        business_type = _get_business_type(cursor, user_id)
-        logger.debug(f"Business type retrieved: {business_type}")
+def _load_user_profile_from_db(user_id: int):
+    """Load user profile from database. Returns dict with status, profile_exists, and profile if available."""
+    try:
+        logger.debug("Loading profile for user ID: %s", user_id)
 
-        # Get business category
-        business_category = _get_business_category(cursor, user_id)
-        logger.debug(f"Business category retrieved: {business_category}")
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            logger.debug("Checked out DB connection for %s", user_id)
 
-        # Get user job
-        user_job = _get_user_job(cursor, user_id)
-        logger.debug(f"User job retrieved: {user_job}")
+            # Get every profile field in one round trip
+            fields = _get_profile_fields(cursor, user_id)
+            cursor.close()
+        logger.debug("DB connection returned to pool")
+
+        logger.debug("Profile fields retrieved: %s", payload(fields))
+        if not fields:
+            return {"status": "success", "profile_exists": False, "message": "User not found in database."}
 
-        cursor.close()
-        conn.close()
-        logger.debug("DB connection closed")
+        first_name = fields["first_name"]
+        last_name = fields["last_name"]
+        business_name = fields["business_name"]
+        business_email = fields["business_email"]
+        business_phone = fields["business_phone"]
+        user_skills_str = fields["user_skills"]
+        user_strengths_str = fields["user_strengths"]
+        business_strengths_str = fields["business_strengths"]
+        business_type = fields["business_type"]
+        business_category = fields["business_category"]
+        user_job = fields["user_job"]
 
         # Check if profile data exists
         profile_exists = bool(business_name and user_job and user_strengths_str and user_skills_str and business_strengths_str and business_type)
-        logger.debug(f"Profile exists: {profile_exists}")
+        logger.debug("Profile exists: %s", profile_exists)
 
         # Build essential user profile (From Website not generated data)
         profile = {
@@ -163,7 +246,7 @@ def load_user_profile(user_id: int):
                 "Business_Strength": business_strengths_str,
                 "Business_Category": business_category,
             })
-            logger.debug(f"Profile data: {profile}")
+            logger.debug("Profile data: %s", payload(profile))
             return {"status": "success", "profile_exists": True, "profile": profile}
         else:
             return {"status": "success", "profile_exists": False, "profile": profile}
@@ -175,7 +258,7 @@ def load_user_profile(user_id: int):
 def validate_connection_options(connection_type: str, profile: dict = None):
     """Validate connection options and check if the loaded profile data is valid for the connection type."""
     try:
-        logger.debug(f"Validating connection options for type: {connection_type}")
+        logger.debug("Validating connection options for type: %s", connection_type)
         valid_types = {"complementary", "alliance", "mastermind", "intelligent"}
         if connection_type not in valid_types:
             return False, f"Invalid connection type '{connection_type}'. Must be one of {valid_types}."
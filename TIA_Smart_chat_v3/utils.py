@@ -1,13 +1,24 @@
-from litellm import completion
+from litellm import completion, acompletion
 from dotenv import load_dotenv
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event, EventActions
 from google.adk.runners import Runner
 from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.state import State
 from google.genai import types
 
-from .tia_agent.shared_state import get_or_create_assistant
-import os, uuid, logging, json
+from .tia_agent.shared_state import get_or_create_assistant, assistant_state_delta, ASSISTANT_STATE_KEY
+from .tia_agent.logging_utils import payload
+from .tia_agent.tracing import tracer, instrument_engine
+from opentelemetry import context, trace
+from opentelemetry.trace import Status, StatusCode
+from collections import Counter
+from contextlib import aclosing
+from contextvars import ContextVar, copy_context
+import asyncio, os, uuid, logging, threading, hashlib, json
 
-from .tia_agent.config import OPENAI_API_KEY
+from .tia_agent.config import OPENAI_API_KEY, EVAL_SCORE_CACHE_TTL, EVAL_SCORE_CACHE_SIZE
+from .tia_agent.cache import StatsTTLCache
 try:
     from .tia_agent.agent import coordinatorAgent
 except ImportError:
@@ -19,14 +30,74 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Session service calls for the chat turn running in the current context (None outside a turn)
+_turn_session_calls: ContextVar = ContextVar("turn_session_calls", default=None)
+
+class InstrumentedSessionService(DatabaseSessionService):
+    """
+    DatabaseSessionService that counts its calls per method, both in total and for the current chat turn
+    (including the calls the runner makes), so redundant session reads show up in /metrics.
+    """
+    def __init__(self, db_url: str, **kwargs):
+        super().__init__(db_url=db_url, **kwargs)
+        self._lock = threading.Lock()
+        self._totals = Counter()
+        self._turns = 0
+
+    def _count(self, method: str):
+        with self._lock:
+            self._totals[method] += 1
+        turn_calls = _turn_session_calls.get()
+        if turn_calls is not None:
+            turn_calls[method] += 1
+
+    async def create_session(self, **kwargs):
+        self._count("create_session")
+        return await super().create_session(**kwargs)
+
+    async def get_session(self, **kwargs):
+        self._count("get_session")
+        return await super().get_session(**kwargs)
+
+    async def list_sessions(self, **kwargs):
+        self._count("list_sessions")
+        return await super().list_sessions(**kwargs)
+
+    async def delete_session(self, **kwargs):
+        self._count("delete_session")
+        return await super().delete_session(**kwargs)
+
+    async def append_event(self, session, event):
+        if not event.partial:
+            self._count("append_event")
+        return await super().append_event(session, event)
+
+    def begin_turn(self) -> Counter:
+        """Start counting calls for a new chat turn in the current context. Returns the turn's counter."""
+        turn_calls = Counter()
+        _turn_session_calls.set(turn_calls)
+        with self._lock:
+            self._turns += 1
+        return turn_calls
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(self._totals.values())
+            return {
+                "turns": self._turns,
+                "calls": dict(self._totals),
+                "calls_per_turn": round(total / self._turns, 3) if self._turns else 0.0,
+            }
+
 # Initialize session service with MySQL
 db_user = os.getenv("DB_USER")
 db_pass = os.getenv("DB_PASS")
 db_host = os.getenv("DB_HOST")
 db_name = os.getenv("DB_NAME")
 db_port = os.getenv("DB_PORT")
-db_url = f"mysql+mysqlconnector://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
-session_service = DatabaseSessionService(db_url=db_url)
+db_url = os.getenv("SESSION_DB_URL", f"mysql+mysqlconnector://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}")
+session_service = InstrumentedSessionService(db_url=db_url)
+instrument_engine(session_service.db_engine)
 
 # Create runner
 runner = Runner(
@@ -35,6 +106,10 @@ runner = Runner(
     session_service=session_service
 )
 
+# Sub types accepted after 'profiler:' and 'connect:'
+PROFILER_TYPES = ["VisionAgent", "LadderAgent"]
+CONNECTION_TYPES = ["complementary", "alliance", "mastermind", "intelligent"]
+
 def _handle_chat_type(type: str):
     """
     Handles agent switching by sending a transfer message to the runner.
@@ -52,29 +127,26 @@ def _handle_chat_type(type: str):
 
         # Determine agent type
         if agent_type == "profiler":
-            valid_profiler_types = ["VisionAgent", "LadderAgent"]
-            if sub_type in valid_profiler_types:
+            if sub_type in PROFILER_TYPES:
                 full_agent = sub_type
             else:
-                raise ValueError(f"Invalid or missing profiler type. Must be one of {valid_profiler_types}.")
+                raise ValueError(f"Invalid or missing profiler type. Must be one of {PROFILER_TYPES}.")
         elif agent_type == "connect":
             full_agent = "ConnectAgent"
 
             # Determine connection type for ConnectAgent
-            valid_connection_types = ["complementary", "alliance", "mastermind", "intelligent"]
-            
-            if sub_type in valid_connection_types:
+            if sub_type in CONNECTION_TYPES:
                 connection_type = sub_type
             else:
-                raise ValueError(f"Invalid or missing connection type for ConnectAgent. Must be one of {valid_connection_types}.")
+                raise ValueError(f"Invalid or missing connection type for ConnectAgent. Must be one of {CONNECTION_TYPES}.")
 
-            logger.debug(f"Set connection_type to '{connection_type}' before transfer")
+            logger.debug("Set connection_type to '%s' before transfer", connection_type)
         else:
             raise ValueError(f"Invalid agent type '{agent_type}'. Must be 'profiler', 'connect', or 'default'.")
         
         return full_agent, connection_type
     except Exception as e:
-        logger.error("ERROR in handle_chat_type:", e)
+        logger.error("ERROR in handle_chat_type: %s", e)
         raise Exception("Error during agent switching: " + str(e))
 
 async def _create_new_session(user_id: str, name: str, region: str, lat: float, lng: float, chat_type: str):
@@ -84,7 +156,7 @@ async def _create_new_session(user_id: str, name: str, region: str, lat: float,
     try:
         session_id = str(uuid.uuid4())
         full_agent, connection_type = _handle_chat_type(chat_type)
-        logger.info(f"Creating new session with ID: {session_id}, Agent: {full_agent}, Connection Type: {connection_type}")
+        logger.info("Creating new session with ID: %s, Agent: %s, Connection Type: %s", session_id, full_agent, connection_type)
         state = {
             "name": name,
             "user_id": user_id,
@@ -105,7 +177,7 @@ async def _create_new_session(user_id: str, name: str, region: str, lat: float,
         )
         return session
     except Exception as e:
-        logger.error("ERROR in create_new_session:", e)
+        logger.error("ERROR in create_new_session: %s", e)
         raise Exception("Error creating new session: " + str(e))
 
 async def _get_existing_session(user_id: str, session_id: str):
@@ -120,96 +192,309 @@ async def _get_existing_session(user_id: str, session_id: str):
         )
         return session
     except Exception as e:
-        logger.error("ERROR in get_existing_session:", e)
+        logger.error("ERROR in get_existing_session: %s", e)
         raise Exception("Error retrieving existing session: " + str(e))
 
-async def run_chat(user_id: str, name: str, region: str, lat: float, lng: float, chat_type: str, message: str, session_id=None):
+async def _load_or_create_session(user_id: str, name: str, region: str, lat: float, lng: float, chat_type: str, session_id=None):
     """
-    Runs a chat session, creating a new session if necessary.
-    Handles agent transfers and session state updates.
-    Returns the session, response text, and author.
+    Retrieves the session for session_id, creating a new one if it is missing or does not exist.
     """
-    try:
-        author = None
-        response_text = None
-        if session_id is None:
-            session = await _create_new_session(user_id, name, region, lat, lng, chat_type)
-        else:
-            # session_id provided: Try to get existing session
-            session = await _get_existing_session(user_id, session_id)
+    if session_id is None:
+        return await _create_new_session(user_id, name, region, lat, lng, chat_type)
 
-            # session_id provided but doesn't exist: Create a new session
-            if session is None:
-                session = await _create_new_session(user_id, name, region, lat, lng, chat_type)
+    # session_id provided: Try to get existing session
+    session = await _get_existing_session(user_id, session_id)
+
+    # session_id provided but doesn't exist: Create a new session
+    if session is None:
+        session = await _create_new_session(user_id, name, region, lat, lng, chat_type)
+    return session
 
-        # Prepare message
+def public_state(state) -> dict:
+    """
+    Session state as returned to clients and saved by the conversation recorder.
+    The serialized DynamicChatAssistant (ASSISTANT_STATE_KEY and its stored responses) holds the transcript and is
+    left out, so the payload does not grow with every turn.
+    """
+    return {key: value for key, value in state.items() if not key.startswith(ASSISTANT_STATE_KEY)}
+
+async def _save_assistant_state(session, assistant):
+    """
+    Persists the DynamicChatAssistant into the session state so the next turn can be served by any worker.
+    DynamicChatAssistant turns happen outside the runner, so the state change is recorded as a content-less event
+    holding the bounded snapshot and the turn's new responses, see assistant_state_delta.
+    """
+    event = Event(
+        invocation_id=Event.new_id(),
+        author="DynamicChatAssistant",
+        actions=EventActions(state_delta=assistant_state_delta(assistant, session.state))
+    )
+    await session_service.append_event(session, event)
+
+async def _handle_dynamic_chat(session, chat_type: str, message: str):
+    """
+    Routes the message to the DynamicChatAssistant while the VisionAgent is in its chat phase.
+    Returns the response text (None if the runner should respond), the author and the message for the runner.
+    """
+    # Prepare message
+    new_message = types.Content(
+        role="user",
+        parts=[types.Part(text=message)]
+    )
+
+    # Handle agent transfer
+    set_agent = session.state.get("set_agent")
+    vision_state = session.state.get("VisionAgent", {})
+    chat_state = vision_state.get("chat_state")
+
+    # Determine if DynamicChatAssistant should handle the chat
+    if set_agent == "VisionAgent" and chat_state == "chat":
+        chat_assistant = get_or_create_assistant(session.id, session.user_id, chat_type, session.state)
+        response_text = await chat_assistant.asend_message(message)
+        await _save_assistant_state(session, chat_assistant)
+
+        # Enforce exit condition
+        if "<exit>" in response_text:
+            response_text = None
         new_message = types.Content(
+                role="user",
+                parts=[types.Part(text="[DYNAMIC CHAT COMPLETED USE `generate_blog` TO CREATE BLOG]")] # Force the Agent to generate blog (NOTE: Workaround for LLM hallucinations)
+            )
+        return response_text, "DynamicChatAssistant", new_message
+
+    return None, None, new_message
+
+class SessionHandle:
+    """
+    Per-request handle on a chat session.
+    Runner events carry every state change the runner persists, so applying them to the loaded session keeps
+    its state current without reading the session back from the database after each run.
+    Each agent transfer opens a child span of the turn's span, lasting until the next transfer or the end of the run,
+    and the runner resumes with it as the current span, so the target agent's run, LLM calls and tools nest under it.
+    """
+    def __init__(self, session, span=None):
+        self.session = session
+        self.span = span
+        self._agent_span = None
+
+    def _start_agent_span(self, from_agent: str, to_agent: str):
+        self._end_agent_span()
+        self._agent_span = tracer.start_span(f"agent {to_agent}", context=trace.set_span_in_context(self.span), attributes={
+            "tia.from_agent": from_agent or "", "tia.to_agent": to_agent,
+        })
+
+    def _end_agent_span(self):
+        if self._agent_span is not None:
+            self._agent_span.end()
+            self._agent_span = None
+
+    def apply(self, event):
+        """Apply the state delta of a runner event, mirroring what the session service persisted."""
+        if event.partial or not event.actions or not event.actions.state_delta:
+            return
+        for key, value in event.actions.state_delta.items():
+            if not key.startswith(State.TEMP_PREFIX):
+                self.session.state[key] = value
+
+    async def run(self, new_message, run_config: RunConfig = None):
+        """Run the runner for this session, keeping the session state in step with its events."""
+        # The runner's trace context (its open spans) is kept between events and restored while it produces the next
+        # one. ADK starts the target agent right after yielding the transfer's function response, so the transfer
+        # span is made current at that point.
+        runner_context = context.get_current()
+        try:
+            async with aclosing(runner.run_async(
+                user_id=self.session.user_id,
+                session_id=self.session.id,
+                new_message=new_message,
+                run_config=run_config or RunConfig()
+            )) as events:
+                while True:
+                    token = context.attach(runner_context)
+                    try:
+                        event = await events.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        runner_context = context.get_current()
+                        context.detach(token)
+                    self.apply(event)
+                    if self.span is not None and event.actions and event.actions.transfer_to_agent:
+                        self._start_agent_span(event.author, event.actions.transfer_to_agent)
+                        runner_context = trace.set_span_in_context(self._agent_span, runner_context)
+                    yield event
+        finally:
+            self._end_agent_span()
+
+def _run_profiler_transfer(handle: SessionHandle):
+    """
+    Sends the auto transfer message that hands the session over to the ProfilerAgent.
+    Returns the async event stream from the runner.
+    """
+    auto_transfer_message = types.Content(
             role="user",
-            parts=[types.Part(text=message)]
+            parts=[types.Part(text="Use `transfer_to_agent` to switch to ProfilerAgent and gather user profile information.")]
         )
+    return handle.run(auto_transfer_message)
 
-        # Handle agent transfer
-        set_agent = session.state.get("set_agent")
-        vision_state = session.state.get("VisionAgent", {})
-        chat_state = vision_state.get("chat_state")
-        
-        # Determine if DynamicChatAssistant should handle the chat
-        response_text = None
-        if set_agent == "VisionAgent" and chat_state == "chat":
-            chat_assistant = get_or_create_assistant(session.id, session.user_id, chat_type)
-            response_text = chat_assistant.send_message(message)
-
-            # Enforce exit condition
-            if "<exit>" in response_text:
-                response_text = None
-            author = "DynamicChatAssistant"
-            new_message = types.Content(
-                    role="user",
-                    parts=[types.Part(text="[DYNAMIC CHAT COMPLETED USE `generate_blog` TO CREATE BLOG]")] # Force the Agent to generate blog (NOTE: Workaround for LLM hallucinations)
-                )
-
-        # Return a google ADK runner response if DynamicChatAssistant did not handle it
-        if response_text is None:
-            for event in runner.run(
-                user_id=session.user_id,
-                session_id=session.id,
-                new_message=new_message
-            ):
-                logger.debug(f"[CHAT EVENT]\nEvent: {event}\nSession ID: {session.id}\nState: {json.dumps(session.state, indent=2)}")
-                
-                if event.is_final_response() and event.content and event.content.parts:
-                    response_text = event.content.parts[0].text
-                    author = event.author
-            
-        # Get updated session state
-        session = await _get_existing_session(user_id, session.id)
-        set_agent = session.state.get("set_agent")
-        logger.debug(f"Final session state after chat: {session.state}")
-        logger.debug(f"Set Agent after chat: {set_agent}")
+def _event_to_frames(event, include_text: bool = True) -> list:
+    """
+    Converts a runner event into SSE frames for partial text, agent transfers, tool calls and final messages.
+    """
+    frames = []
+    for call in event.get_function_calls():
+        if call.name == "transfer_to_agent":
+            frames.append({"event": "transfer", "data": {"author": event.author, "agent_name": (call.args or {}).get("agent_name")}})
+        else:
+            frames.append({"event": "tool_call", "data": {"author": event.author, "name": call.name, "args": call.args}})
+    for function_response in event.get_function_responses():
+        if function_response.name != "transfer_to_agent":
+            frames.append({"event": "tool_response", "data": {"author": event.author, "name": function_response.name, "response": function_response.response}})
+
+    if include_text and event.content and event.content.parts and event.content.parts[0].text:
+        if event.partial:
+            frames.append({"event": "partial", "data": {"author": event.author, "text": event.content.parts[0].text}})
+        elif event.is_final_response():
+            frames.append({"event": "message", "data": {"author": event.author, "text": event.content.parts[0].text}})
+    return frames
+
+def _annotate_turn_span(span, session, author, set_agent, turn_calls):
+    """Record how the turn ended on its span: final session, responding agent and session database calls."""
+    span.set_attributes({
+        "tia.session_id": session.id,
+        "tia.author": author or "",
+        "tia.set_agent": set_agent or "",
+        "tia.session_db_calls": sum(turn_calls.values()),
+    })
+
+async def _stream_turn(span, user_id: str, name: str, region: str, lat: float, lng: float, chat_type: str, message: str, session_id=None):
+    """Frames of one streamed chat turn, see stream_chat."""
+    try:
+        turn_calls = session_service.begin_turn()
+        session = await _load_or_create_session(user_id, name, region, lat, lng, chat_type, session_id)
+        handle = SessionHandle(session, span)
+        yield {"event": "session", "data": {"session_id": session.id}}
+
+        response_text, author, new_message = await _handle_dynamic_chat(session, chat_type, message)
+        if response_text is not None:
+            yield {"event": "message", "data": {"author": author, "text": response_text}}
+        else:
+            # Closed explicitly so an early close of the stream also closes the runner in this context
+            async with aclosing(handle.run(new_message, RunConfig(streaming_mode=StreamingMode.SSE))) as events:
+                async for event in events:
+                    logger.debug("[STREAM EVENT] Event: %s Session ID: %s", payload(event), session.id)
+                    for frame in _event_to_frames(event):
+                        yield frame
+
+                    if event.is_final_response() and event.content and event.content.parts:
+                        response_text = event.content.parts[0].text
+                        author = event.author
+
+        # Session state is kept current by the handle, no need to read it back
+        set_agent = handle.session.state.get("set_agent")
 
         if set_agent == "ProfilerAgent":
-            auto_transfer_message = types.Content(
-                    role="user",
-                    parts=[types.Part(text="Use `transfer_to_agent` to switch to ProfilerAgent and gather user profile information.")]
-                )
-            for event in runner.run(
-                user_id=session.user_id,
-                session_id=session.id,
-                new_message=auto_transfer_message
-            ):
-                logger.debug(f"Transfer Event: {event}")
-        
+            async with aclosing(_run_profiler_transfer(handle)) as events:
+                async for event in events:
+                    logger.debug("Transfer Event: %s", payload(event))
+                    # ProfilerAgent is silent, only surface its tool calls and transfers
+                    for frame in _event_to_frames(event, include_text=False):
+                        yield frame
+
         # Check if session should end
-        session = await _get_existing_session(user_id, session.id)
+        session = handle.session
         end_session = session.state.get("end_session", False)
         if end_session and set_agent:
             await delete_session(user_id, session.id)
             session = await _create_new_session(user_id, name, region, lat, lng, chat_type)
 
-        return session, response_text, author
+        logger.debug("Session service calls this turn: %s", turn_calls)
+        _annotate_turn_span(span, session, author, set_agent, turn_calls)
+        yield {"event": "final", "data": {
+            "response": response_text,
+            "session_id": session.id,
+            "state": public_state(session.state),
+            "author": author
+        }}
     except Exception as e:
-        logger.error("ERROR in run_chat:", e)
-        raise Exception("Error during chat: " + str(e))
+        logger.error("ERROR in stream_chat: %s", e)
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        yield {"event": "error", "data": {"detail": "Error during chat: " + str(e)}}
+
+async def _next_frame(frames):
+    return await frames.__anext__()
+
+async def stream_chat(user_id: str, name: str, region: str, lat: float, lng: float, chat_type: str, message: str, session_id=None):
+    """
+    Streaming variant of run_chat.
+    Yields SSE frames ({"event": ..., "data": ...}) as runner events arrive, ending with a "final" frame
+    that holds the same response, session_id, state and author as the /chat/tia-chat result.
+    Every step of the turn, closing included, runs in one context of its own with the turn's span current. The spans
+    the runner keeps open across frames are then attached and detached in the same context, even when a client
+    disconnect closes this generator from another task.
+    """
+    span = tracer.start_span("chat_turn", attributes={"tia.user_id": user_id, "tia.chat_type": chat_type, "tia.session_id": session_id or ""})
+    frames = _stream_turn(span, user_id, name, region, lat, lng, chat_type, message, session_id)
+    turn_context = copy_context()
+    turn_context.run(context.attach, trace.set_span_in_context(span))
+    try:
+        while True:
+            try:
+                frame = await asyncio.create_task(_next_frame(frames), context=turn_context)
+            except StopAsyncIteration:
+                break
+            yield frame
+    finally:
+        try:
+            await asyncio.create_task(frames.aclose(), context=turn_context)
+        finally:
+            span.end()
+
+async def run_chat(user_id: str, name: str, region: str, lat: float, lng: float, chat_type: str, message: str, session_id=None):
+    """
+    Runs a chat session, creating a new session if necessary.
+    Handles agent transfers and session state updates.
+    Returns the session, response text, and author.
+    """
+    with tracer.start_as_current_span("chat_turn", attributes={"tia.user_id": user_id, "tia.chat_type": chat_type, "tia.session_id": session_id or ""}) as span:
+        try:
+            turn_calls = session_service.begin_turn()
+            session = await _load_or_create_session(user_id, name, region, lat, lng, chat_type, session_id)
+            handle = SessionHandle(session, span)
+            response_text, author, new_message = await _handle_dynamic_chat(session, chat_type, message)
+
+            # Return a google ADK runner response if DynamicChatAssistant did not handle it
+            if response_text is None:
+                async for event in handle.run(new_message):
+                    logger.debug("[CHAT EVENT]\nEvent: %s\nSession ID: %s\nState: %s", payload(event), session.id, payload(session.state))
+                    
+                    if event.is_final_response() and event.content and event.content.parts:
+                        response_text = event.content.parts[0].text
+                        author = event.author
+                
+            # Session state is kept current by the handle, no need to read it back
+            set_agent = handle.session.state.get("set_agent")
+            logger.debug("Final session state after chat: %s", payload(handle.session.state))
+            logger.debug("Set Agent after chat: %s", set_agent)
+
+            if set_agent == "ProfilerAgent":
+                async for event in _run_profiler_transfer(handle):
+                    logger.debug("Transfer Event: %s", payload(event))
+            
+            # Check if session should end
+            session = handle.session
+            end_session = session.state.get("end_session", False)
+            if end_session and set_agent:
+                await delete_session(user_id, session.id)
+                session = await _create_new_session(user_id, name, region, lat, lng, chat_type)
+
+            logger.debug("Session service calls this turn: %s", turn_calls)
+            _annotate_turn_span(span, session, author, set_agent, turn_calls)
+            return session, response_text, author
+        except Exception as e:
+            logger.error("ERROR in run_chat: %s", e)
+            raise Exception("Error during chat: " + str(e))
 
 async def delete_session(user_id: str, session_id: str):
     """
@@ -221,29 +506,69 @@ async def delete_session(user_id: str, session_id: str):
             user_id=user_id,
             session_id=session_id
         )
-        logger.debug(f"Session {session_id} for user {user_id} deleted.")
+        logger.debug("Session %s for user %s deleted.", session_id, user_id)
     except Exception as e:
-        logger.error("ERROR in delete_session:", e)
+        logger.error("ERROR in delete_session: %s", e)
         raise Exception("Error deleting session: " + str(e))
 
+def session_call_stats() -> dict:
+    """Session service call counts, in total and per chat turn."""
+    return session_service.stats()
+
+# Similarity scores keyed by a hash of the (actual, expected) pair, so re-running an eval suite only scores changed turns
+score_cache = StatsTTLCache("eval_scores", maxsize=EVAL_SCORE_CACHE_SIZE, ttl=EVAL_SCORE_CACHE_TTL)
+
+def _score_prompt(actual: str, expected: str) -> str:
+    return f"Rate the similarity between these two responses on a scale of 0 to 10, where 10 is identical and 0 is completely different. Only return the number as a float.\n\nActual: {actual}\n\nExpected: {expected}"
+
+def _score_key(actual: str, expected: str) -> str:
+    return hashlib.sha256(json.dumps([actual, expected]).encode("utf-8")).hexdigest()
+
+def _parse_score(response) -> float:
+    score = float(response.choices[0].message.content.strip())
+    return max(0.0, min(10.0, score))
+
 def compare_responses(actual: str, expected: str) -> float:
     """
     Uses litellm to compare actual and expected responses by prompting an LLM to rate similarity.
     Returns a score from 0 to 10.
     """
-    prompt = f"Rate the similarity between these two responses on a scale of 0 to 10, where 10 is identical and 0 is completely different. Only return the number as a float.\n\nActual: {actual}\n\nExpected: {expected}"
-    
+    key = _score_key(actual, expected)
+    cached = score_cache.get(key)
+    if cached is not None:
+        return cached
     try:
         response = completion(
             model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
+            messages=[{"role": "user", "content": _score_prompt(actual, expected)}],
+            api_key=OPENAI_API_KEY,
+            max_tokens=10,
+            temperature=0.0
+        )
+        score = _parse_score(response)
+        score_cache.set(key, score)
+        return score
+    except Exception as e:
+        logger.error(f"Error in comparison: {e}")
+        return 0.0
+
+async def acompare_responses(actual: str, expected: str) -> float:
+    """Async compare_responses, sharing its score cache. Failed comparisons score 0.0 and are not cached."""
+    key = _score_key(actual, expected)
+    cached = score_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        response = await acompletion(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": _score_prompt(actual, expected)}],
             api_key=OPENAI_API_KEY,
             max_tokens=10,
             temperature=0.0
         )
-        score_text = response.choices[0].message.content.strip()
-        score = float(score_text)
-        return max(0.0, min(10.0, score))
+        score = _parse_score(response)
+        score_cache.set(key, score)
+        return score
     except Exception as e:
         logger.error(f"Error in comparison: {e}")
-        return 0.0
\ No newline at end of file
+        return 0.0
@@ -0,0 +1,85 @@
+"""
+Benchmark for the DynamicChatAssistant store.
+
+Simulates sustained vision chat traffic where every session is abandoned part way through (so
+cleanup_session never runs) and reports traced memory and stored sessions at checkpoints, for an
+unbounded dict (previous behaviour) and the bounded AssistantStore.
+
+Run from the repository root:
+    python -m benchmarks.bench_assistant_store --sessions 20000 --turns 6 --max-entries 1000
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, json, tracemalloc
+
+from TIA_Smart_chat_v3.tia_agent.shared_state import AssistantStore, VISION_PROMPTS
+from TIA_Smart_chat_v3.tia_agent.sub_agents.DynamicChatAssistant import DynamicChatAssistant
+from TIA_Smart_chat_v3.tia_agent.sub_agents.vision_agent.prompts import VISION_RULE_PROMPT
+
+REPLY = "Thanks, that helps. Could you tell me a bit more about who your customers are and what they value? " * 3
+MESSAGE = "We run a small managed IT business in Brisbane focused on local accounting firms. " * 2
+
+
+class DictStore:
+    """Previous behaviour: a plain dict that is only cleaned up when the profile is saved."""
+    def __init__(self):
+        self._entries = {}
+
+    def get_or_create(self, session_id, factory):
+        if session_id not in self._entries:
+            self._entries[session_id] = factory()
+        return self._entries[session_id]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _chat(assistant: DynamicChatAssistant, turns: int):
+    # Drive the assistant's turn bookkeeping without an LLM call
+    for _ in range(turns):
+        assistant._start_turn(MESSAGE)
+        assistant.assistant_response = REPLY
+        assistant._end_turn()
+
+
+def _run(store, sessions: int, turns: int, checkpoints: int) -> list:
+    tracemalloc.start()
+    samples = []
+    every = max(1, sessions // checkpoints)
+    for i in range(sessions):
+        session_id = f"session-{i}"
+        assistant = store.get_or_create(session_id, lambda: DynamicChatAssistant(VISION_PROMPTS, VISION_RULE_PROMPT, i))
+        _chat(assistant, turns)
+        # Touch again so the store re-measures the grown history, as the next request would
+        store.get_or_create(session_id, lambda: None)
+        if (i + 1) % every == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append({"sessions_seen": i + 1, "stored": len(store), "traced_mb": round(current / 1024 / 1024, 2)})
+    tracemalloc.stop()
+    return samples
+
+
+def main(sessions: int, turns: int, max_entries: int, max_bytes: int, checkpoints: int, as_json: bool):
+    results = {
+        "dict": _run(DictStore(), sessions, turns, checkpoints),
+        "store": _run(AssistantStore(max_entries=max_entries, max_bytes=max_bytes, idle_ttl=1800, sweep_interval=60), sessions, turns, checkpoints),
+    }
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'sessions':>9} {'dict stored':>12} {'dict MB':>8} {'store stored':>13} {'store MB':>9}")
+    for old, new in zip(results["dict"], results["store"]):
+        print(f"{old['sessions_seen']:>9} {old['stored']:>12} {old['traced_mb']:>8} {new['stored']:>13} {new['traced_mb']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark memory of abandoned vision chat sessions.")
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--max-entries", type=int, default=1000)
+    parser.add_argument("--max-bytes", type=int, default=64 * 1024 * 1024)
+    parser.add_argument("--checkpoints", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    main(args.sessions, args.turns, args.max_entries, args.max_bytes, args.checkpoints, args.json)
@@ -0,0 +1,96 @@
+"""
+RapidAPI business searches through the pooled, tile-cached client versus a new connection per search.
+
+Starts the RapidAPI stub server (stub_servers.py, which reports a request quota through the
+`x-ratelimit-requests-*` headers) and replays `--searches` searches from users scattered around one
+city, each picking one of a few partner types written with varying case and spacing. Reports paid requests,
+wall time and how the client behaves as the quota runs low.
+
+Run from the repository root:
+    python -m benchmarks.bench_business_search --searches 200 --quota 1000
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, http.client, json, random, time
+from urllib.parse import urlencode
+
+from TIA_Smart_chat_v3.tia_agent.sub_agents.connect_agent import rapidapi_client
+from .stub_servers import Latency, start_rapidapi_server
+
+QUERIES = ["IT Consulting", "it consulting", "Digital  Marketing", "digital marketing", "Accounting", "Web Design"]
+CITY = (-27.4705, 153.0260)
+
+
+def _searches(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [(rng.choice(QUERIES), CITY[0] + rng.uniform(-0.04, 0.04), CITY[1] + rng.uniform(-0.04, 0.04)) for _ in range(count)]
+
+
+def _previous_search(port: int, query: str, lat: float, lng: float) -> dict:
+    params = {"query": query, "lat": f"{lat:.6f}", "lng": f"{lng:.6f}", "limit": "5", "language": "en", "region": "au", "zoom": 10}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("GET", f"/search-in-area?{urlencode(params)}")
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def _run(search, searches: list, server) -> dict:
+    server.reset_counts()
+    start = time.perf_counter()
+    errors = 0
+    for query, lat, lng in searches:
+        try:
+            search(query, lat, lng)
+        except rapidapi_client.QuotaExceededError:
+            errors += 1
+    elapsed = time.perf_counter() - start
+    return {"api_requests": server.counts["requests"], "quota_errors": errors, "wall_s": round(elapsed, 3), "per_search_ms": round(elapsed / len(searches) * 1000, 3)}
+
+
+def main(searches: int, delay: float, quota: int, as_json: bool):
+    plan = _searches(searches)
+    server = start_rapidapi_server(latency=Latency("fixed", delay * 1000), quota=quota)
+    port = server.server_port
+
+    def new_client(quota_limit: int = 0):
+        rapidapi_client.search_cache.clear()
+        rapidapi_client.stale_search_cache.clear()
+        return rapidapi_client.BusinessSearchClient("127.0.0.1", "bench", base_url=server.base_url, quota=rapidapi_client.QuotaTracker(quota_limit))
+
+    results = {"searches": searches, "delay_s": delay, "quota": quota}
+    results["previous"] = _run(lambda q, lat, lng: _previous_search(port, q, lat, lng), plan, server)
+    client = new_client()
+    results["client"] = _run(lambda q, lat, lng: client.search(q, 5, "au", 10, lat, lng), plan, server)
+    results["client"]["stats"] = client.stats()
+
+    # Quota nearly used up: fresh entries expire, the client falls back to older results rather than new requests
+    client = new_client()
+    _run(lambda q, lat, lng: client.search(q, 5, "au", 10, lat, lng), plan, server)
+    rapidapi_client.search_cache.clear()
+    client.quota.record({"x-ratelimit-requests-limit": str(quota), "x-ratelimit-requests-remaining": "0"})
+    results["near_quota"] = _run(lambda q, lat, lng: client.search(q, 5, "au", 10, lat, lng), _searches(searches, seed=11), server)
+    results["near_quota"]["stats"] = client.stats()
+    server.shutdown()
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{searches} searches around one city, API latency {delay}s")
+    print(f"{'':>11} {'api requests':>13} {'quota errors':>13} {'ms/search':>10}")
+    for name in ("previous", "client", "near_quota"):
+        row = results[name]
+        print(f"{name:>11} {row['api_requests']:>13} {row['quota_errors']:>13} {row['per_search_ms']:>10}")
+    print(f"Near quota: {results['near_quota']['stats']['served_stale']} searches served from older cached results")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pooled, tile-cached RapidAPI business search client.")
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.02)
+    parser.add_argument("--quota", type=int, default=1000)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    main(args.searches, args.delay, args.quota, args.json)
@@ -0,0 +1,77 @@
+"""
+Benchmark for saving conversations (save_conversation).
+
+Records N turns of one session with a realistic state, comparing the previous read-modify-rewrite of
+`tmp/<session>.json` with the append-only ConversationRecorder. Reports the time the request handler
+spends per turn, bytes written and the total time until everything is on disk.
+
+Run from the repository root:
+    python -m benchmarks.bench_conversation_recorder --turns 50 200 500
+"""
+from .stubs import setup_env, STUB_PROFILE
+setup_env()
+
+import argparse, json, os, tempfile, time, uuid
+
+from TIA_Smart_chat_v3.recorder import ConversationRecorder, read_conversation
+
+STATE = {"user_id": "1", "set_agent": "ConnectAgent", "Generated_Profile": STUB_PROFILE,
+         "ConnectAgent": {"connection_result": [{"name": f"Partner {i}", "about": "Managed IT services. " * 10} for i in range(10)]}}
+
+
+def _previous_save(directory: str, session_id: str, message: str, response: str) -> int:
+    # Previous main._save_conversation: load the whole file, append, rewrite it with indent=4
+    new_entry = {"message": message, "response": response, "state": STATE, "author": "ConnectAgent", "timestamp": str(uuid.uuid4())}
+    file_path = f"{directory}/{session_id}.json"
+    if os.path.exists(file_path):
+        with open(file_path, "r") as f:
+            data = json.load(f)
+        data["conversations"].append(new_entry)
+    else:
+        data = {"session_id": session_id, "user_id": "1", "conversations": [new_entry]}
+    with open(file_path, "w") as f:
+        json.dump(data, f, indent=4)
+    return os.path.getsize(file_path)
+
+
+def _measure_previous(turns: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="tia_conv_prev_")
+    written, start = 0, time.perf_counter()
+    for i in range(turns):
+        written += _previous_save(directory, "bench", f"message {i}", f"response {i}")
+    elapsed = time.perf_counter() - start
+    return {"handler_ms_per_turn": round(elapsed / turns * 1000, 3), "total_s": round(elapsed, 3), "bytes_written": written}
+
+
+def _measure_recorder(turns: int, fsync: str) -> dict:
+    directory = tempfile.mkdtemp(prefix="tia_conv_rec_")
+    recorder = ConversationRecorder(directory, flush_interval=0.05, batch_size=100, fsync=fsync)
+    start = time.perf_counter()
+    for i in range(turns):
+        path = recorder.record("bench", "1", f"message {i}", f"response {i}", STATE, "ConnectAgent")
+    handler = time.perf_counter() - start
+    recorder.flush()
+    elapsed = time.perf_counter() - start
+    assert len(read_conversation(path)["conversations"]) == turns
+    return {"handler_ms_per_turn": round(handler / turns * 1000, 3), "total_s": round(elapsed, 3), "bytes_written": os.path.getsize(path)}
+
+
+def main(turn_counts: list, fsync: str, as_json: bool):
+    results = [{"turns": turns, "previous": _measure_previous(turns), "recorder": _measure_recorder(turns, fsync)} for turns in turn_counts]
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'turns':>6} {'prev ms/turn':>13} {'rec ms/turn':>12} {'prev total s':>13} {'rec total s':>12} {'prev MB':>8} {'rec MB':>7}")
+    for row in results:
+        prev, rec = row["previous"], row["recorder"]
+        print(f"{row['turns']:>6} {prev['handler_ms_per_turn']:>13} {rec['handler_ms_per_turn']:>12} {prev['total_s']:>13} {rec['total_s']:>12} "
+              f"{round(prev['bytes_written'] / 1e6, 2):>8} {round(rec['bytes_written'] / 1e6, 2):>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark saving conversation turns.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--fsync", choices=["batch", "never"], default="batch")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    main(args.turns, args.fsync, args.json)
@@ -0,0 +1,86 @@
+"""
+Benchmark for generate_email_templates.
+
+Replaces the LLM call with a stub that sleeps for a fixed latency and reports wall time against the
+number of selected businesses, for a sequential run (concurrency 1) and the configured concurrency cap.
+With `--hang-every N` every Nth call never returns, the batch must still finish within the `--timeout`.
+
+Run from the repository root:
+    python -m benchmarks.bench_email_templates --businesses 1 3 5 10 --delay 0.5 --concurrency 5
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, asyncio, json, time
+
+from TIA_Smart_chat_v3.tia_agent.sub_agents.connect_agent import utils
+
+
+def _make_stub(delay: float, fail_every: int, hang_every: int):
+    calls = {"count": 0}
+
+    async def stub_agenerate_response(messages):
+        calls["count"] += 1
+        call_number = calls["count"]
+        if hang_every and call_number % hang_every == 0:
+            await asyncio.Event().wait()
+        await asyncio.sleep(delay)
+        if fail_every and call_number % fail_every == 0:
+            raise RuntimeError("stubbed LLM failure")
+        return "Subject: Partnership\n\nHi team, ..."
+
+    return stub_agenerate_response
+
+
+def _businesses(count: int) -> list:
+    return [
+        {"name": f"Partner {i}", "about": "Managed IT services", "full_address": "1 Queen St, Brisbane", "rating": 4.5, "type": "IT Services"}
+        for i in range(count)
+    ]
+
+
+async def _measure(count: int, concurrency: int, timeout: float) -> tuple:
+    start = time.perf_counter()
+    templates = await utils.generate_email_templates("Web Search", _businesses(count), "Sam Taylor", "Founder", "sam@example.com", "Taylor Tech", max_concurrency=concurrency, timeout=timeout)
+    elapsed = time.perf_counter() - start
+    in_order = [t["business_name"] for t in templates] == [f"Partner {i}" for i in range(count)]
+    errors = sum(1 for t in templates if t["template"].startswith("Error:"))
+    return elapsed, in_order, errors
+
+
+async def main(business_counts: list, delay: float, concurrency: int, fail_every: int, hang_every: int, timeout: float, as_json: bool):
+    utils.agenerate_response = _make_stub(delay, fail_every, hang_every)
+    results = []
+    for count in business_counts:
+        sequential, _, _ = await _measure(count, 1, timeout)
+        concurrent, in_order, errors = await _measure(count, concurrency, timeout)
+        results.append({
+            "businesses": count,
+            "llm_delay_s": delay,
+            "concurrency": concurrency,
+            "sequential_wall_s": round(sequential, 3),
+            "concurrent_wall_s": round(concurrent, 3),
+            "speedup": round(sequential / concurrent, 2),
+            "in_selection_order": in_order,
+            "failed_templates": errors,
+        })
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'businesses':>10} {'sequential s':>13} {'concurrent s':>13} {'speedup':>8} {'ordered':>8} {'failed':>7}")
+    for row in results:
+        print(f"{row['businesses']:>10} {row['sequential_wall_s']:>13} {row['concurrent_wall_s']:>13} {row['speedup']:>8} {str(row['in_selection_order']):>8} {row['failed_templates']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark generate_email_templates with a stubbed LLM.")
+    parser.add_argument("--businesses", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--delay", type=float, default=0.5, help="Simulated seconds per LLM call.")
+    parser.add_argument("--concurrency", type=int, default=utils.EMAIL_GENERATION_CONCURRENCY)
+    parser.add_argument("--fail-every", type=int, default=0, help="Make every Nth stubbed call fail.")
+    parser.add_argument("--hang-every", type=int, default=0, help="Make every Nth stubbed call never return.")
+    parser.add_argument("--timeout", type=float, default=utils.EMAIL_GENERATION_TIMEOUT, help="Seconds per generation before it becomes an error entry.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    asyncio.run(main(args.businesses, args.delay, args.concurrency, args.fail_every, args.hang_every, args.timeout, args.json))
@@ -0,0 +1,108 @@
+"""
+Benchmark for the /chat/test-eval runner.
+
+Records a set of expected conversations through run_chat (stubbed LLM), then evaluates them with the
+previous flow (one file at a time, blocking compare_responses per turn) and with evaluate_files
+(concurrent files, background scoring), cold and again with the score cache warm.
+
+Run from the repository root:
+    python -m benchmarks.bench_eval_runner --files 8 --turns 4 --delay 0.05 --score-delay 0.3
+"""
+from .stubs import setup_env, install_stub_llm
+setup_env()
+
+import argparse, asyncio, json, logging, tempfile, time
+
+import litellm
+from TIA_Smart_chat_v3 import utils, evaluation
+from TIA_Smart_chat_v3.recorder import ConversationRecorder, read_conversation
+
+
+def _install_stub_scorer(delay: float):
+    def completion(**kwargs):
+        time.sleep(delay)
+        return litellm.completion(model="gpt-3.5-turbo", messages=kwargs["messages"], mock_response="8.0")
+
+    async def acompletion(**kwargs):
+        await asyncio.sleep(delay)
+        return await litellm.acompletion(model="gpt-3.5-turbo", messages=kwargs["messages"], mock_response="8.0")
+
+    utils.completion = completion
+    utils.acompletion = acompletion
+
+
+async def _record_files(files: int, turns: int) -> list:
+    recorder = ConversationRecorder(tempfile.mkdtemp(prefix="tia_eval_"))
+    paths = []
+    for f in range(files):
+        session_id = None
+        for t in range(turns):
+            session, response, author = await utils.run_chat(f"eval-{f}", "Eval User", "au", -27.47, 153.02, "profiler:LadderAgent", f"Turn {t}", session_id)
+            session_id = session.id
+            path = recorder.record(session.id, f"eval-{f}", f"Turn {t}", response, utils.public_state(session.state), author, "profiler:LadderAgent")
+        paths.append(path)
+    recorder.flush()
+    return paths
+
+
+async def _previous_eval(paths: list) -> float:
+    # Previous /chat/test-eval: replay and score every turn in sequence, one file at a time
+    total = 0.0
+    for path in paths:
+        expected_data = read_conversation(path)
+        session_id = None
+        for conv in expected_data["conversations"]:
+            session, actual, _ = await utils.run_chat(expected_data["user_id"], "Unknown", "au", 0.0, 0.0, "profiler:LadderAgent", conv["message"], session_id)
+            session_id = session.id
+            utils.score_cache.clear()  # the previous flow had no cache
+            total += utils.compare_responses(actual, conv["response"])
+    return total
+
+
+async def main(files: int, turns: int, delay: float, score_delay: float, concurrency: int, as_json: bool):
+    install_stub_llm(delay)
+    _install_stub_scorer(score_delay)
+    paths = await _record_files(files, turns)
+
+    start = time.perf_counter()
+    await _previous_eval(paths)
+    previous_s = time.perf_counter() - start
+
+    utils.score_cache.clear()
+    cold = await evaluation.evaluate_files(paths, max_concurrency=concurrency)
+    warm = await evaluation.evaluate_files(paths, max_concurrency=concurrency)
+
+    turn_latencies = [turn["chat_latency_ms"] for f in cold["files"] for turn in f.get("turns", [])]
+    result = {
+        "files": files,
+        "turns_per_file": turns,
+        "llm_delay_s": delay,
+        "score_delay_s": score_delay,
+        "previous_s": round(previous_s, 3),
+        "runner_cold_s": round(cold["latency_ms"] / 1000, 3),
+        "runner_warm_s": round(warm["latency_ms"] / 1000, 3),
+        "failed": cold["failed"],
+        "mean_file_ms": round(sum(f["latency_ms"] for f in cold["files"]) / len(cold["files"]), 3),
+        "mean_turn_chat_ms": round(sum(turn_latencies) / len(turn_latencies), 3) if turn_latencies else 0.0,
+        "score_cache": utils.score_cache.stats(),
+    }
+    if as_json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{files} files x {turns} turns, LLM {delay}s, scoring {score_delay}s")
+    print(f"previous sequential: {result['previous_s']}s")
+    print(f"runner cold cache:   {result['runner_cold_s']}s (mean file {result['mean_file_ms']} ms, mean turn {result['mean_turn_chat_ms']} ms)")
+    print(f"runner warm cache:   {result['runner_warm_s']}s (score cache hit rate {result['score_cache']['hit_rate']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the conversation evaluation runner.")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.05, help="Simulated seconds per agent LLM call.")
+    parser.add_argument("--score-delay", type=float, default=0.3, help="Simulated seconds per scoring call.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(main(args.files, args.turns, args.delay, args.score_delay, args.concurrency, args.json))
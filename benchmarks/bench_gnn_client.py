@@ -0,0 +1,77 @@
+"""
+GNN partner lookups through the pooled client versus a bare requests.get per call.
+
+Starts the GNN stub server (stub_servers.py) and times `--calls` lookups in three scenarios:
+a healthy service with distinct users (connection reuse), repeated lookups for the same user (response
+cache), and a service that hangs for `--slow-delay` seconds (circuit breaker). The previous code paid the
+full hang on every call; the client pays its read timeout until the breaker opens, then skips the API.
+
+Run from the repository root:
+    python -m benchmarks.bench_gnn_client --calls 20 --slow-delay 1.0
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, json, time
+
+import requests
+
+from TIA_Smart_chat_v3.tia_agent.sub_agents.connect_agent import gnn_client
+from .stub_servers import Latency, start_gnn_server
+
+
+def _previous_lookup(base_url: str, user_id: int):
+    try:
+        response = requests.get(f"{base_url}/user/{user_id}/complementary-partners", timeout=10)
+        response.raise_for_status()
+        return response.json()["partners"] or None
+    except Exception:
+        return None
+
+
+def _time_calls(lookup, calls: int, same_user: bool) -> dict:
+    start = time.perf_counter()
+    found = sum(lookup(1 if same_user else i + 1) is not None for i in range(calls))
+    elapsed = time.perf_counter() - start
+    return {"found": found, "wall_s": round(elapsed, 3), "per_call_ms": round(elapsed / calls * 1000, 2)}
+
+
+def main(calls: int, delay: float, slow_delay: float, read_timeout: float, as_json: bool):
+    server = start_gnn_server()
+    base_url = f"{server.base_url}/api/gnn"
+
+    def client_lookup(client):
+        return lambda user_id: client.get_partners(user_id, "complementary")
+
+    results = {}
+    for scenario, same_user, server_delay in (("distinct_users", False, delay), ("same_user", True, delay), ("slow_service", False, slow_delay)):
+        server.latency = Latency("fixed", server_delay * 1000)
+        gnn_client.gnn_cache.clear()
+        client = gnn_client.GNNClient(base_url, read_timeout=read_timeout, breaker=gnn_client.CircuitBreaker(3, 60))
+        results[scenario] = {
+            "previous": _time_calls(lambda user_id: _previous_lookup(base_url, user_id), calls, same_user),
+            "client": _time_calls(client_lookup(client), calls, same_user),
+            "client_stats": client.stats(),
+        }
+        client.close()
+    server.shutdown()
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{calls} lookups, service latency {delay}s, slow service {slow_delay}s, client read timeout {read_timeout}s")
+    print(f"{'scenario':>15} {'previous ms/call':>17} {'client ms/call':>15} {'requests':>9} {'breaker':>10}")
+    for scenario, row in results.items():
+        stats = row["client_stats"]
+        print(f"{scenario:>15} {row['previous']['per_call_ms']:>17} {row['client']['per_call_ms']:>15} {stats['requests']:>9} {stats['breaker']['state']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pooled GNN client.")
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.005)
+    parser.add_argument("--slow-delay", type=float, default=1.0)
+    parser.add_argument("--read-timeout", type=float, default=0.3)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    main(args.calls, args.delay, args.slow_delay, args.read_timeout, args.json)
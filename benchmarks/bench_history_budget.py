@@ -0,0 +1,94 @@
+"""
+Prompt tokens per DynamicChatAssistant turn as a phase grows.
+
+Drives the vision chat's reflection phase with long answers through a stubbed completion, once with the
+token-budgeted history window and once with the budget lifted (the previous full-history behaviour), and
+reports the prompt tokens of every main call and the extra summary calls. Exits non-zero if a budgeted turn
+exceeds system prompt + summary + HISTORY_TOKEN_BUDGET.
+
+Run from the repository root:
+    python -m benchmarks.bench_history_budget --turns 30 --answer-words 250
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, json, sys
+from types import SimpleNamespace
+
+from TIA_Smart_chat_v3.tia_agent import tokens
+from TIA_Smart_chat_v3.tia_agent.sub_agents import DynamicChatAssistant as dca
+from TIA_Smart_chat_v3.tia_agent.shared_state import VISION_PROMPTS, VISION_RULE_PROMPT
+
+ANSWER = ("When I started the business I imagined flexible days, a small team that felt like family and clients "
+          "who trusted us with their growth. Some of that came true, some of it took far longer than expected. ")
+QUESTION = "Thanks for sharing that, it clearly matters to you. What does your product do for the end user in human terms?"
+SUMMARY = "- Asked about early expectations; user wanted flexible days, a close team and trusting clients. " * 12
+
+
+class StubCompletion:
+    """Stands in for litellm.completion, recording the prompt tokens of every call."""
+    def __init__(self):
+        self.main_calls, self.summary_calls = [], []
+
+    def __call__(self, model, messages, **kwargs):
+        is_summary = messages[0]["content"] == dca.HISTORY_SUMMARY_PROMPT
+        (self.summary_calls if is_summary else self.main_calls).append(tokens.count_message_tokens(messages))
+        text = SUMMARY if is_summary else QUESTION
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def _run_phase(turns: int, answer_words: int, budget: int) -> dict:
+    dca.HISTORY_TOKEN_BUDGET = budget
+    stub = StubCompletion()
+    dca.completion = stub
+    assistant = dca.DynamicChatAssistant(VISION_PROMPTS, VISION_RULE_PROMPT, "bench-user")
+    assistant.current_phase = 1
+    assistant.system_prompt = assistant._get_wrapped_prompt(1)
+    answer = " ".join((ANSWER * (answer_words // len(ANSWER.split()) + 1)).split()[:answer_words])
+    for _ in range(turns):
+        assistant.send_message(answer)
+    return {
+        "max_prompt_tokens": max(stub.main_calls),
+        "last_prompt_tokens": stub.main_calls[-1],
+        "total_prompt_tokens": sum(stub.main_calls) + sum(stub.summary_calls),
+        "summary_calls": len(stub.summary_calls),
+        "questions_summarized": assistant.summarized_questions,
+        "per_turn": stub.main_calls,
+    }
+
+
+def main(turns: int, answer_words: int, as_json: bool) -> bool:
+    budget = dca.HISTORY_TOKEN_BUDGET
+    system_tokens = tokens.count_message_tokens([{"content": VISION_RULE_PROMPT.format(chat_prompt=VISION_PROMPTS[1])}])
+    # System prompt, summary message (summary plus its framing sentence) and the recent history
+    bound = system_tokens + dca.HISTORY_SUMMARY_MAX_TOKENS + 60 + budget
+    results = {
+        "tokenizer": "tiktoken" if tokens._encoding() is not None else f"estimate ({tokens.CHARS_PER_TOKEN} chars/token)",
+        "turns": turns,
+        "answer_words": answer_words,
+        "history_token_budget": budget,
+        "prompt_token_bound": bound,
+        "full_history": _run_phase(turns, answer_words, sys.maxsize),
+        "budgeted": _run_phase(turns, answer_words, budget),
+    }
+    ok = results["budgeted"]["max_prompt_tokens"] <= bound
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{turns} turns of {answer_words}-word answers, history budget {budget} tokens, tokenizer: {results['tokenizer']}")
+        print(f"{'':>14} {'max prompt':>11} {'last prompt':>12} {'total tokens':>13} {'summary calls':>14}")
+        for name in ("full_history", "budgeted"):
+            row = results[name]
+            print(f"{name:>14} {row['max_prompt_tokens']:>11} {row['last_prompt_tokens']:>12} {row['total_prompt_tokens']:>13} {row['summary_calls']:>14}")
+        print(f"Budgeted prompts {'stay within' if ok else 'EXCEED'} the bound of {bound} tokens")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark prompt tokens per DynamicChatAssistant turn.")
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--answer-words", type=int, default=250)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.turns, args.answer_words, args.json) else 1)
@@ -0,0 +1,78 @@
+"""
+Repeated connection searches with the utility LLM response cache.
+
+Runs `extract_business_type` and `recommended_WEB_connection` for the same profile several times with a
+stubbed completion (fixed latency) and a stubbed RapidAPI search, once clearing the response cache before
+every search (the previous behaviour) and once with the cache kept, and reports completions made and wall time.
+
+Run from the repository root:
+    python -m benchmarks.bench_llm_cache --searches 10 --delay 0.5
+"""
+from .stubs import setup_env, STUB_PROFILE
+setup_env()
+
+import argparse, asyncio, json, time
+from types import SimpleNamespace
+
+from TIA_Smart_chat_v3.tia_agent.sub_agents import DynamicChatAssistant as dca
+from TIA_Smart_chat_v3.tia_agent.sub_agents.connect_agent import utils as connect_utils
+
+ATTRIBUTES = {"user_id": 1, "region": "au", "lat": -27.47, "lng": 153.02, "profile": STUB_PROFILE, "connection_type": "complementary", "ConnectAgent": {}}
+
+
+class StubACompletion:
+    """Stands in for litellm.acompletion with a fixed latency."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, model, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="IT Consulting"))])
+
+
+def _stub_search(business_type, limit, region, zoom, lat, lng, language="en"):
+    return {"data": [{"name": f"{business_type} {i}"} for i in range(limit)]}
+
+
+async def _run(searches: int, delay: float, keep_cache: bool) -> dict:
+    stub = StubACompletion(delay)
+    dca.acompletion = stub
+    dca.response_cache.clear()
+    hits_before = dca.response_cache.stats()["hits"]
+    start = time.perf_counter()
+    for _ in range(searches):
+        if not keep_cache:
+            dca.response_cache.clear()
+        await connect_utils.extract_business_type(STUB_PROFILE)
+        await connect_utils.recommended_WEB_connection(ATTRIBUTES)
+    elapsed = time.perf_counter() - start
+    return {"completions": stub.calls, "cache_hits": dca.response_cache.stats()["hits"] - hits_before, "wall_s": round(elapsed, 3), "per_search_ms": round(elapsed / searches * 1000, 1)}
+
+
+async def main(searches: int, delay: float, as_json: bool):
+    connect_utils.search_businesses_in_area = _stub_search
+    results = {
+        "searches": searches,
+        "delay_s": delay,
+        "uncached": await _run(searches, delay, keep_cache=False),
+        "cached": await _run(searches, delay, keep_cache=True),
+    }
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{searches} searches for the same profile, {delay}s per completion")
+    print(f"{'':>9} {'completions':>12} {'cache hits':>11} {'wall s':>8} {'ms/search':>10}")
+    for name in ("uncached", "cached"):
+        row = results[name]
+        print(f"{name:>9} {row['completions']:>12} {row['cache_hits']:>11} {row['wall_s']:>8} {row['per_search_ms']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark repeated connection searches with the LLM response cache.")
+    parser.add_argument("--searches", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    asyncio.run(main(args.searches, args.delay, args.json))
@@ -0,0 +1,112 @@
+"""
+CPU spent in chat-path logging per turn.
+
+Replays the log statements a ConnectAgent turn makes (runner events, final state, recommended_connection
+and generate_email payloads) against a state holding a large `connection_result`, comparing the previous
+eager f-string statements with the lazy `payload()` ones. Measured with debug logging disabled (INFO) and
+enabled (DEBUG, records are formatted and discarded).
+
+Run from the repository root:
+    python -m benchmarks.bench_logging --businesses 10 50 200 --turns 200
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, json, logging, time
+
+from TIA_Smart_chat_v3.tia_agent.logging_utils import payload
+
+EVENTS_PER_TURN = 6
+logger = logging.getLogger("benchmarks.chat_logging")
+
+
+class FormattingNullHandler(logging.Handler):
+    """Formats every record like a real handler would, then drops it."""
+    def emit(self, record):
+        self.format(record)
+
+
+def _state(businesses: int) -> dict:
+    connection_result = [
+        {
+            "name": f"Partner {i}",
+            "about": "Managed IT services, cloud migration and cyber security for small and medium businesses. " * 4,
+            "full_address": f"{i} Queen St, Brisbane QLD 4000",
+            "rating": 4.5,
+            "type": "IT Services",
+            "website": f"https://partner{i}.example",
+            "reviews": [{"author": "Client", "text": "Great work on our migration." * 3} for _ in range(3)],
+        }
+        for i in range(businesses)
+    ]
+    return {
+        "user_id": 1, "name": "Bench User", "region": "au", "set_agent": "ConnectAgent", "connection_type": "complementary",
+        "Generated_Profile": {"UserName": "Sam", "Business_Type": "IT Consulting", "User_skills": "Python, Cloud"},
+        "ConnectAgent": {"connection_type": "Web Search", "connection_result": connection_result},
+    }
+
+
+def _previous_turn(state: dict, event: str):
+    connection_result = state["ConnectAgent"]["connection_result"]
+    for _ in range(EVENTS_PER_TURN):
+        logger.debug(f"[CHAT EVENT]\nEvent: {event}\nSession ID: bench\nState: {json.dumps(state, indent=2)}")
+    logger.debug(f"Tool_context.state type: {state}")
+    logger.debug(f"Tool_context.state: {state}")
+    logger.debug(f"Connection result for email generation: {connection_result}")
+    logger.debug(f"Filtered businesses for email generation: {connection_result[:3]}")
+    logger.debug(f"Filtered businesses: {connection_result[:3]}")
+    logger.debug(f"Creating email templates for: {connection_result[:3]}")
+    logger.debug(f"Final session state after chat: {state}")
+
+
+def _lazy_turn(state: dict, event: str):
+    connection_result = state["ConnectAgent"]["connection_result"]
+    for _ in range(EVENTS_PER_TURN):
+        logger.debug("[CHAT EVENT]\nEvent: %s\nSession ID: %s\nState: %s", payload(event), "bench", payload(state))
+    logger.debug("Tool_context.state: %s", payload(state))
+    logger.debug("Connection result for email generation: %s", payload(connection_result))
+    logger.debug("Filtered businesses for email generation: %s", payload(connection_result[:3]))
+    logger.debug("Creating email templates for: %s", payload(connection_result[:3]))
+    logger.debug("Final session state after chat: %s", payload(state))
+
+
+def _cpu_ms_per_turn(turn, state: dict, turns: int) -> float:
+    event = "Event(author='ConnectAgent', content=...)" * 20
+    start = time.process_time()
+    for _ in range(turns):
+        turn(state, event)
+    return round((time.process_time() - start) / turns * 1000, 4)
+
+
+def main(business_counts: list, turns: int, as_json: bool):
+    handler = FormattingNullHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    results = []
+    for businesses in business_counts:
+        state = _state(businesses)
+        row = {"businesses": businesses, "state_chars": len(json.dumps(state)), "turns": turns}
+        for level in ("INFO", "DEBUG"):
+            logger.setLevel(level)
+            row[f"{level.lower()}_previous_ms"] = _cpu_ms_per_turn(_previous_turn, state, turns)
+            row[f"{level.lower()}_lazy_ms"] = _cpu_ms_per_turn(_lazy_turn, state, turns)
+        results.append(row)
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print("CPU ms per turn")
+    print(f"{'businesses':>10} {'state chars':>12} {'INFO prev':>10} {'INFO lazy':>10} {'DEBUG prev':>11} {'DEBUG lazy':>11}")
+    for row in results:
+        print(f"{row['businesses']:>10} {row['state_chars']:>12} {row['info_previous_ms']:>10} {row['info_lazy_ms']:>10} {row['debug_previous_ms']:>11} {row['debug_lazy_ms']:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CPU spent in chat-path logging per turn.")
+    parser.add_argument("--businesses", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    main(args.businesses, args.turns, args.json)
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark for the user profile loader.
+
+Compares the single round trip profile query used by load_user_profile against the previous path of
+eight sequential queries, on a seeded benchmark database (see benchmarks/mysql_seed.py), and checks
+both paths return identical fields.
+
+Run from the repository root with DB_HOST, DB_PORT, DB_USER and DB_PASS pointing at a MySQL server:
+    python -m benchmarks.bench_profile_loader --users 200 --loads 2000
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, json, random, statistics, time
+
+from .mysql_seed import prepare_bench_database, seed_profiles
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _measure(loader, user_ids: list, loads: int) -> dict:
+    from TIA_Smart_chat_v3.tia_agent.db import get_connection
+    timings = []
+    for _ in range(loads):
+        user_id = random.choice(user_ids)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            start = time.perf_counter()
+            loader(cursor, user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+            cursor.close()
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "p99_ms": round(_percentile(timings, 99), 3),
+    }
+
+
+def main(users: int, loads: int, as_json: bool):
+    prepare_bench_database()
+    user_ids = seed_profiles(users)
+    user_ids.append(max(user_ids) + 1000)  # Unknown user, exercises the not-found path
+
+    from TIA_Smart_chat_v3.tia_agent import utils
+    from TIA_Smart_chat_v3.tia_agent.db import get_connection
+
+    # Both paths must agree on every seeded user
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        mismatches = [uid for uid in user_ids if utils._get_profile_fields_sequential(cursor, uid) != utils._get_profile_fields(cursor, uid)]
+        cursor.close()
+
+    random.seed(11)
+    results = {
+        "users": users,
+        "loads": loads,
+        "mismatched_profiles": mismatches,
+        "sequential": {"queries_per_load": 8, **_measure(utils._get_profile_fields_sequential, user_ids, loads)},
+        "single_round_trip": {"queries_per_load": 1, **_measure(utils._get_profile_fields, user_ids, loads)},
+    }
+    results["speedup_mean"] = round(results["sequential"]["mean_ms"] / results["single_round_trip"]["mean_ms"], 2)
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Seeded users: {users}, loads per path: {loads}, mismatches: {len(mismatches)}")
+    for label in ("sequential", "single_round_trip"):
+        row = results[label]
+        print(f"{label:>18}: {row['queries_per_load']} queries, mean {row['mean_ms']} ms, p50 {row['p50_ms']} ms, p95 {row['p95_ms']} ms, p99 {row['p99_ms']} ms")
+    print(f"Mean speedup: {results['speedup_mean']}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the single round trip profile loader against sequential queries.")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--loads", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    main(args.users, args.loads, args.json)
@@ -0,0 +1,134 @@
+"""
+Benchmark for the ProfilerAgent skill / strength write path.
+
+Runs insert_user_skills, insert_user_strengths and insert_business_strengths against a seeded
+benchmark database (see benchmarks/mysql_seed.py) and compares them with the previous per-item
+statements (INSERT, SELECT id, link INSERT for every name). Each run is rolled back so both paths
+see the same data. Reports statements executed and latency per profile save.
+
+Run from the repository root with DB_HOST, DB_PORT, DB_USER and DB_PASS pointing at a MySQL server:
+    python -m benchmarks.bench_profile_writes --items 1 5 10 --runs 200
+"""
+from .stubs import setup_env
+setup_env()
+
+import argparse, json, statistics, time
+
+from .mysql_seed import prepare_bench_database, seed_profiles
+
+
+class CountingCursor:
+    """Cursor proxy that counts executed statements."""
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.statements = 0
+
+    def execute(self, query, args=None):
+        self.statements += 1
+        return self._cursor.execute(query, args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# Previous per-item implementation, kept here as the baseline
+def per_item_user_skills(cursor, user_id, user_skills, skill_category_id):
+    skill_ids = []
+    for skill in user_skills:
+        cursor.execute("INSERT IGNORE INTO skills (name, category_id) VALUES (%s, %s)", (skill, skill_category_id))
+        cursor.execute("SELECT id FROM skills WHERE name=%s", (skill,))
+        skill_id = cursor.fetchone()[0]
+        cursor.execute("INSERT IGNORE INTO user_skills (user_id, skill_id) VALUES (%s, %s)", (user_id, skill_id))
+        skill_ids.append(skill_id)
+    return skill_ids
+
+
+def per_item_user_strengths(cursor, user_id, user_strengths, strength_category_id):
+    strength_ids = []
+    for strength in user_strengths:
+        cursor.execute("INSERT INTO strengths (name, category_id) VALUES (%s, %s) ON DUPLICATE KEY UPDATE name=name", (strength, strength_category_id))
+        cursor.execute("SELECT id FROM strengths WHERE name=%s", (strength,))
+        strength_id = cursor.fetchone()[0]
+        cursor.execute("INSERT IGNORE INTO user_strengths (user_id, strength_id) VALUES (%s, %s)", (user_id, strength_id))
+        strength_ids.append(strength_id)
+    return strength_ids
+
+
+def per_item_business_strengths(cursor, user_id, business_strengths, business_role_id, business_phase_id):
+    business_strength_ids = []
+    for b_strength in business_strengths:
+        cursor.execute("SELECT id FROM business_strengths WHERE name=%s", (b_strength,))
+        result = cursor.fetchone()
+        if result:
+            business_strength_id = result[0]
+        else:
+            cursor.execute(
+                "INSERT INTO business_strengths (name, business_role_id, business_phase_id) VALUES (%s, %s, %s)",
+                (b_strength, business_role_id, business_phase_id)
+            )
+            business_strength_id = cursor.lastrowid
+        cursor.execute("INSERT IGNORE INTO user_business_strengths (user_id, business_strength_id) VALUES (%s, %s)", (user_id, business_strength_id))
+        business_strength_ids.append(business_strength_id)
+    return business_strength_ids
+
+
+def _names(prefix: str, items: int, run: int) -> list:
+    # Half the names already exist in the seeded data, half are new for this run
+    existing = [f"{prefix} 0-{j}" for j in range(items // 2)]
+    new = [f"{prefix} bench-{run}-{j}" for j in range(items - len(existing))]
+    return existing + new
+
+
+def _measure(paths, user_id: int, items: int, runs: int) -> dict:
+    from TIA_Smart_chat_v3.tia_agent.db import get_connection
+    insert_skills, insert_strengths, insert_business_strengths = paths
+    timings, statements = [], []
+    with get_connection() as conn:
+        for run in range(runs):
+            cursor = CountingCursor(conn.cursor())
+            start = time.perf_counter()
+            insert_skills(cursor, user_id, _names("Skill", items, run), None)
+            insert_strengths(cursor, user_id, _names("Strength", items, run), None)
+            insert_business_strengths(cursor, user_id, _names("Business Strength", items, run), None, None)
+            timings.append((time.perf_counter() - start) * 1000)
+            statements.append(cursor.statements)
+            conn.rollback()
+    return {
+        "statements": statistics.mean(statements),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p95_ms": round(sorted(timings)[int(0.95 * (len(timings) - 1))], 3),
+    }
+
+
+def main(item_counts: list, runs: int, as_json: bool):
+    prepare_bench_database()
+    user_id = seed_profiles(users=20)[0]
+
+    from TIA_Smart_chat_v3.tia_agent.sub_agents.profiler_agent import utils
+    per_item = (per_item_user_skills, per_item_user_strengths, per_item_business_strengths)
+    bulk = (utils.insert_user_skills, utils.insert_user_strengths, utils.insert_business_strengths)
+
+    results = []
+    for items in item_counts:
+        results.append({
+            "items_per_list": items,
+            "runs": runs,
+            "per_item": _measure(per_item, user_id, items, runs),
+            "bulk": _measure(bulk, user_id, items, runs),
+        })
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'items':>5} {'per-item stmts':>15} {'bulk stmts':>11} {'per-item ms':>12} {'bulk ms':>8} {'per-item p95':>13} {'bulk p95':>9}")
+    for row in results:
+        print(f"{row['items_per_list']:>5} {row['per_item']['statements']:>15} {row['bulk']['statements']:>11} {row['per_item']['mean_ms']:>12} {row['bulk']['mean_ms']:>8} {row['per_item']['p95_ms']:>13} {row['bulk']['p95_ms']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk vs per-item profile skill and strength writes.")
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    main(args.items, args.runs, args.json)
@@ -0,0 +1,110 @@
+"""
+Load test of the ConnectAgent `recommended_connection` tool against the GNN and RapidAPI stub servers.
+
+Runs `--users` lookups with `--concurrency` in flight, each through the real tool: the GNN partners API via the
+pooled client, and for users the GNN has nothing for (or while it is failing) the web search fallback with
+query generation stubbed. Latency distribution, error and hang rates of the stubs are configurable.
+Reports tool latency percentiles, which source answered, and the stub and client counters.
+
+Run from the repository root:
+    python -m benchmarks.bench_recommended_connection --users 200 --concurrency 20 --latency-ms 80 --error-rate 0.05
+"""
+from .stubs import setup_env, STUB_PROFILE
+setup_env()
+
+import argparse, asyncio, json, random, time
+from collections import Counter
+from types import SimpleNamespace
+
+from TIA_Smart_chat_v3.tia_agent.sub_agents import DynamicChatAssistant as dca
+from TIA_Smart_chat_v3.tia_agent.sub_agents.connect_agent import gnn_client, rapidapi_client
+from TIA_Smart_chat_v3.tia_agent.sub_agents.connect_agent.tools import recommended_connection
+from .stub_servers import Latency, start_gnn_server, start_rapidapi_server
+
+CONNECTION_TYPES = ["complementary", "alliance", "mastermind", "intelligent"]
+CITY = (-27.4705, 153.0260)
+
+
+async def _stub_acompletion(model, messages, **kwargs):
+    await asyncio.sleep(0.05)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="IT Consulting"))])
+
+
+def _state(user_id: int, rng: random.Random) -> dict:
+    return {
+        "user_id": user_id, "name": "Load Test", "region": "au",
+        "lat": CITY[0] + rng.uniform(-0.1, 0.1), "lng": CITY[1] + rng.uniform(-0.1, 0.1),
+        "Generated_Profile": dict(STUB_PROFILE), "connection_type": rng.choice(CONNECTION_TYPES),
+    }
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * pct), len(ordered) - 1)] * 1000, 1)
+
+
+async def main(users: int, concurrency: int, latency: Latency, error_rate: float, hang_rate: float, gnn_empty_rate: float, read_timeout: float, as_json: bool):
+    gnn = start_gnn_server(latency=latency, error_rate=error_rate, hang_rate=hang_rate, hang_s=read_timeout * 4, empty_rate=gnn_empty_rate)
+    rapidapi = start_rapidapi_server(latency=latency, error_rate=error_rate, hang_rate=hang_rate, hang_s=read_timeout * 4)
+    gnn_client._client = gnn_client.GNNClient(f"{gnn.base_url}/api/gnn", pool_size=concurrency, read_timeout=read_timeout)
+    rapidapi_client._client = rapidapi_client.BusinessSearchClient("127.0.0.1", "bench", pool_size=concurrency, timeout=read_timeout, base_url=rapidapi.base_url)
+    dca.acompletion = _stub_acompletion
+
+    rng = random.Random(1)
+    states = [_state(user_id, rng) for user_id in range(1, users + 1)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, sources = [], Counter()
+
+    async def lookup(state: dict):
+        async with semaphore:
+            start = time.perf_counter()
+            result = await recommended_connection(SimpleNamespace(state=state))
+            latencies.append(time.perf_counter() - start)
+            sources[result.get("connection_type") if result.get("status") == "success" else "error"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(lookup(state) for state in states))
+    wall = time.perf_counter() - start
+    gnn.shutdown()
+    rapidapi.shutdown()
+
+    results = {
+        "users": users,
+        "concurrency": concurrency,
+        "latency": vars(latency),
+        "error_rate": error_rate,
+        "hang_rate": hang_rate,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(users / wall, 1),
+        "tool_latency_ms": {"p50": _percentile(latencies, 0.5), "p95": _percentile(latencies, 0.95), "max": _percentile(latencies, 1.0)},
+        "sources": dict(sources),
+        "gnn_server": gnn.counts,
+        "rapidapi_server": rapidapi.counts,
+        "gnn_client": gnn_client.gnn_stats(),
+        "business_search": rapidapi_client.business_search_stats(),
+    }
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{users} lookups, concurrency {concurrency}, stub latency {latency.kind} {latency.ms}ms, error rate {error_rate}, hang rate {hang_rate}")
+    print(f"Wall {results['wall_s']}s ({results['throughput_per_s']}/s), tool latency p50 {results['tool_latency_ms']['p50']}ms, "
+          f"p95 {results['tool_latency_ms']['p95']}ms, max {results['tool_latency_ms']['max']}ms")
+    print(f"Answered by: {dict(sources)}")
+    print(f"GNN stub: {gnn.counts}, breaker: {results['gnn_client']['breaker']}")
+    print(f"RapidAPI stub: {rapidapi.counts}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test recommended_connection against the GNN and RapidAPI stub servers.")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--gnn-empty-rate", type=float, default=0.3)
+    parser.add_argument("--read-timeout", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.concurrency, Latency(args.latency, args.latency_ms, args.spread), args.error_rate, args.hang_rate, args.gnn_empty_rate, args.read_timeout, args.json))
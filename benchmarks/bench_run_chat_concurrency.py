@@ -0,0 +1,79 @@
+"""
+Concurrency benchmark for run_chat.
+
+Drives N concurrent chat turns through the app's Runner with a stubbed LLM (fixed latency per call)
+and compares the native `runner.run_async` path used by run_chat against the old pattern of iterating
+the synchronous `runner.run` inside a coroutine, which blocks the event loop for the whole turn.
+`--db-delay` makes the stubbed profile load block its thread for that long, like a slow pymysql query.
+
+Run from the repository root:
+    python -m benchmarks.bench_run_chat_concurrency --concurrency 1 4 16 --delay 0.2
+"""
+from .stubs import setup_env, install_stub_llm
+setup_env()
+
+import argparse, asyncio, json, logging, time
+
+from google.genai import types
+from TIA_Smart_chat_v3 import utils
+from TIA_Smart_chat_v3.tia_agent import tools
+from .stubs import stub_load_user_profile
+
+
+async def _async_turn(i: int):
+    await utils.run_chat(f"bench-{i}", "Bench User", "au", -27.47, 153.02, "profiler:LadderAgent", "Hi there")
+
+
+async def _blocking_turn(i: int):
+    session = await utils._create_new_session(f"bench-{i}", "Bench User", "au", -27.47, 153.02, "profiler:LadderAgent")
+    message = types.Content(role="user", parts=[types.Part(text="Hi there")])
+    for _ in utils.runner.run(user_id=session.user_id, session_id=session.id, new_message=message):
+        pass
+
+
+async def _measure(turn, concurrency: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(turn(i) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def _blocking_profile_load(db_delay: float):
+    def load_user_profile(user_id):
+        time.sleep(db_delay)
+        return stub_load_user_profile(user_id)
+    return load_user_profile
+
+
+async def main(concurrency_levels: list, delay: float, db_delay: float, as_json: bool):
+    client = install_stub_llm(delay)
+    if db_delay:
+        tools.load_user_profile = _blocking_profile_load(db_delay)
+    results = []
+    for concurrency in concurrency_levels:
+        row = {"concurrency": concurrency, "llm_delay_s": delay, "db_delay_s": db_delay}
+        for label, turn in (("run_async", _async_turn), ("blocking_run", _blocking_turn)):
+            client.calls = 0
+            elapsed = await _measure(turn, concurrency)
+            row[f"{label}_wall_s"] = round(elapsed, 3)
+            row[f"{label}_turns_per_s"] = round(concurrency / elapsed, 2)
+            row[f"{label}_llm_calls"] = client.calls
+        row["speedup"] = round(row["blocking_run_wall_s"] / row["run_async_wall_s"], 2)
+        results.append(row)
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'concurrency':>11} {'run_async s':>12} {'blocking s':>11} {'async t/s':>10} {'blocking t/s':>13} {'speedup':>8}")
+    for row in results:
+        print(f"{row['concurrency']:>11} {row['run_async_wall_s']:>12} {row['blocking_run_wall_s']:>11} {row['run_async_turns_per_s']:>10} {row['blocking_run_turns_per_s']:>13} {row['speedup']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent run_chat turns with a stubbed LLM.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--delay", type=float, default=0.2, help="Simulated seconds per LLM call.")
+    parser.add_argument("--db-delay", type=float, default=0.0, help="Seconds each profile load blocks its thread.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main(args.concurrency, args.delay, args.db_delay, args.json))
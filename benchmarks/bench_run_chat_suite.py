@@ -0,0 +1,256 @@
+"""
+End-to-end run_chat latency suite, one scenario per chat type.
+
+For each chat type (`profiler:VisionAgent` in its DynamicChatAssistant phase, `profiler:LadderAgent` and
+`connect:<type>`) runs `--sessions` sessions of `--turns` turns through `run_chat`, with the agent LLM and the
+DynamicChatAssistant completion stubbed at a fixed latency and ADK sessions in SQLite. Reports per chat type:
+turn latency p50/p95/p99, LLM calls per turn, session service calls and SQL statements per turn, and memory
+allocated per turn (tracemalloc peak and retained bytes, measured in a separate pass so tracing does not skew latency)
+the size of the state returned to the client, which must not grow by more than `--max-state-growth` bytes over a session,
+and the largest state delta a turn persists, which must stay under `--max-event-bytes` however long the session
+(e.g. `--chat-types profiler:VisionAgent --turns 60`).
+
+Results are machine-readable (`--output results.json`, tagged with the git commit) and can be compared against
+an earlier run (`--compare baseline.json`), exiting non-zero if any p95 regressed by more than `--max-regression`.
+
+Run from the repository root:
+    python -m benchmarks.bench_run_chat_suite --turns 5 --sessions 10 --output bench.json
+    python -m benchmarks.bench_run_chat_suite --compare bench.json --max-regression 0.2
+"""
+from .stubs import setup_env, install_stub_llm
+setup_env()
+
+import argparse, asyncio, json, logging, platform, subprocess, sys, time, tracemalloc
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from google.adk.events import Event, EventActions
+from sqlalchemy import event as sa_event
+
+from TIA_Smart_chat_v3 import utils
+from TIA_Smart_chat_v3.tia_agent.sub_agents import DynamicChatAssistant as dca
+
+CHAT_TYPES = ["profiler:VisionAgent", "profiler:LadderAgent", "connect:complementary", "connect:alliance", "connect:mastermind", "connect:intelligent"]
+MESSAGE = "We build custom software for small logistics companies and want to grow through referrals."
+
+
+class Counters:
+    """LLM calls (agent and DynamicChatAssistant) and SQL statements made so far."""
+    def __init__(self, agent_client):
+        self.agent_client = agent_client
+        self.assistant_calls = 0
+        self.sql_statements = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "llm_calls": self.agent_client.calls + self.assistant_calls,
+            "sql_statements": self.sql_statements,
+            "session_calls": sum(utils.session_service.stats()["calls"].values()),
+        }
+
+
+def _install_assistant_stub(counters: Counters, delay: float):
+    async def acompletion(model, messages, **kwargs):
+        counters.assistant_calls += 1
+        await asyncio.sleep(delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Thanks for sharing! What made you start the business?"))])
+    dca.acompletion = acompletion
+
+
+async def _new_session(user_id: str, chat_type: str):
+    session = await utils._create_new_session(user_id, "Bench User", "au", -27.47, 153.02, chat_type)
+    if chat_type == "profiler:VisionAgent":
+        # Start in the DynamicChatAssistant phase, as if the VisionAgent had already called its start tool
+        await utils.session_service.append_event(session, Event(
+            invocation_id=Event.new_id(), author="VisionAgent", actions=EventActions(state_delta={"VisionAgent": {"chat_state": "chat"}})
+        ))
+    return session
+
+
+def _state_bytes(session) -> int:
+    return len(json.dumps(utils.public_state(session.state), default=str))
+
+
+def _event_bytes(session, start: int) -> int:
+    """Largest state delta among the session events from index start, i.e. what one turn wrote to the events table."""
+    return max((len(json.dumps(event.actions.state_delta, default=str)) for event in session.events[start:]), default=0)
+
+
+async def _run_sessions(chat_type: str, sessions: int, turns: int, concurrency: int, on_turn=None) -> tuple:
+    """
+    Run the sessions. Returns each turn's latency in seconds and, per session, the (first, last) turn's returned state
+    size and largest persisted state delta.
+    """
+    latencies, state_sizes = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_session(i: int):
+        async with semaphore:
+            user_id = f"suite-{chat_type}-{i}"
+            session = await _new_session(user_id, chat_type)
+            sizes, deltas = [], []
+            for _ in range(turns):
+                events_before = len(session.events)
+                if on_turn:
+                    on_turn("start")
+                start = time.perf_counter()
+                session, _, _ = await utils.run_chat(user_id, "Bench User", "au", -27.47, 153.02, chat_type, MESSAGE, session.id)
+                latencies.append(time.perf_counter() - start)
+                if on_turn:
+                    on_turn("end")
+                sizes.append(_state_bytes(session))
+                deltas.append(_event_bytes(session, events_before))
+            state_sizes.append((sizes[0], sizes[-1], deltas[0], deltas[-1]))
+
+    await asyncio.gather(*(one_session(i) for i in range(sessions)))
+    return latencies, state_sizes
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(max(int(round(pct * (len(ordered) - 1))), 0), len(ordered) - 1)
+    return round(ordered[index] * 1000, 2)
+
+
+async def _measure_allocations(chat_type: str, turns: int) -> dict:
+    """tracemalloc peak above the starting point and net retained bytes per turn, over one session."""
+    peaks, retained = [], []
+    state = {}
+
+    def on_turn(phase: str):
+        if phase == "start":
+            tracemalloc.reset_peak()
+            state["start"] = tracemalloc.get_traced_memory()[0]
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - state["start"])
+            retained.append(current - state["start"])
+
+    tracemalloc.start()
+    try:
+        await _run_sessions(chat_type, 1, turns, 1, on_turn)
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kb_per_turn": round(sum(peaks) / len(peaks) / 1024, 1),
+        "retained_kb_per_turn": round(sum(retained) / len(retained) / 1024, 1),
+    }
+
+
+async def _scenario(chat_type: str, sessions: int, turns: int, concurrency: int, counters: Counters) -> dict:
+    before = counters.snapshot()
+    latencies, state_sizes = await _run_sessions(chat_type, sessions, turns, concurrency)
+    after = counters.snapshot()
+    total_turns = len(latencies)
+    return {
+        "turns": total_turns,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "mean": round(sum(latencies) / total_turns * 1000, 2),
+        },
+        **{f"{name}_per_turn": round((after[name] - before[name]) / total_turns, 2) for name in after},
+        "state_bytes": {
+            "first_turn_max": max(sizes[0] for sizes in state_sizes),
+            "last_turn_max": max(sizes[1] for sizes in state_sizes),
+            "max_growth": max(sizes[1] - sizes[0] for sizes in state_sizes),
+        },
+        "event_delta_bytes": {
+            "first_turn_max": max(sizes[2] for sizes in state_sizes),
+            "last_turn_max": max(sizes[3] for sizes in state_sizes),
+        },
+        **await _measure_allocations(chat_type, turns),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def _compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """Print p50/p95 and per-turn call deltas against a baseline run. False if a p95 regressed by more than max_regression."""
+    ok = True
+    print(f"\nAgainst {baseline['meta']['git_commit']} ({baseline['meta']['timestamp']}):")
+    print(f"{'chat type':>22} {'p50 ms':>16} {'p95 ms':>16} {'llm/turn':>12} {'sql/turn':>14}")
+    for chat_type, row in results["chat_types"].items():
+        base = baseline["chat_types"].get(chat_type)
+        if base is None:
+            continue
+        p95_change = (row["latency_ms"]["p95"] - base["latency_ms"]["p95"]) / base["latency_ms"]["p95"] if base["latency_ms"]["p95"] else 0.0
+        regressed = p95_change > max_regression
+        ok = ok and not regressed
+        print(f"{chat_type:>22} {base['latency_ms']['p50']:>7} -> {row['latency_ms']['p50']:<6} {base['latency_ms']['p95']:>7} -> {row['latency_ms']['p95']:<6}"
+              f" {base['llm_calls_per_turn']:>4} -> {row['llm_calls_per_turn']:<4} {base['sql_statements_per_turn']:>5} -> {row['sql_statements_per_turn']:<5}"
+              f"{'  REGRESSED' if regressed else ''}")
+    return ok
+
+
+async def main(chat_types: list, sessions: int, turns: int, concurrency: int, delay: float, output: str, compare: str, max_regression: float, max_state_growth: int, max_event_bytes: int, as_json: bool) -> bool:
+    counters = Counters(install_stub_llm(delay))
+    _install_assistant_stub(counters, delay)
+
+    def count_statement(*args):
+        counters.sql_statements += 1
+    sa_event.listen(utils.session_service.db_engine, "before_cursor_execute", count_statement)
+
+    # Warm up imports, agent construction and the SQLite schema outside the measured turns
+    await _run_sessions(chat_types[0], 1, 1, 1)
+
+    results = {
+        "meta": {
+            "git_commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sessions": sessions,
+            "turns_per_session": turns,
+            "concurrency": concurrency,
+            "llm_delay_s": delay,
+        },
+        "chat_types": {},
+    }
+    for chat_type in chat_types:
+        results["chat_types"][chat_type] = await _scenario(chat_type, sessions, turns, concurrency, counters)
+
+    unbounded = [chat_type for chat_type, row in results["chat_types"].items()
+                 if row["state_bytes"]["max_growth"] > max_state_growth or row["event_delta_bytes"]["last_turn_max"] > max_event_bytes]
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    if as_json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{sessions} sessions x {turns} turns per chat type, concurrency {concurrency}, LLM delay {delay}s, commit {results['meta']['git_commit']}")
+        print(f"{'chat type':>22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'llm/turn':>9} {'session/turn':>13} {'sql/turn':>9} {'alloc KB':>9} {'retained KB':>12}")
+        for chat_type, row in results["chat_types"].items():
+            latency = row["latency_ms"]
+            print(f"{chat_type:>22} {latency['p50']:>8} {latency['p95']:>8} {latency['p99']:>8} {row['llm_calls_per_turn']:>9} {row['session_calls_per_turn']:>13}"
+                  f" {row['sql_statements_per_turn']:>9} {row['alloc_peak_kb_per_turn']:>9} {row['retained_kb_per_turn']:>12}")
+        print(f"Returned and persisted state {'EXCEEDS its bounds for ' + ', '.join(unbounded) if unbounded else 'stays bounded'}")
+    ok = not unbounded
+    if compare:
+        with open(compare) as f:
+            ok = _compare(results, json.load(f), max_regression) and ok
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end run_chat latency suite per chat type.")
+    parser.add_argument("--chat-types", nargs="+", default=CHAT_TYPES)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=5, help="Turns per session.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Sessions run at once.")
+    parser.add_argument("--delay", type=float, default=0.05, help="Simulated seconds per LLM call.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file from an earlier run to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative p95 increase when comparing.")
+    parser.add_argument("--max-state-growth", type=int, default=2048, help="Allowed growth in bytes of the returned state over a session.")
+    parser.add_argument("--max-event-bytes", type=int, default=12288, help="Allowed bytes of the state delta persisted by the last turn.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    ok = asyncio.run(main(args.chat_types, args.sessions, args.turns, args.concurrency, args.delay, args.output, args.compare, args.max_regression, args.max_state_growth, args.max_event_bytes, args.json))
+    sys.exit(0 if ok else 1)
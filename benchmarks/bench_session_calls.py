@@ -0,0 +1,71 @@
+"""
+Session service calls per chat turn.
+
+Runs chat turns through run_chat with a stubbed LLM and reports the session service calls counted for
+each turn (including the runner's own), next to the previous pattern that read the session back after
+the runner and again before the end-of-session check. Exits non-zero if run_chat reads the session more
+than once outside the runner.
+
+Run from the repository root:
+    python -m benchmarks.bench_session_calls --turns 5
+"""
+from .stubs import setup_env, install_stub_llm
+setup_env()
+
+import argparse, asyncio, json, logging, sys
+
+from google.genai import types
+from TIA_Smart_chat_v3 import utils
+
+CHAT_ARGS = ("bench-user", "Bench User", "au", -27.47, 153.02, "profiler:LadderAgent", "Hi there")
+
+
+async def _previous_turn(session_id: str):
+    # Previous run_chat flow: load, run, then two more reads of the same session
+    user_id, message = CHAT_ARGS[0], types.Content(role="user", parts=[types.Part(text=CHAT_ARGS[-1])])
+    session = await utils._load_or_create_session(*CHAT_ARGS[:-1], session_id)
+    async for _ in utils.runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+        pass
+    session = await utils._get_existing_session(user_id, session.id)
+    session = await utils._get_existing_session(user_id, session.id)
+    return session
+
+
+async def _count(turn) -> dict:
+    # Turns run one at a time, so the change in the service totals is this turn's calls
+    before = utils.session_service.stats()["calls"]
+    await turn()
+    after = utils.session_service.stats()["calls"]
+    return {method: after[method] - before.get(method, 0) for method in after if after[method] != before.get(method, 0)}
+
+
+async def main(turns: int, as_json: bool) -> bool:
+    install_stub_llm(0)
+    session, _, _ = await utils.run_chat(*CHAT_ARGS)
+    previous_session = await _previous_turn(None)
+
+    rows = []
+    for _ in range(turns):
+        current = await _count(lambda: utils.run_chat(*CHAT_ARGS, session_id=session.id))
+        previous = await _count(lambda: _previous_turn(previous_session.id))
+        rows.append({"run_chat": current, "previous": previous})
+
+    # One read to load the session plus the runner's own read, nothing after the run
+    ok = all(row["run_chat"].get("get_session", 0) == 2 for row in rows)
+    if as_json:
+        print(json.dumps({"turns": rows, "ok": ok}, indent=2))
+    else:
+        print(f"{'turn':>4} {'get_session':>12} {'prev get_session':>17} {'append_event':>13} {'prev append_event':>18}")
+        for i, row in enumerate(rows, 1):
+            print(f"{i:>4} {row['run_chat'].get('get_session', 0):>12} {row['previous'].get('get_session', 0):>17} {row['run_chat'].get('append_event', 0):>13} {row['previous'].get('append_event', 0):>18}")
+        print("OK" if ok else "FAIL: run_chat read the session more than once outside the runner")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count session service calls per chat turn.")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.exit(0 if asyncio.run(main(args.turns, args.json)) else 1)
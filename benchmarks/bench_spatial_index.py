@@ -0,0 +1,82 @@
+"""
+RapidAPI requests saved by the spatial business index.
+
+Replays `recommended_WEB_connection` for users spread over `--spread-km` around one city (stubbed query
+generation, RapidAPI stub server from stub_servers.py) with the index disabled (tile cache only)
+and enabled, and reports paid requests and the index hit rate.
+
+Run from the repository root:
+    python -m benchmarks.bench_spatial_index --users 300 --spread-km 12
+"""
+from .stubs import setup_env, STUB_PROFILE
+setup_env()
+
+import argparse, asyncio, json, random
+from types import SimpleNamespace
+
+from TIA_Smart_chat_v3.tia_agent.sub_agents import DynamicChatAssistant as dca
+from TIA_Smart_chat_v3.tia_agent.sub_agents.connect_agent import utils as connect_utils, rapidapi_client, spatial_index
+from .bench_business_search import CITY
+from .stub_servers import start_rapidapi_server
+
+BUSINESS_TYPES = ["IT Consulting", "Digital Marketing", "Accounting"]
+
+
+async def _stub_acompletion(model, messages, **kwargs):
+    # Query generation answers with the Business_Type in the selected attributes
+    attributes = json.loads(messages[-1]["content"].split("Selected Attributes: ", 1)[1].split("\n", 1)[0])
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=attributes.get("Business_Type", "Business")))])
+
+
+def _users(count: int, spread_km: float, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    spread = spread_km / 111.0
+    return [(rng.choice(BUSINESS_TYPES), CITY[0] + rng.uniform(-spread, spread), CITY[1] + rng.uniform(-spread, spread)) for _ in range(count)]
+
+
+async def _run(users: list, server, threshold: float) -> dict:
+    rapidapi_client.search_cache.clear()
+    rapidapi_client.stale_search_cache.clear()
+    dca.response_cache.clear()
+    index = spatial_index.BusinessIndex(coverage_threshold=threshold)
+    connect_utils.business_index = index
+    server.reset_counts()
+    found = 0
+    for business_type, lat, lng in users:
+        attributes = {"region": "au", "lat": lat, "lng": lng, "connection_type": "complementary", "ConnectAgent": {},
+                      "profile": {**STUB_PROFILE, "Business_Type": business_type}}
+        result = await connect_utils.recommended_WEB_connection(attributes)
+        found += isinstance(result, list) and len(result) > 0
+    return {"api_requests": server.counts["requests"], "answered": found, "index": index.stats()}
+
+
+async def main(users: int, spread_km: float, as_json: bool):
+    server = start_rapidapi_server()
+    rapidapi_client._client = rapidapi_client.BusinessSearchClient("127.0.0.1", "bench", base_url=server.base_url)
+    dca.acompletion = _stub_acompletion
+    plan = _users(users, spread_km)
+    results = {
+        "users": users,
+        "spread_km": spread_km,
+        "tile_cache_only": await _run(plan, server, threshold=2.0),
+        "spatial_index": await _run(plan, server, threshold=spatial_index.SPATIAL_COVERAGE_THRESHOLD),
+    }
+    server.shutdown()
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{users} users within {spread_km} km of the city centre, {len(BUSINESS_TYPES)} business types")
+    print(f"{'':>16} {'api requests':>13} {'answered':>9} {'index hit rate':>15}")
+    for name in ("tile_cache_only", "spatial_index"):
+        row = results[name]
+        print(f"{name:>16} {row['api_requests']:>13} {row['answered']:>9} {row['index']['hit_rate']:>15}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark RapidAPI requests saved by the spatial business index.")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--spread-km", type=float, default=12)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.spread_km, args.json))
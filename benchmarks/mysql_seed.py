@@ -0,0 +1,118 @@
+"""
+Seeded MySQL database for the profile benchmarks.
+Creates (or reuses) a dedicated benchmark database, never the one named in DB_NAME, with the tables the
+profile loader and ProfilerAgent write path use, then fills it with synthetic users.
+Requires a reachable MySQL server configured through DB_HOST, DB_PORT, DB_USER and DB_PASS.
+"""
+import os, random
+import pymysql
+
+BENCH_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        first_name VARCHAR(100), last_name VARCHAR(100),
+        contact_email VARCHAR(255), contact_phone_no VARCHAR(50))""",
+    "CREATE TABLE IF NOT EXISTS business_types (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS business_categories (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS business_phases (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS business_roles (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS skill_categories (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE, business_type_id INT)",
+    "CREATE TABLE IF NOT EXISTS strength_categories (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE)",
+    """CREATE TABLE IF NOT EXISTS businesses (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        operator_user_id INT NOT NULL, name VARCHAR(255),
+        contact_email VARCHAR(255), contact_phone_no VARCHAR(50),
+        business_type_id INT, business_category_id INT, business_phase_id INT,
+        INDEX (operator_user_id))""",
+    "CREATE TABLE IF NOT EXISTS skills (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE, category_id INT)",
+    "CREATE TABLE IF NOT EXISTS strengths (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE, category_id INT)",
+    """CREATE TABLE IF NOT EXISTS business_strengths (
+        id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE,
+        business_role_id INT, business_phase_id INT)""",
+    "CREATE TABLE IF NOT EXISTS user_skills (user_id INT NOT NULL, skill_id INT NOT NULL, PRIMARY KEY (user_id, skill_id))",
+    "CREATE TABLE IF NOT EXISTS user_strengths (user_id INT NOT NULL, strength_id INT NOT NULL, PRIMARY KEY (user_id, strength_id))",
+    "CREATE TABLE IF NOT EXISTS user_business_strengths (user_id INT NOT NULL, business_strength_id INT NOT NULL, PRIMARY KEY (user_id, business_strength_id))",
+]
+
+BENCH_TABLES = [
+    "user_business_strengths", "user_strengths", "user_skills", "business_strengths", "strengths", "skills",
+    "businesses", "strength_categories", "skill_categories", "business_roles", "business_phases",
+    "business_categories", "business_types", "users",
+]
+
+
+def prepare_bench_database(db_name: str = None) -> str:
+    """Create the benchmark database and tables and point DB_NAME at it. Returns the database name."""
+    db_name = db_name or os.environ.get("BENCH_DB_NAME", "tia_bench")
+    conn = pymysql.connect(
+        host=os.environ["DB_HOST"],
+        user=os.environ["DB_USER"],
+        password=os.environ["DB_PASS"],
+        port=int(os.environ.get("DB_PORT", 3306)),
+    )
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}`")
+        cursor.execute(f"USE `{db_name}`")
+        for statement in BENCH_SCHEMA:
+            cursor.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+    os.environ["DB_NAME"] = db_name
+    return db_name
+
+
+def seed_profiles(users: int = 200, items_per_user: int = 4, seed: int = 7) -> list:
+    """Replace the benchmark data with `users` complete profiles. Returns the seeded user ids."""
+    rng = random.Random(seed)
+    conn = pymysql.connect(
+        host=os.environ["DB_HOST"],
+        user=os.environ["DB_USER"],
+        password=os.environ["DB_PASS"],
+        database=os.environ["DB_NAME"],
+        port=int(os.environ.get("DB_PORT", 3306)),
+    )
+    try:
+        cursor = conn.cursor()
+        for table in BENCH_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+
+        cursor.execute("INSERT INTO business_phases (name) VALUES ('TIA Agent Chatting')")
+        phase_id = cursor.lastrowid
+        cursor.executemany("INSERT INTO business_types (name) VALUES (%s)", [(f"Business Type {i}",) for i in range(20)])
+        cursor.executemany("INSERT INTO business_categories (name) VALUES (%s)", [(f"Business Category {i}",) for i in range(10)])
+        cursor.executemany("INSERT INTO business_roles (name) VALUES (%s)", [(f"Role {i}",) for i in range(10)])
+        cursor.execute("SELECT id FROM business_types")
+        type_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT id FROM business_categories")
+        category_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT id FROM business_roles")
+        role_ids = [row[0] for row in cursor.fetchall()]
+
+        user_ids = []
+        for i in range(users):
+            cursor.execute(
+                "INSERT INTO users (first_name, last_name, contact_email, contact_phone_no) VALUES (%s, %s, %s, %s)",
+                (f"First{i}", f"Last{i}", f"user{i}@example.com", f"0400{i:06d}")
+            )
+            user_id = cursor.lastrowid
+            user_ids.append(user_id)
+            cursor.execute(
+                "INSERT INTO businesses (operator_user_id, name, contact_email, contact_phone_no, business_type_id, business_category_id, business_phase_id) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                (user_id, f"Business {i}", f"hello@business{i}.example", f"07{i:08d}", rng.choice(type_ids), rng.choice(category_ids), phase_id)
+            )
+            for j in range(items_per_user):
+                cursor.execute("INSERT IGNORE INTO skills (name) VALUES (%s)", (f"Skill {i}-{j}",))
+                cursor.execute("INSERT INTO user_skills (user_id, skill_id) SELECT %s, id FROM skills WHERE name=%s", (user_id, f"Skill {i}-{j}"))
+                cursor.execute("INSERT IGNORE INTO strengths (name) VALUES (%s)", (f"Strength {i}-{j}",))
+                cursor.execute("INSERT INTO user_strengths (user_id, strength_id) SELECT %s, id FROM strengths WHERE name=%s", (user_id, f"Strength {i}-{j}"))
+                cursor.execute(
+                    "INSERT IGNORE INTO business_strengths (name, business_role_id, business_phase_id) VALUES (%s, %s, %s)",
+                    (f"Business Strength {i}-{j}", rng.choice(role_ids), phase_id)
+                )
+                cursor.execute("INSERT INTO user_business_strengths (user_id, business_strength_id) SELECT %s, id FROM business_strengths WHERE name=%s", (user_id, f"Business Strength {i}-{j}"))
+        conn.commit()
+        return user_ids
+    finally:
+        conn.close()
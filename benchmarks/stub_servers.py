@@ -0,0 +1,273 @@
+"""
+Local stand-ins for the GNN partner API and the RapidAPI local business search.
+
+Both speak the contracts the connect agent parses: `GET {base}/user/{id}/{type}-partners` returns
+`{"partners": [{"recommendation": {"user": {...}}, "reason": ...}]}` and `GET /search-in-area` returns
+`{"status": "OK", "data": [business, ...]}` with RapidAPI's rate limit headers. Payloads are generated from a
+seed, so the same user / search point always gets the same data. Latency follows a configurable distribution,
+and a fraction of requests can fail (HTTP 503) or hang (to exercise timeouts).
+
+Use from a benchmark:
+    gnn = start_gnn_server(latency=Latency("lognormal", 80, 0.5), error_rate=0.05)
+    os.environ["GNN_API_BASE_URL"] = f"{gnn.base_url}/api/gnn"
+
+or standalone for load tests against a running app:
+    python -m benchmarks.stub_servers --gnn-port 5000 --rapidapi-port 5001 --latency-ms 80 --error-rate 0.05
+    GNN_API_BASE_URL=http://127.0.0.1:5000/api/gnn RAPIDAPI_BASE_URL=http://127.0.0.1:5001 uvicorn TIA_Smart_chat_v3.main:app
+"""
+import argparse, json, math, random, re, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIRST_NAMES = ["Sarah", "Mike", "Jessica", "Liam", "Priya", "Tom", "Aisha", "Noah", "Chloe", "Ben", "Mei", "Oliver"]
+LAST_NAMES = ["Chen", "Rodriguez", "Wong", "Nguyen", "Patel", "Smith", "Brown", "Kelly", "Singh", "Taylor", "Murphy", "Lee"]
+INDUSTRIES = [
+    ("Marketing Agency", "Digital Marketing", "Specializes in social media and online advertising campaigns"),
+    ("Web Development", "Website Development", "Creates high-converting landing pages and business websites"),
+    ("Content Creation", "Content Marketing", "Produces engaging blog content and video marketing materials"),
+    ("IT Consulting", "Technology", "Helps small businesses move to the cloud and automate their workflows"),
+    ("Accounting", "Financial Services", "Bookkeeping, tax and advisory services for growing businesses"),
+    ("Graphic Design", "Creative Services", "Brand identities, packaging and print design"),
+    ("Legal Services", "Professional Services", "Contracts, IP and employment law for startups"),
+]
+BUSINESS_SUFFIXES = ["Co", "Studio", "Partners", "Group", "Labs", "Solutions", "Pro", "Collective"]
+STREETS = ["Queen St", "Adelaide St", "Ann St", "Wickham Tce", "Boundary St", "Given Tce", "Logan Rd", "Brunswick St"]
+REASONS = {
+    "complementary": "COMPLEMENTARY PARTNER: Share clients who need both your offerings and refer work to each other.",
+    "alliance": "ALLIANCE PARTNER: Their skills fill the gaps in your current project team.",
+    "mastermind": "MASTERMIND PARTNER: A peer with strengths you can learn from and grow alongside.",
+    "intelligent": "INTELLIGENT MATCH: Strong overlap in customers, skills and business stage.",
+}
+
+
+class Latency:
+    """
+    Response latency distribution in milliseconds.
+    "fixed": always `ms`; "uniform": ms ± spread * ms; "lognormal": median `ms` with shape `spread` (long tail).
+    """
+    def __init__(self, kind: str = "fixed", ms: float = 0.0, spread: float = 0.0):
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind, self.ms, self.spread = kind, ms, spread
+
+    def sample(self, rng: random.Random) -> float:
+        """Latency in seconds."""
+        if self.kind == "uniform":
+            ms = rng.uniform(self.ms * (1 - self.spread), self.ms * (1 + self.spread))
+        elif self.kind == "lognormal" and self.ms > 0:
+            ms = rng.lognormvariate(math.log(self.ms), self.spread)
+        else:
+            ms = self.ms
+        return max(ms, 0.0) / 1000
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server with latency, failure and hang injection, counting requests by outcome.
+
+    Attributes:
+        latency (Latency): Latency added to every response.
+        error_rate (float): Fraction of requests answered with HTTP 503.
+        hang_rate (float): Fraction of requests that stall for `hang_s` seconds before answering.
+        seed (int): Seed for generated payloads (and the failure draws).
+    """
+    daemon_threads = True
+
+    def __init__(self, handler, port: int = 0, latency: Latency = None, error_rate: float = 0.0, hang_rate: float = 0.0, hang_s: float = 30.0, seed: int = 0):
+        super().__init__(("127.0.0.1", port), handler)
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_s = hang_s
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "errors": 0, "hangs": 0, "not_found": 0}
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on a slow or hanging response (timeouts) are expected, not errors
+        pass
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def draw(self):
+        """(delay in seconds, outcome) for the next request."""
+        with self.lock:
+            self.counts["requests"] += 1
+            delay, roll = self.latency.sample(self._rng), self._rng.random()
+        if roll < self.error_rate:
+            return delay, "errors"
+        if roll < self.error_rate + self.hang_rate:
+            return delay + self.hang_s, "hangs"
+        return delay, "ok"
+
+    def count(self, outcome: str):
+        with self.lock:
+            self.counts[outcome] += 1
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts = dict.fromkeys(self.counts, 0)
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: int, payload, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        delay, outcome = self.server.draw()
+        time.sleep(delay)
+        self.server.count(outcome)
+        if outcome == "errors":
+            self._send_json(503, {"message": "Service unavailable (stub)"})
+            return
+        self.respond(urlparse(self.path))
+
+    def respond(self, url):
+        raise NotImplementedError
+
+    def log_message(self, *args):
+        pass
+
+
+class GNNHandler(_StubHandler):
+    """`GET .../user/{user_id}/{connection_type}-partners` (any base path prefix)."""
+    PATH = re.compile(r"/user/([^/]+)/(complementary|alliance|mastermind|intelligent)-partners/?$")
+
+    def respond(self, url):
+        match = self.PATH.search(url.path)
+        if not match:
+            self.server.count("not_found")
+            self._send_json(404, {"message": "Not found"})
+            return
+        user_id, connection_type = match.groups()
+        self._send_json(200, {"partners": gnn_partners(user_id, connection_type, self.server.seed, self.server.empty_rate)})
+
+
+class RapidAPIHandler(_StubHandler):
+    """`GET /search-in-area?query=&lat=&lng=&limit=...` with `x-ratelimit-requests-*` headers."""
+    def respond(self, url):
+        if not url.path.rstrip("/").endswith("/search-in-area"):
+            self.server.count("not_found")
+            self._send_json(404, {"message": "Not found"})
+            return
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.quota_used += 1
+            remaining = max(self.server.quota - self.server.quota_used, 0)
+        data = search_results(params.get("query", ""), float(params.get("lat", 0)), float(params.get("lng", 0)), int(params.get("limit", 20)), self.server.seed)
+        headers = {"x-ratelimit-requests-limit": self.server.quota, "x-ratelimit-requests-remaining": remaining}
+        self._send_json(200, {"status": "OK", "request_id": f"stub-{self.server.quota_used}", "parameters": params, "data": data}, headers)
+
+
+def gnn_partners(user_id, connection_type: str, seed: int = 0, empty_rate: float = 0.0) -> list:
+    """Seeded partner recommendations in the GNN `partners` shape (empty for a fraction of users)."""
+    rng = random.Random(f"{seed}:gnn:{user_id}:{connection_type}")
+    if rng.random() < empty_rate:
+        return []
+    partners = []
+    for _ in range(rng.randint(2, 5)):
+        business_type, category, description = rng.choice(INDUSTRIES)
+        last = rng.choice(LAST_NAMES)
+        partners.append({
+            "recommendation": {
+                "user": {
+                    "id": rng.randint(100, 99999),
+                    "name": f"{rng.choice(FIRST_NAMES)} {last}",
+                    "business": f"{last} {business_type.split()[0]} {rng.choice(BUSINESS_SUFFIXES)}",
+                    "type": business_type,
+                    "category": category,
+                    "description": description,
+                }
+            },
+            "reason": REASONS[connection_type],
+            "score": round(rng.uniform(0.55, 0.98), 3),
+        })
+    return sorted(partners, key=lambda p: p["score"], reverse=True)
+
+
+def search_results(query: str, lat: float, lng: float, limit: int, seed: int = 0) -> list:
+    """Seeded businesses within ~4 km of (lat, lng) in the RapidAPI `data` shape."""
+    query = " ".join(query.split()) or "Business"
+    rng = random.Random(f"{seed}:search:{query.casefold()}:{lat:.4f}:{lng:.4f}")
+    results = []
+    for i in range(min(limit, 20)):
+        last = rng.choice(LAST_NAMES)
+        name = f"{last} {query.title()} {rng.choice(BUSINESS_SUFFIXES)}"
+        slug = re.sub(r"[^a-z0-9]+", "", name.lower())
+        business_id = f"0x{rng.getrandbits(64):016x}"
+        results.append({
+            "business_id": business_id,
+            "place_id": f"ChIJ{rng.getrandbits(80):020x}",
+            "name": name,
+            "phone_number": f"+61 7 {rng.randint(3000, 3999)} {rng.randint(1000, 9999)}",
+            "full_address": f"{rng.randint(1, 400)} {rng.choice(STREETS)}, Brisbane QLD {rng.randint(4000, 4179)}",
+            "latitude": round(lat + rng.uniform(-0.035, 0.035), 6),
+            "longitude": round(lng + rng.uniform(-0.035, 0.035), 6),
+            "website": f"https://www.{slug}.com.au",
+            "rating": round(rng.uniform(3.2, 5.0), 1),
+            "review_count": rng.randint(0, 450),
+            "type": query.title(),
+            "opening_status": rng.choice(["Open", "Open 24 hours", "Closed · Opens 9 am"]),
+            "about": {"summary": f"{query.title()} for local businesses in Brisbane.", "details": {}},
+            "emails_and_contacts": {"emails": [f"hello@{slug}.com.au"], "phone_numbers": []},
+        })
+    return results
+
+
+def start_gnn_server(port: int = 0, latency: Latency = None, error_rate: float = 0.0, hang_rate: float = 0.0, hang_s: float = 30.0, empty_rate: float = 0.0, seed: int = 0) -> StubServer:
+    """Start a GNN stub in a background thread. Its base URL for GNN_API_BASE_URL is `server.base_url + "/api/gnn"`."""
+    server = StubServer(GNNHandler, port, latency, error_rate, hang_rate, hang_s, seed)
+    server.empty_rate = empty_rate
+    return server.start()
+
+
+def start_rapidapi_server(port: int = 0, latency: Latency = None, error_rate: float = 0.0, hang_rate: float = 0.0, hang_s: float = 30.0, quota: int = 10 ** 6, seed: int = 0) -> StubServer:
+    """Start a RapidAPI stub in a background thread; `server.base_url` is the RAPIDAPI_BASE_URL to use."""
+    server = StubServer(RapidAPIHandler, port, latency, error_rate, hang_rate, hang_s, seed)
+    server.quota, server.quota_used = quota, 0
+    return server.start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the GNN and RapidAPI stub servers.")
+    parser.add_argument("--gnn-port", type=int, default=5000)
+    parser.add_argument("--rapidapi-port", type=int, default=5001)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-s", type=float, default=30.0)
+    parser.add_argument("--gnn-empty-rate", type=float, default=0.2, help="Fraction of users the GNN has no partners for.")
+    parser.add_argument("--quota", type=int, default=10 ** 6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    latency = Latency(args.latency, args.latency_ms, args.spread)
+    faults = {"error_rate": args.error_rate, "hang_rate": args.hang_rate, "hang_s": args.hang_s, "seed": args.seed}
+    gnn = start_gnn_server(args.gnn_port, latency, empty_rate=args.gnn_empty_rate, **faults)
+    rapidapi = start_rapidapi_server(args.rapidapi_port, latency, quota=args.quota, **faults)
+    print(f"GNN_API_BASE_URL={gnn.base_url}/api/gnn")
+    print(f"RAPIDAPI_BASE_URL={rapidapi.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        gnn.shutdown()
+        rapidapi.shutdown()
@@ -0,0 +1,101 @@
+"""
+Offline stand-ins used by the benchmarks.
+Import `setup_env` before anything from TIA_Smart_chat_v3 so the app picks up a SQLite session
+database and a dummy API key instead of MySQL and OpenAI.
+"""
+import asyncio, json, os, tempfile, time
+
+
+def setup_env(db_dir: str = None):
+    """Point the app at a throwaway SQLite session database and placeholder credentials."""
+    db_dir = db_dir or tempfile.mkdtemp(prefix="tia_bench_")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("SESSION_DB_URL", f"sqlite:///{os.path.join(db_dir, 'sessions.db')}")
+    for key, value in {"DB_USER": "bench", "DB_PASS": "bench", "DB_HOST": "127.0.0.1", "DB_NAME": "tiapartners", "DB_PORT": "3306"}.items():
+        os.environ.setdefault(key, value)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    return db_dir
+
+
+STUB_PROFILE = {
+    "UserName": "Sam Taylor",
+    "Business_Name": "Taylor Tech",
+    "Contact_Email": "sam@taylortech.example",
+    "Contact_Phone_No": "0400 000 000",
+    "Business_Type": "IT Consulting",
+    "UserJob": "Founder",
+    "User_Strength": "Problem solving",
+    "User_skills": "Python programming, Cloud architecture",
+    "Business_Strength": "Fast delivery",
+    "Business_Category": "Technology",
+}
+
+
+def stub_load_user_profile(user_id):
+    """Replacement for load_user_profile that never touches MySQL."""
+    return {"status": "success", "profile_exists": True, "profile": dict(STUB_PROFILE)}
+
+
+def _tool_call(call_id: str, name: str, args: dict) -> dict:
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+
+
+def script_response(messages: list, tools: list):
+    """
+    Decide what the stub model says next. Returns (text, tool_calls).
+    The coordinator calls `check_for_existing_user` and then follows its `transfer_to_agent`;
+    every other agent answers with a short question.
+    """
+    tool_names = [tool["function"]["name"] for tool in (tools or [])]
+    last = messages[-1] if messages else {}
+    if last.get("role") == "tool":
+        try:
+            payload = json.loads(last.get("content") or "{}")
+        except (TypeError, ValueError):
+            payload = {}
+        if isinstance(payload, dict) and payload.get("transfer_to_agent") and "transfer_to_agent" in tool_names:
+            return None, [_tool_call("call_transfer", "transfer_to_agent", {"agent_name": payload["transfer_to_agent"]})]
+        return "Thanks, that is done. What would you like to do next?", None
+    if "check_for_existing_user" in tool_names:
+        return None, [_tool_call("call_check_user", "check_for_existing_user", {})]
+    return "Great to meet you! Could you tell me a little about your business?", None
+
+
+class StubLLMClient:
+    """
+    Drop-in for google.adk.models.lite_llm.LiteLLMClient.
+    Sleeps for `delay` seconds on the event loop to mimic provider latency and counts calls.
+    """
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = 0
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        import litellm
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        text, tool_calls = script_response(messages, tools)
+        return await litellm.acompletion(model=model, messages=messages, mock_response=text or "", mock_tool_calls=tool_calls)
+
+    def completion(self, model, messages, tools, stream=False, **kwargs):
+        import litellm
+        self.calls += 1
+        time.sleep(self.delay)
+        text, tool_calls = script_response(messages, tools)
+        if tool_calls and stream:
+            from litellm.types.utils import ChatCompletionDeltaToolCall, Delta, Function, ModelResponseStream, StreamingChoices
+            deltas = [
+                ChatCompletionDeltaToolCall(id=call["id"], type="function", index=0, function=Function(name=call["function"]["name"], arguments=call["function"]["arguments"]))
+                for call in tool_calls
+            ]
+            return iter([ModelResponseStream(choices=[StreamingChoices(delta=Delta(tool_calls=deltas), finish_reason="tool_calls")])])
+        return litellm.completion(model=model, messages=messages, mock_response=text or "", mock_tool_calls=tool_calls, stream=stream)
+
+
+def install_stub_llm(delay: float = 0.2) -> StubLLMClient:
+    """Swap the shared ADK agent model client for a StubLLMClient and stub out MySQL profile loads."""
+    from TIA_Smart_chat_v3.tia_agent import config, tools
+    client = StubLLMClient(delay)
+    config.AGENT_MODEL.llm_client = client
+    tools.load_user_profile = stub_load_user_profile
+    return client